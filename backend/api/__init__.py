@@ -1,53 +1,142 @@
 from flask import Flask, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
-import os
+import importlib
+import time
 
 # Cargar variables de entorno
 load_dotenv()
 
-app = Flask(__name__)
-CORS(app)
-
-# Configuración de la aplicación
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'clave_app_segura_2024')
-app.config['JSON_AS_ASCII'] = False  # Soporte para UTF-8
-
-@app.route('/')
-def index():
-    """Ruta de verificación del servidor"""
-    return jsonify({
-        "message": "✅ Sistema de Gestión de Inventario - API funcionando correctamente",
-        "version": "2.0",
-        "status": "online"
-    })
-
-@app.route('/health')
-def health_check():
-    """Ruta para verificar el estado del servidor"""
-    return jsonify({
-        "status": "healthy",
-        "service": "Inventory Management API"
-    }), 200
-
-# Importar rutas (después de crear la app)
-import api.routes.user
-import api.routes.products
-import api.routes.categories
-import api.routes.stock
-import api.routes.supplier
-import api.routes.orders
-import api.routes.reports
-
-# Manejo de errores
-@app.errorhandler(404)
-def not_found(error):
-    return jsonify({"error": "Endpoint no encontrado"}), 404
-
-@app.errorhandler(500)
-def internal_error(error):
-    return jsonify({"error": "Error interno del servidor"}), 500
-
-@app.errorhandler(405)
-def method_not_allowed(error):
-    return jsonify({"error": "Método no permitido"}), 405
+from api.config import Config
+
+# Módulos de rutas (api/routes/<nombre>.py); cada uno expone un Blueprint "bp".
+# Se importan recién al crear la app, no al importar el paquete.
+ROUTE_MODULES = [
+    'user',
+    'products',
+    'categories',
+    'stock',
+    'supplier',
+    'orders',
+    'reports',
+    'search',
+    'export',
+]
+
+def create_app(config=None):
+    """
+    Crea y configura la aplicación Flask.
+
+    Args:
+        config (dict u objeto): Valores que sobrescriben a api.config.Config
+
+    Returns:
+        Flask: Aplicación lista para servir (con pool y cachés precalentados
+        si WARMUP está activo, para que los workers la hereden al forkear)
+    """
+    app = Flask(__name__)
+    CORS(app)
+
+    # Configuración de la aplicación
+    app.config.from_object(Config)
+    if isinstance(config, dict):
+        app.config.from_mapping(config)
+    elif config is not None:
+        app.config.from_object(config)
+
+    from api.db import db_config
+    db_config.configure(
+        app.config['DB_BACKEND'], app.config['DB_POOL_SIZE'],
+        app.config['DB_REPLICA_BACKEND'], app.config['DB_SHARDS']
+    )
+
+    @app.route('/')
+    def index():
+        """Ruta de verificación del servidor"""
+        return jsonify({
+            "message": "✅ Sistema de Gestión de Inventario - API funcionando correctamente",
+            "version": "2.0",
+            "status": "online"
+        })
+
+    @app.route('/health')
+    def health_check():
+        """Ruta para verificar el estado del servidor"""
+        return jsonify({
+            "status": "healthy",
+            "service": "Inventory Management API"
+        }), 200
+
+    # Métricas por endpoint y ruta /metrics
+    from api.utils import metrics
+    metrics.init_app(app)
+
+    # Límites de ritmo y concurrencia por usuario (429 con Retry-After)
+    from api.utils import ratelimit
+    ratelimit.init_app(app)
+
+    # Perfilado bajo demanda (header X-Profile firmado o muestreo)
+    from api.utils import profiling
+    profiling.init_app(app)
+
+    # Lecturas a la réplica (con read-your-writes para quien acaba de escribir)
+    from api.db import replication
+    replication.init_app(app, db_config.get_router)
+
+    # Tenants repartidos en shards (escrituras en pausa mientras se mueve uno)
+    from api.db import sharding
+    sharding.init_app(app, db_config.get_shard_map)
+
+    # Compresión de respuestas (Accept-Encoding); se registra después de las
+    # métricas y el perfilado para que su costo quede medido
+    from api.utils import compression
+    compression.init_app(app)
+
+    # Registrar rutas
+    for name in ROUTE_MODULES:
+        module = importlib.import_module(f'api.routes.{name}')
+        app.register_blueprint(module.bp)
+
+    # Manejo de errores
+    @app.errorhandler(404)
+    def not_found(error):
+        return jsonify({"error": "Endpoint no encontrado"}), 404
+
+    @app.errorhandler(500)
+    def internal_error(error):
+        return jsonify({"error": "Error interno del servidor"}), 500
+
+    @app.errorhandler(405)
+    def method_not_allowed(error):
+        return jsonify({"error": "Método no permitido"}), 405
+
+    if app.config['WARMUP']:
+        warmup(app)
+
+    return app
+
+def warmup(app):
+    """
+    Abre las conexiones del pool y construye las cachés configuradas.
+    Los errores no impiden arrancar: solo se informan.
+    """
+    from api.db import db_config
+    from api.models.search import Search
+
+    start = time.perf_counter()
+    try:
+        db_config.warmup()
+        for user_id in app.config['WARMUP_SEARCH_USERS']:
+            Search.get_index(user_id)
+        print(f"✅ Pool y cachés precalentados en {time.perf_counter() - start:.2f}s")
+    except Exception as e:
+        print(f"⚠️ No se pudo precalentar la aplicación: {str(e)}")
+
+def __getattr__(name):
+    """
+    Compatibilidad: 'from api import app' crea (una sola vez) la app por defecto.
+    """
+    if name == 'app':
+        globals()['app'] = create_app()
+        return globals()['app']
+    raise AttributeError(f"module 'api' has no attribute '{name}'")
@@ -0,0 +1,60 @@
+# Módulo de configuración de la aplicación
+import os
+import tempfile
+
+
+class Config:
+    """
+    Configuración por defecto, leída de variables de entorno.
+    create_app() acepta un diccionario u objeto para sobrescribir valores.
+    """
+
+    SECRET_KEY = os.getenv('SECRET_KEY', 'clave_app_segura_2024')
+    JSON_AS_ASCII = False  # Soporte para UTF-8
+
+    # Motor de base de datos: 'mysql' o 'sqlite' (reemplazo local, ver DB_SQLITE_PATH)
+    DB_BACKEND = os.getenv('DB_BACKEND', 'mysql')
+
+    # Réplica para las peticiones GET (vacío = todo al primario); ver DB_REPLICA_HOST, ...
+    DB_REPLICA_BACKEND = os.getenv('DB_REPLICA_BACKEND', '')
+
+    # Shards de tenants por user_id (vacío = una sola base); ver api/db/sharding.py
+    DB_SHARDS = os.getenv('DB_SHARDS', '')
+
+    # Tamaño del pool de conexiones por proceso (0 = una conexión por petición)
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+
+    # Precalentar pool y cachés al crear la app (antes de atender peticiones)
+    WARMUP = os.getenv('APP_WARMUP', '1') == '1'
+
+    # Usuarios cuyo índice de búsqueda se construye al arrancar (ej: "1,2,3")
+    WARMUP_SEARCH_USERS = [
+        int(u) for u in os.getenv('WARMUP_SEARCH_USERS', '').split(',') if u.strip()
+    ]
+
+    # Token requerido para GET /metrics (vacío = sin autenticación)
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+    # Perfilado: fracción de peticiones perfiladas al azar (además de las que
+    # traen el header X-Profile firmado) y límites del buffer en disco
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+    PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'inventario_profiles'))
+    PROFILE_MAX_COUNT = int(os.getenv('PROFILE_MAX_COUNT', '50'))
+    PROFILE_MAX_BYTES = int(os.getenv('PROFILE_MAX_BYTES', str(50 * 1024 * 1024)))
+
+    # Compresión de respuestas según Accept-Encoding (gzip, y brotli si está
+    # instalado): tamaño mínimo en bytes para comprimir y nivel de cada una
+    COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', '1') == '1'
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+    COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', '6'))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', '4'))
+
+    # Límites por usuario (api/utils/ratelimit.py): "ritmo,ráfaga,concurrencia"
+    # por clase de petición (fichas por segundo, máximo acumulable y peticiones
+    # en curso; 0 = sin tope de concurrencia). Con RATE_LIMIT_REDIS_URL los
+    # comparten todos los workers; si no, cada proceso lleva los suyos
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', '0') == '1'
+    RATE_LIMIT_READS = os.getenv('RATE_LIMIT_READS', '20,50,10')
+    RATE_LIMIT_REPORTS = os.getenv('RATE_LIMIT_REPORTS', '2,10,4')
+    RATE_LIMIT_WRITES = os.getenv('RATE_LIMIT_WRITES', '5,20,4')
+    RATE_LIMIT_REDIS_URL = os.getenv('RATE_LIMIT_REDIS_URL', '')
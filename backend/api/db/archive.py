@@ -0,0 +1,161 @@
+# Archivado de órdenes completadas y eliminadas en las tablas de historial
+import argparse
+import datetime
+import json
+import os
+import time
+
+from api.db import db_config
+
+# Días que una orden completada/eliminada permanece en las tablas activas
+RETENTION_DAYS = int(os.getenv('ARCHIVE_RETENTION_DAYS', '180'))
+
+# Órdenes por lote: cada lote es una transacción corta (limita el tiempo de lock)
+BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', '500'))
+
+# Pausa entre lotes para dejar pasar a las peticiones de la API
+BATCH_PAUSE = float(os.getenv('ARCHIVE_BATCH_PAUSE', '0.05'))
+
+
+# Estados de las órdenes que se archivan
+ARCHIVABLE_STATUSES = ('completed', 'deleted')
+
+# Tablas activas y de historial: (órdenes, líneas)
+ORDER_TABLES = (('purchase_orders', 'order_products'),
+                ('purchase_orders_history', 'order_products_history'))
+
+
+def tenant_order_lines(user_id, condition='', params=()):
+    """
+    Subconsulta con las líneas de las órdenes activas y archivadas de un
+    tenant (product_id, quantity, order_id, order_date, received_date,
+    status). El filtro por user_id (y 'condition', sobre los alias op y po)
+    va dentro de cada rama del UNION ALL: con las vistas *_all, MySQL
+    anterior a 8.0.29 no lo empuja dentro de la unión y materializa las
+    líneas de todos los tenants.
+
+    Returns:
+        tuple: (SQL, parámetros)
+    """
+    branches = [
+        f'''
+        SELECT op.product_id, op.quantity, po.id AS order_id, po.order_date, po.received_date, po.status
+        FROM {lines} op
+        JOIN {orders} po ON op.order_id = po.id
+        WHERE po.user_id = %s {condition}
+        '''
+        for orders, lines in ORDER_TABLES
+    ]
+    return 'UNION ALL'.join(branches), (user_id, *params) * len(ORDER_TABLES)
+
+
+def tenant_units_by_product(user_id):
+    """Subconsulta (product_id, units) con las unidades pedidas en todas las órdenes del tenant"""
+    sql, params = tenant_order_lines(user_id)
+    return f'SELECT product_id, SUM(quantity) as units FROM ({sql}) l GROUP BY product_id', params
+
+
+def tenant_orders_by_status(user_id):
+    """Consulta (status, cantidad) de las órdenes activas y archivadas, sin las eliminadas"""
+    branches = [
+        f"SELECT status FROM {orders} WHERE user_id = %s AND status != 'deleted'"
+        for orders, _ in ORDER_TABLES
+    ]
+    sql = f"SELECT status, COUNT(*) as cantidad FROM ({' UNION ALL '.join(branches)}) o GROUP BY status"
+    return sql, (user_id,) * len(ORDER_TABLES)
+
+
+def _archive_batch(backend, cutoff, batch_size):
+    """
+    Mueve un lote de órdenes a las tablas de historial en una transacción.
+
+    Returns:
+        tuple: (órdenes movidas, líneas movidas)
+    """
+    connection = backend.connect()
+    cursor = connection.cursor()
+    try:
+        # Una consulta por estado: cada una recorre idx_status_date (status,
+        # order_date, id) en orden y se detiene en el límite, así solo lee y
+        # bloquea filas archivables (no las órdenes viejas pendientes)
+        ids = []
+        for status in ARCHIVABLE_STATUSES:
+            if len(ids) >= batch_size:
+                break
+            cursor.execute('''
+                SELECT id FROM purchase_orders
+                WHERE status = %s AND order_date < %s
+                ORDER BY order_date, id
+                LIMIT %s
+                FOR UPDATE
+            ''', (status, cutoff, batch_size - len(ids)))
+            ids += [row[0] for row in cursor.fetchall()]
+        if not ids:
+            connection.rollback()
+            return 0, 0
+
+        placeholders = ', '.join(['%s'] * len(ids))
+        cursor.execute(f'''
+            INSERT IGNORE INTO purchase_orders_history
+                (id, order_date, received_date, status, user_id, created_at)
+            SELECT id, order_date, received_date, status, user_id, created_at
+            FROM purchase_orders WHERE id IN ({placeholders})
+        ''', ids)
+        cursor.execute(f'''
+            INSERT IGNORE INTO order_products_history (id, order_id, product_id, quantity, user_id)
+            SELECT op.id, op.order_id, op.product_id, op.quantity, po.user_id
+            FROM order_products op
+            JOIN purchase_orders po ON op.order_id = po.id
+            WHERE op.order_id IN ({placeholders})
+        ''', ids)
+        lines = cursor.rowcount
+        cursor.execute(f'DELETE FROM order_products WHERE order_id IN ({placeholders})', ids)
+        cursor.execute(f'DELETE FROM purchase_orders WHERE id IN ({placeholders})', ids)
+        connection.commit()
+        return len(ids), lines
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def archive_orders(backend, days=RETENTION_DAYS, batch_size=BATCH_SIZE, pause=BATCH_PAUSE, max_batches=None):
+    """
+    Archiva las órdenes completadas o eliminadas con order_date anterior a
+    'days' días, por lotes, hasta que no quede ninguna.
+
+    Returns:
+        dict: Órdenes y líneas archivadas, lotes y duración máxima de un lote (ms)
+    """
+    cutoff = datetime.date.today() - datetime.timedelta(days=days)
+    result = {"ordenes": 0, "lineas": 0, "lotes": 0, "lote_max_ms": 0.0}
+    while max_batches is None or result["lotes"] < max_batches:
+        start = time.perf_counter()
+        orders, lines = _archive_batch(backend, cutoff, batch_size)
+        if not orders:
+            break
+        result["ordenes"] += orders
+        result["lineas"] += lines
+        result["lotes"] += 1
+        result["lote_max_ms"] = max(result["lote_max_ms"], round((time.perf_counter() - start) * 1000, 2))
+        time.sleep(pause)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archiva órdenes completadas y eliminadas")
+    parser.add_argument("--dias", type=int, default=RETENTION_DAYS, help="Retención en días")
+    parser.add_argument("--lote", type=int, default=BATCH_SIZE, help="Órdenes por transacción")
+    parser.add_argument("--pausa", type=float, default=BATCH_PAUSE, help="Segundos entre lotes")
+    args = parser.parse_args()
+
+    for name, backend in db_config.tenant_backends().items():
+        result = archive_orders(backend, args.dias, args.lote, args.pausa)
+        print(json.dumps({"base": name, **result}, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    # python -m api.db.archive --dias 180 (por ejemplo, desde cron una vez por noche)
+    main()
@@ -0,0 +1,17 @@
+# Backends de base de datos intercambiables (DB_BACKEND=mysql|sqlite)
+
+BACKENDS = ('mysql', 'sqlite')
+
+
+def create_backend(name, prefix='DB_', pool_size=5):
+    """
+    Crea un backend leyendo su configuración de las variables de entorno
+    que empiezan con 'prefix' (ej: DB_HOST, DB_REPLICA_HOST, ...).
+    """
+    if name == 'mysql':
+        from api.db.backends.mysql import MySQLBackend
+        return MySQLBackend.from_env(prefix, pool_size)
+    if name == 'sqlite':
+        from api.db.backends.sqlite import SQLiteBackend
+        return SQLiteBackend.from_env(prefix, pool_size)
+    raise ValueError(f"Backend de base de datos desconocido: {name} (opciones: {', '.join(BACKENDS)})")
@@ -0,0 +1,103 @@
+# Backend MySQL con pool de conexiones por proceso
+import os
+import threading
+
+import mysql.connector
+from mysql.connector import pooling
+from mysql.connector.errors import PoolError
+
+
+class MySQLBackend:
+    """
+    Conexiones a MySQL desde un pool por proceso.
+    Si el proceso fue forkeado (workers), se crea un pool nuevo: las
+    conexiones del proceso padre no se comparten.
+    """
+
+    name = 'mysql'
+
+    def __init__(self, params, pool_size=5):
+        self.params = params
+        self.pool_size = pool_size
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+        self.overflow_count = 0
+
+    @classmethod
+    def from_env(cls, prefix='DB_', pool_size=5):
+        """Parámetros de conexión tomados de las variables de entorno"""
+        return cls({
+            "host": os.getenv(f'{prefix}HOST', 'localhost'),
+            "port": os.getenv(f'{prefix}PORT', '3306'),
+            "user": os.getenv(f'{prefix}USER', os.getenv('DB_USER')),
+            "password": os.getenv(f'{prefix}PASSWORD', os.getenv('DB_PASSWORD')),
+            "database": os.getenv(f'{prefix}NAME', os.getenv('DB_NAME')),
+            "charset": 'utf8mb4',
+            "collation": 'utf8mb4_unicode_ci'
+        }, pool_size)
+
+    def describe(self):
+        return f"mysql://{self.params['host']}:{self.params['port']}/{self.params['database']}"
+
+    def get_pool(self):
+        """Retorna el pool del proceso actual, creándolo si hace falta"""
+        pid = os.getpid()
+        if self._pool is None or self._pool_pid != pid:
+            with self._lock:
+                if self._pool is None or self._pool_pid != pid:
+                    self._pool = pooling.MySQLConnectionPool(
+                        pool_name=f"inventario_{pid}_{id(self)}",
+                        pool_size=self.pool_size,
+                        pool_reset_session=True,
+                        **self.params
+                    )
+                    self._pool_pid = pid
+        return self._pool
+
+    def connect(self):
+        """Obtiene una conexión del pool (o una directa si el pool está deshabilitado)"""
+        if self.pool_size <= 0:
+            return mysql.connector.connect(**self.params)
+
+        try:
+            return self.get_pool().get_connection()
+        except PoolError:
+            # Pool agotado: se abre una conexión extra en lugar de fallar
+            self.overflow_count += 1
+            return mysql.connector.connect(**self.params)
+
+    def align_ids(self, connection, table, index, count):
+        """
+        Verifica que los ids autoincrementales de este shard no choquen con los
+        de otros: MySQL los intercala con auto_increment_increment = cantidad de
+        shards y auto_increment_offset = índice + 1 (configurados en el servidor),
+        así los ids copiados desde otro shard nunca coinciden con los propios.
+        """
+        cursor = connection.cursor()
+        cursor.execute('SELECT @@global.auto_increment_increment, @@global.auto_increment_offset')
+        increment, offset = cursor.fetchone()
+        cursor.close()
+        if (increment, offset) != (count, index + 1):
+            raise ValueError(
+                f"{self.describe()}: configurar auto_increment_increment={count} y "
+                f"auto_increment_offset={index + 1} (actual: {increment}, {offset})"
+            )
+
+    def warmup(self):
+        """Abre las conexiones del pool"""
+        if self.pool_size > 0:
+            self.get_pool()
+
+    def reset(self):
+        """Descarta el pool actual (se recrea en la próxima conexión)"""
+        with self._lock:
+            self._pool = None
+            self._pool_pid = None
+
+    def stats(self):
+        """Estado del pool del proceso actual"""
+        pool = self._pool if self._pool_pid == os.getpid() else None
+        size = pool.pool_size if pool else 0
+        idle = pool._cnx_queue.qsize() if pool else 0
+        return {"size": size, "in_use": size - idle, "overflow": self.overflow_count}
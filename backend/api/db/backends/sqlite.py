@@ -0,0 +1,433 @@
+# Backend SQLite: reemplazo local de MySQL para desarrollo y benchmarks
+import datetime
+import decimal
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+
+from api.db.sharding import ID_BLOCK
+from api.utils.search import normalize
+
+# Esquema MySQL que se traduce al crear la base
+SCHEMA_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+    'settings', 'schema.sql'
+)
+
+# Segundos que una conexión espera un lock de escritura antes de fallar
+BUSY_TIMEOUT = 30
+
+# Tipos de Python que MySQL acepta como parámetro y sqlite3 no
+sqlite3.register_adapter(decimal.Decimal, float)
+sqlite3.register_adapter(datetime.date, lambda value: value.isoformat())
+sqlite3.register_adapter(datetime.datetime, lambda value: value.isoformat(' '))
+
+# Columnas que se devuelven con el mismo tipo que mysql-connector
+sqlite3.register_converter('DECIMAL', lambda value: decimal.Decimal(value.decode()))
+sqlite3.register_converter('DATE', lambda value: datetime.date.fromisoformat(value.decode()[:10]))
+sqlite3.register_converter('TIMESTAMP', lambda value: datetime.datetime.fromisoformat(value.decode()))
+sqlite3.register_converter('DATETIME', lambda value: datetime.datetime.fromisoformat(value.decode()))
+
+
+# ---------------------------------------------------------------------------
+# Traducción del esquema
+# ---------------------------------------------------------------------------
+
+def _split_top_level(text, separator=','):
+    """Divide 'text' por 'separator' ignorando paréntesis y comillas"""
+    parts, depth, quote, current = [], 0, None, []
+    for ch in text:
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "'\"`":
+            quote = ch
+        elif ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif ch == separator and depth == 0:
+            parts.append(''.join(current).strip())
+            current = []
+            continue
+        current.append(ch)
+    if ''.join(current).strip():
+        parts.append(''.join(current).strip())
+    return parts
+
+
+def _schema_statements(script):
+    """Separa el script en sentencias respetando los bloques DELIMITER"""
+    statements, current, delimiter = [], [], ';'
+    for line in script.splitlines():
+        stripped = line.strip()
+        if stripped.startswith('--') or stripped.startswith('#'):
+            continue
+        if stripped.upper().startswith('DELIMITER'):
+            delimiter = stripped.split()[1]
+            continue
+        current.append(line)
+        if stripped.endswith(delimiter):
+            statement = '\n'.join(current).strip()
+            statements.append(statement[:-len(delimiter)].strip())
+            current = []
+    if '\n'.join(current).strip():
+        statements.append('\n'.join(current).strip())
+    return [s for s in statements if s]
+
+
+def _column(definition):
+    """Traduce la definición de una columna MySQL"""
+    name = definition.split()[0]
+    definition = re.sub(r'\bINT\s+AUTO_INCREMENT\s+PRIMARY\s+KEY\b',
+                        'INTEGER PRIMARY KEY AUTOINCREMENT', definition, flags=re.I)
+    definition = re.sub(r'\bENUM\s*\(([^)]*)\)', rf'TEXT CHECK ({name} IN (\1))', definition, flags=re.I)
+    definition = re.sub(r'\s+ON\s+UPDATE\s+CURRENT_TIMESTAMP\b', '', definition, flags=re.I)
+    definition = re.sub(r'DEFAULT\s*\(\s*(CURRENT_DATE|CURRENT_TIMESTAMP)\s*\)', r'DEFAULT \1', definition, flags=re.I)
+    definition = re.sub(r'\s+UNSIGNED\b', '', definition, flags=re.I)
+    return definition
+
+
+def _index_name(table, name):
+    # En SQLite los nombres de índice son globales, no por tabla
+    return f"{table}_{name}"
+
+
+def _create_table(statement):
+    match = re.match(r'CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?\s*\(', statement, re.I)
+    table = match.group(1)
+    body = statement[match.end():statement.rindex(')')]
+
+    columns, extra = [], []
+    for item in _split_top_level(body):
+        index = re.match(r'(UNIQUE\s+|FULLTEXT\s+)?(?:INDEX|KEY)\s+(\w+)\s*\((.*)\)$', item, re.I | re.S)
+        if index:
+            kind, name, cols = index.groups()
+            if kind and kind.strip().upper() == 'FULLTEXT':
+                continue
+            unique = 'UNIQUE ' if kind else ''
+            extra.append(f"CREATE {unique}INDEX IF NOT EXISTS {_index_name(table, name)} ON {table} ({cols})")
+            continue
+        if re.search(r'\bON\s+UPDATE\s+CURRENT_TIMESTAMP\b', item, re.I):
+            # MySQL actualiza la columna solo; en SQLite lo hace un trigger
+            column = item.split()[0]
+            extra.append(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_{column}_on_update AFTER UPDATE ON {table} "
+                f"FOR EACH ROW WHEN NEW.{column} IS OLD.{column} "
+                f"BEGIN UPDATE {table} SET {column} = CURRENT_TIMESTAMP WHERE rowid = NEW.rowid; END"
+            )
+        columns.append(_column(item))
+
+    create = f"CREATE TABLE IF NOT EXISTS {table} (\n    " + ",\n    ".join(columns) + "\n)"
+    return [create] + extra
+
+
+def translate_schema(script):
+    """
+    Traduce un script DDL de MySQL (como settings/schema.sql) a sentencias
+    SQLite idempotentes (IF NOT EXISTS).
+    """
+    result = []
+    for statement in _schema_statements(script):
+        keyword = ' '.join(statement.split()[:2]).upper()
+        if keyword.startswith('CREATE TABLE'):
+            result.extend(_create_table(statement))
+        elif re.match(r'CREATE\s+(UNIQUE\s+)?INDEX', statement, re.I):
+            match = re.match(r'CREATE\s+(UNIQUE\s+)?INDEX\s+(\w+)\s+ON\s+(\w+)\s*(\(.*\))', statement, re.I | re.S)
+            unique, name, table, cols = match.groups()
+            result.append(f"CREATE {unique or ''}INDEX IF NOT EXISTS {_index_name(table, name)} ON {table} {cols}")
+        elif keyword.startswith('CREATE FULLTEXT'):
+            continue
+        elif re.match(r'CREATE\s+(TRIGGER|VIEW)\s', statement, re.I):
+            result.append(re.sub(r'^CREATE\s+(TRIGGER|VIEW)\s+', r'CREATE \1 IF NOT EXISTS ', statement, flags=re.I))
+        elif keyword.split()[0] in ('USE', 'SET', 'DROP') or keyword.startswith('CREATE DATABASE'):
+            continue
+        else:
+            result.append(translate(statement))
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Traducción de consultas
+# ---------------------------------------------------------------------------
+
+_DATE_ARITHMETIC = re.compile(
+    r'DATE_(SUB|ADD)\(\s*(CURDATE|NOW)\(\)\s*,\s*INTERVAL\s+(%s|\d+)\s+DAY\s*\)', re.I
+)
+_MATCH = re.compile(r'MATCH\s*\(([^)]*)\)\s*AGAINST\s*\(\s*(%s|\?)\s+IN\s+BOOLEAN\s+MODE\s*\)', re.I)
+_UPSERT = re.compile(r'\bON\s+DUPLICATE\s+KEY\s+UPDATE\b(.*)$', re.I | re.S)
+_WRITE = re.compile(r'^\s*(INSERT|UPDATE|DELETE|REPLACE)\b|\bFOR\s+UPDATE\s*$', re.I)
+
+_translations = {}
+
+
+def _date_arithmetic(match):
+    op, func, amount = match.groups()
+    sign = '-' if op.upper() == 'SUB' else '+'
+    func = 'DATE' if func.upper() == 'CURDATE' else 'DATETIME'
+    return f"{func}('now', 'localtime', '{sign}' || {amount} || ' days')"
+
+
+def _upsert(match):
+    # VALUES(col) de MySQL es excluded.col en el upsert de SQLite (3.35+ permite
+    # omitir las columnas del conflicto)
+    assignments = re.sub(r'\bVALUES\s*\(\s*(\w+)\s*\)', r'excluded.\1', match.group(1), flags=re.I)
+    return f"ON CONFLICT DO UPDATE SET{assignments}"
+
+
+def translate(query):
+    """Traduce una consulta con sintaxis MySQL al dialecto de SQLite"""
+    cached = _translations.get(query)
+    if cached is not None:
+        return cached
+
+    sql = _DATE_ARITHMETIC.sub(_date_arithmetic, query)
+    sql = _MATCH.sub(lambda m: f"mysql_match({m.group(2)}, {m.group(1)})", sql)
+    sql = re.sub(r'\bINSERT\s+IGNORE\b', 'INSERT OR IGNORE', sql, flags=re.I)
+    sql = _UPSERT.sub(_upsert, sql)
+    sql = re.sub(r'\bLAST_INSERT_ID\(\)', 'last_insert_rowid()', sql, flags=re.I)
+    sql = re.sub(r'\bCURDATE\(\)', "DATE('now', 'localtime')", sql, flags=re.I)
+    sql = re.sub(r'\bNOW\(\)', "DATETIME('now', 'localtime')", sql, flags=re.I)
+    sql = re.sub(r'\s+FOR\s+UPDATE\s*$', '', sql, flags=re.I)
+    sql = sql.replace('%s', '?').replace('%%', '%')
+
+    if len(_translations) > 1000:
+        _translations.clear()
+    _translations[query] = sql
+    return sql
+
+
+def _match(query, *columns):
+    """
+    Equivalente de MATCH ... AGAINST (... IN BOOLEAN MODE): soporta los
+    operadores +, - y el comodín * al final. Retorna la cantidad de términos
+    encontrados (0 = no coincide).
+    """
+    words = set(normalize(' '.join(c for c in columns if c)).replace('_', ' ').split())
+    words = {re.sub(r'\W', '', w) for w in words}
+    score = 0
+    for term in normalize(query).split():
+        operator = term[0] if term[0] in '+-' else ''
+        term = term.lstrip('+-')
+        prefix = term.endswith('*')
+        term = re.sub(r'\W', '', term)
+        if not term:
+            continue
+        found = any(w.startswith(term) for w in words) if prefix else term in words
+        if operator == '+' and not found or operator == '-' and found:
+            return 0
+        score += found
+    return score
+
+
+# ---------------------------------------------------------------------------
+# Conexiones
+# ---------------------------------------------------------------------------
+
+class SQLiteCursor:
+    """Cursor que acepta la sintaxis MySQL (%s, INSERT IGNORE, ...)"""
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._cursor = connection.raw.cursor()
+
+    def execute(self, operation, params=None):
+        sql = translate(operation)
+        if _WRITE.search(operation):
+            self._connection.begin()
+        return self._cursor.execute(sql, tuple(params or ()))
+
+    def executemany(self, operation, seq_params):
+        sql = translate(operation)
+        self._connection.begin()
+        return self._cursor.executemany(sql, (tuple(p) for p in seq_params))
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size=1):
+        return self._cursor.fetchmany(size)
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def column_names(self):
+        return tuple(d[0] for d in self._cursor.description or ())
+
+    def close(self):
+        self._cursor.close()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SQLiteConnection:
+    """
+    Conexión con la interfaz de mysql-connector que usan los modelos.
+    Las escrituras abren una transacción BEGIN IMMEDIATE (lock de escritura
+    desde el inicio, como SELECT ... FOR UPDATE en InnoDB); close() hace
+    rollback de lo no confirmado y devuelve la conexión al pool.
+    """
+
+    def __init__(self, raw, backend):
+        self.raw = raw
+        self._backend = backend
+
+    def cursor(self, *args, **kwargs):
+        return SQLiteCursor(self)
+
+    def begin(self):
+        if not self.raw.in_transaction:
+            self.raw.execute('BEGIN IMMEDIATE')
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        if self.raw is None:
+            return
+        raw, self.raw = self.raw, None
+        self._backend.release(raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SQLiteBackend:
+    """
+    Base SQLite en un archivo, con el esquema de settings/schema.sql
+    traducido al abrirla por primera vez. Las rutas y los modelos no cambian:
+    la traducción de sintaxis ocurre en el cursor.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path, pool_size=5):
+        self.path = path
+        self.pool_size = pool_size
+        self._idle = []
+        self._idle_pid = None
+        self._in_use = 0
+        self._lock = threading.Lock()
+        self._schema_ready = False
+        self.overflow_count = 0
+
+    @classmethod
+    def from_env(cls, prefix='DB_', pool_size=5):
+        default = os.path.join(tempfile.gettempdir(), 'inventario.sqlite3')
+        return cls(os.getenv(f'{prefix}SQLITE_PATH', default), pool_size)
+
+    def describe(self):
+        return f"sqlite:///{self.path}"
+
+    def _open(self):
+        raw = sqlite3.connect(
+            self.path,
+            timeout=BUSY_TIMEOUT,
+            isolation_level=None,
+            check_same_thread=False,
+            detect_types=sqlite3.PARSE_DECLTYPES
+        )
+        raw.execute('PRAGMA foreign_keys = ON')
+        raw.execute('PRAGMA journal_mode = WAL')
+        raw.execute('PRAGMA synchronous = NORMAL')
+        raw.create_function('mysql_match', -1, _match, deterministic=True)
+        if not self._schema_ready:
+            self.create_schema(raw)
+        return raw
+
+    def create_schema(self, raw):
+        """Crea las tablas que falten a partir de settings/schema.sql"""
+        with self._lock:
+            if self._schema_ready:
+                return
+            with open(SCHEMA_PATH, encoding='utf-8') as f:
+                statements = translate_schema(f.read())
+            raw.execute('BEGIN IMMEDIATE')
+            try:
+                for statement in statements:
+                    raw.execute(statement)
+                raw.commit()
+            except Exception:
+                raw.rollback()
+                raise
+            self._schema_ready = True
+
+    def connect(self):
+        """Obtiene una conexión libre (o abre una nueva)"""
+        with self._lock:
+            if self._idle_pid != os.getpid():
+                # Proceso forkeado: no se reutilizan conexiones del padre
+                self._idle, self._idle_pid, self._in_use = [], os.getpid(), 0
+            raw = self._idle.pop() if self._idle else None
+            self._in_use += 1
+            if raw is None and self._in_use > self.pool_size:
+                self.overflow_count += 1
+        return SQLiteConnection(raw or self._open(), self)
+
+    def release(self, raw):
+        if raw.in_transaction:
+            raw.rollback()
+        with self._lock:
+            self._in_use -= 1
+            if len(self._idle) < self.pool_size:
+                self._idle.append(raw)
+                return
+        raw.close()
+
+    def align_ids(self, connection, table, index, count):
+        """
+        Lleva el autoincremento de 'table' al bloque de ids del shard
+        (desde index * ID_BLOCK + 1). SQLite no intercala ids como MySQL: si
+        se copian filas de un bloque mayor, el contador avanza detrás de ellas;
+        si una mudanza choca con un id existente, se cancela sin cambios.
+        """
+        cursor = connection.cursor()
+        cursor.execute('UPDATE sqlite_sequence SET seq = MAX(seq, %s) WHERE name = %s', (index * ID_BLOCK, table))
+        if cursor.rowcount == 0:
+            cursor.execute('INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)', (table, index * ID_BLOCK))
+        cursor.close()
+
+    def warmup(self):
+        self.connect().close()
+
+    def reset(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        if self._idle_pid == os.getpid():
+            for raw in idle:
+                raw.close()
+
+    def stats(self):
+        with self._lock:
+            return {"size": self.pool_size, "in_use": self._in_use, "overflow": self.overflow_count}
@@ -0,0 +1,93 @@
+# Verificación y reparación de los contadores product_count
+import argparse
+import json
+
+from api.db import db_config
+
+# Filas por UPDATE al reparar
+BATCH_SIZE = 500
+
+# (tabla, conteo real de cada fila)
+COUNTERS = (
+    ('suppliers', 'SELECT COUNT(*) FROM suppliers_products sp WHERE sp.supplier_id = t.id'),
+    ('categories', 'SELECT COUNT(*) FROM products p WHERE p.category_id = t.id'),
+)
+
+
+def find_drift(cursor, user_id=None):
+    """
+    Compara cada contador con el conteo real.
+
+    Returns:
+        dict: Por tabla, lista de (id, guardado, real) de las filas que difieren
+    """
+    where, params = '', ()
+    if user_id is not None:
+        where, params = 'WHERE t.user_id = %s', (user_id,)
+    drift = {}
+    for table, actual in COUNTERS:
+        cursor.execute(f'''
+            SELECT id, product_count, actual FROM (
+                SELECT t.id, t.product_count, ({actual}) as actual
+                FROM {table} t {where}
+            ) c
+            WHERE product_count != actual
+        ''', params)
+        drift[table] = [tuple(row) for row in cursor.fetchall()]
+    return drift
+
+
+def repair(cursor, drift):
+    """Recalcula los contadores de las filas de find_drift (sin commit)"""
+    for table, actual in COUNTERS:
+        ids = [row[0] for row in drift.get(table, [])]
+        for start in range(0, len(ids), BATCH_SIZE):
+            batch = ids[start:start + BATCH_SIZE]
+            cursor.execute(
+                f"UPDATE {table} AS t SET product_count = ({actual}) "
+                f"WHERE t.id IN ({', '.join(['%s'] * len(batch))})",
+                batch
+            )
+
+
+def check_backend(backend, fix=False, user_id=None):
+    """
+    Verifica (y con fix=True repara) los contadores de una base.
+
+    Returns:
+        dict: Filas con diferencias por tabla y si se repararon
+    """
+    connection = backend.connect()
+    cursor = connection.cursor()
+    try:
+        drift = find_drift(cursor, user_id)
+        if fix:
+            repair(cursor, drift)
+            connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+        connection.close()
+    return {
+        "diferencias": {table: len(rows) for table, rows in drift.items()},
+        "ejemplos": {table: rows[:10] for table, rows in drift.items() if rows},
+        "reparado": fix
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica los contadores product_count")
+    parser.add_argument("--reparar", action="store_true", help="Corrige las diferencias encontradas")
+    parser.add_argument("--usuario", type=int, default=None, help="Solo este usuario")
+    args = parser.parse_args()
+
+    for name, backend in db_config.tenant_backends().items():
+        result = check_backend(backend, args.reparar, args.usuario)
+        print(json.dumps({"base": name, **result}, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    # python -m api.db.counters [--reparar]
+    main()
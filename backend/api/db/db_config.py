@@ -1,30 +1,187 @@
-import mysql.connector
+# Módulo de configuración de base de datos
 import os
+import threading
 from contextlib import contextmanager
+from api.db.backends import create_backend
+from api.db.replication import ReplicaRouter, read_request_context
+from api.db.sharding import DIRECTORY, ShardMap, parse_shards, request_user_id
+from api.utils import metrics
+from api.db.tracing import trace_connection
 
-def get_db_connection():
+# Motor de base de datos: 'mysql' (producción) o 'sqlite' (desarrollo y benchmarks)
+BACKEND = os.getenv('DB_BACKEND', 'mysql')
+
+# Motor de la réplica de lectura (vacío = sin réplica); se configura con DB_REPLICA_HOST, ...
+REPLICA_BACKEND = os.getenv('DB_REPLICA_BACKEND', '')
+
+# Shards de tenants (vacío = todos en la base principal); ver api/db/sharding.py
+SHARDS = os.getenv('DB_SHARDS', '')
+
+# Tamaño del pool por proceso (0 = una conexión nueva por petición)
+POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+
+_backend = None
+_router = None
+_shard_map = None
+_backend_lock = threading.Lock()
+
+def get_backend():
+    """Retorna el backend configurado, creándolo si hace falta"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend(BACKEND, 'DB_', POOL_SIZE)
+    return _backend
+
+def get_router():
+    """Retorna el enrutador de lecturas, o None si no hay réplica configurada"""
+    global _router
+    if _router is None and REPLICA_BACKEND:
+        primary = get_backend()
+        with _backend_lock:
+            if _router is None:
+                replica = create_backend(REPLICA_BACKEND, 'DB_REPLICA_', POOL_SIZE)
+                _router = ReplicaRouter(primary, replica)
+    return _router
+
+def get_shard_map():
+    """Retorna el mapa de shards, o None si no hay sharding configurado"""
+    global _shard_map
+    if _shard_map is None and SHARDS:
+        directory = get_backend()
+        with _backend_lock:
+            if _shard_map is None:
+                names, ranges = parse_shards(SHARDS)
+                backends = {
+                    name: directory if name == DIRECTORY else create_backend(
+                        os.getenv(f'DB_SHARD_{name.upper()}_BACKEND', BACKEND),
+                        f'DB_SHARD_{name.upper()}_', POOL_SIZE
+                    )
+                    for name in names
+                }
+                _shard_map = ShardMap(names, ranges, backends, directory)
+    return _shard_map
+
+def tenant_backends():
+    """Bases con datos de tenants por nombre: los shards, o solo la principal"""
+    shard_map = get_shard_map()
+    if shard_map is None:
+        return {DIRECTORY: get_backend()}
+    return dict(shard_map.backends)
+
+def _extra_backends():
+    """Backends además del principal (réplica y shards) ya creados"""
+    extra = [_router.replica] if _router is not None else []
+    if _shard_map is not None:
+        extra += [b for name, b in _shard_map.backends.items() if name != DIRECTORY]
+    return extra
+
+def configure(backend=None, pool_size=None, replica_backend=None, shards=None):
+    """Cambia los motores y/o el tamaño del pool (se aplican a la próxima conexión)"""
+    global BACKEND, POOL_SIZE, REPLICA_BACKEND, SHARDS, _backend, _router, _shard_map
+    backend = backend or BACKEND
+    pool_size = POOL_SIZE if pool_size is None else pool_size
+    replica_backend = REPLICA_BACKEND if replica_backend is None else replica_backend
+    shards = SHARDS if shards is None else shards
+    if (backend, pool_size, replica_backend, shards) != (BACKEND, POOL_SIZE, REPLICA_BACKEND, SHARDS):
+        reset_pool()
+        if _router is not None:
+            _router.stop()
+        BACKEND, POOL_SIZE, REPLICA_BACKEND, SHARDS = backend, pool_size, replica_backend, shards
+        _backend = None
+        _router = None
+        _shard_map = None
+
+def reset_pool():
+    """Descarta el pool actual (se recrea en la próxima conexión)"""
+    if _backend is not None:
+        _backend.reset()
+    for backend in _extra_backends():
+        backend.reset()
+
+def warmup():
+    """Abre las conexiones iniciales del pool"""
+    get_backend().warmup()
+    get_router()
+    get_shard_map()
+    for backend in _extra_backends():
+        backend.warmup()
+
+def get_db_connection(user_id=None):
     """
-    Establece y retorna una conexión a la base de datos MySQL.
-    Usa variables de entorno para la configuración.
+    Establece y retorna una conexión a la base de datos.
+    Usa variables de entorno para la configuración (DB_BACKEND, DB_HOST, ...).
+    La conexión sale del pool del proceso; al cerrarla vuelve al pool.
+    Con sharding, la base es la del tenant (user_id, o el de la ruta actual).
+    Las peticiones de lectura (GET) usan la réplica si hay una configurada,
+    salvo que el usuario haya escrito hace poco o la réplica esté atrasada.
     """
-    connection = mysql.connector.connect(
-        host=os.getenv('DB_HOST', 'localhost'),
-        port=os.getenv('DB_PORT', '3306'),
-        user=os.getenv('DB_USER'),
-        password=os.getenv('DB_PASSWORD'),
-        database=os.getenv('DB_NAME'),
-        charset='utf8mb4',
-        collation='utf8mb4_unicode_ci'
-    )
-    return connection
+    shard_map = get_shard_map()
+    if shard_map is not None:
+        user_id = user_id if user_id is not None else request_user_id()
+        if user_id is not None:
+            backend = shard_map.backend_for(user_id)
+            if backend is not shard_map.directory:
+                return trace_connection(backend.connect())
+
+    router = get_router()
+    read = read_request_context() if router is not None else None
+    if read is None:
+        return trace_connection(get_backend().connect())
+
+    backend, reason = router.choose(*read)
+    target = 'replica' if backend is router.replica else 'primario'
+    metrics.registry.inc("db_read_routing_total", (("destino", target), ("motivo", reason)))
+    return trace_connection(backend.connect())
+
+def pool_stats():
+    """Estado del pool del proceso actual (para métricas)"""
+    if _backend is None:
+        return {"size": 0, "in_use": 0, "overflow": 0}
+    stats = _backend.stats()
+    for backend in _extra_backends():
+        extra = backend.stats()
+        stats = {key: stats[key] + extra[key] for key in stats}
+    return stats
+
+def provision_tenant(user_id):
+    """
+    Copia el registro de users de un usuario nuevo a su shard (las tablas del
+    tenant referencian users). Sin sharding no hace nada.
+    """
+    shard_map = get_shard_map()
+    if shard_map is None:
+        return
+    backend = shard_map.backend_for(user_id)
+    if backend is shard_map.directory:
+        return
+    source = shard_map.directory.connect()
+    try:
+        cursor = source.cursor()
+        cursor.execute('SELECT id, username, password, created_at FROM users WHERE id = %s', (user_id,))
+        row = cursor.fetchone()
+        cursor.close()
+    finally:
+        source.close()
+    target = backend.connect()
+    try:
+        cursor = target.cursor()
+        cursor.execute(
+            'INSERT IGNORE INTO users (id, username, password, created_at) VALUES (%s, %s, %s, %s)', row
+        )
+        target.commit()
+        cursor.close()
+    finally:
+        target.close()
 
 @contextmanager
-def get_db_cursor():
+def get_db_cursor(user_id=None):
     """
     Context manager para manejar conexiones y cursores de base de datos.
     Uso: with get_db_cursor() as cursor:
     """
-    connection = get_db_connection()
+    connection = get_db_connection(user_id)
     cursor = connection.cursor()
     try:
         yield cursor
@@ -0,0 +1,55 @@
+# Recalcula la marca stock.low_stock de todo el inventario
+import argparse
+import json
+import time
+
+from api.db import db_config
+from api.models.stock import Stock
+
+
+def recompute(backend, user_ids=None):
+    """
+    Recalcula stock.low_stock con los umbrales actuales (el general es
+    LOW_STOCK_THRESHOLD) usando Stock.refresh_low_stock: una transacción
+    por usuario, para no bloquear todo el inventario de la base a la vez.
+
+    Returns:
+        dict: Usuarios y filas marcadas como stock bajo, y duración (ms)
+    """
+    start = time.perf_counter()
+    connection = backend.connect()
+    cursor = connection.cursor()
+    try:
+        if user_ids is None:
+            cursor.execute('SELECT DISTINCT user_id FROM stock')
+            user_ids = [row[0] for row in cursor.fetchall()]
+        for user_id in user_ids:
+            Stock.refresh_low_stock(cursor, user_id)
+            connection.commit()
+        cursor.execute('SELECT COUNT(*) FROM stock WHERE low_stock = 1')
+        low = cursor.fetchone()[0]
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+        connection.close()
+    return {"usuarios": len(user_ids), "stock_bajo": low,
+            "umbral_general": Stock.DEFAULT_LOW_STOCK_THRESHOLD,
+            "ms": round((time.perf_counter() - start) * 1000, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalcula la marca de stock bajo")
+    parser.add_argument("--usuario", type=int, action="append", default=None,
+                        help="Solo este usuario (se puede repetir)")
+    args = parser.parse_args()
+
+    for name, backend in db_config.tenant_backends().items():
+        result = recompute(backend, args.usuario)
+        print(json.dumps({"base": name, **result}, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    # python -m api.db.low_stock (después de la migración 006 o de cambiar LOW_STOCK_THRESHOLD)
+    main()
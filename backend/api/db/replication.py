@@ -0,0 +1,202 @@
+# Módulo de enrutamiento de lecturas a una réplica
+import os
+import threading
+import time
+
+from flask import has_request_context, request
+
+from api.utils import metrics
+
+# Segundos que un usuario lee del primario después de escribir (read-your-writes)
+STICKY_SECONDS = float(os.getenv('REPLICA_STICKY_SECONDS', '5'))
+
+# Retraso máximo (segundos) tolerado antes de volver a leer del primario
+MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', '3'))
+
+# Cada cuántos segundos se escribe el latido en el primario y se mide la réplica
+CHECK_INTERVAL = float(os.getenv('REPLICA_CHECK_INTERVAL', '1'))
+
+READ_METHODS = ('GET', 'HEAD')
+
+metrics.describe("db_read_routing_total", "counter", "Conexiones de peticiones de lectura por destino y motivo")
+metrics.describe("db_replica_lag_seconds", "gauge", "Retraso de la réplica medido con el latido de replicación")
+
+
+class ReplicaRouter:
+    """
+    Decide si una conexión de lectura sale de la réplica o del primario.
+
+    El retraso se mide al estilo pt-heartbeat: un thread del proceso escribe
+    time.time() en replication_heartbeat del primario y lee el mismo registro
+    en la réplica; la diferencia es el retraso. Funciona con cualquier
+    replicación (incluso copiando archivos SQLite) y sin permisos de
+    SHOW REPLICA STATUS.
+    """
+
+    def __init__(self, primary, replica, max_lag=MAX_LAG_SECONDS, sticky_seconds=STICKY_SECONDS,
+                 interval=CHECK_INTERVAL):
+        self.primary = primary
+        self.replica = replica
+        self.max_lag = max_lag
+        self.sticky_seconds = sticky_seconds
+        self.interval = interval
+        self.lag = None
+        self._recent_writes = {}
+        self._lock = threading.Lock()
+        self._monitor_pid = None
+        self._stop = threading.Event()
+
+    # -- Retraso -------------------------------------------------------------
+
+    def _write_heartbeat(self):
+        connection = self.primary.connect()
+        try:
+            cursor = connection.cursor()
+            now = time.time()
+            cursor.execute('UPDATE replication_heartbeat SET ts = %s WHERE id = 1', (now,))
+            if cursor.rowcount == 0:
+                cursor.execute('INSERT IGNORE INTO replication_heartbeat (id, ts) VALUES (1, %s)', (now,))
+            connection.commit()
+            cursor.close()
+        finally:
+            connection.close()
+
+    def _read_lag(self):
+        connection = self.replica.connect()
+        try:
+            cursor = connection.cursor()
+            cursor.execute('SELECT ts FROM replication_heartbeat WHERE id = 1')
+            row = cursor.fetchone()
+            cursor.close()
+        finally:
+            connection.close()
+        return time.time() - float(row[0]) if row else None
+
+    def check(self):
+        """Escribe el latido y actualiza el retraso medido (None = réplica no disponible)"""
+        try:
+            self._write_heartbeat()
+        except Exception as e:
+            print(f"ERROR escribiendo latido de replicación: {str(e)}")
+        try:
+            self.lag = self._read_lag()
+        except Exception as e:
+            print(f"ERROR midiendo retraso de la réplica: {str(e)}")
+            self.lag = None
+        metrics.registry.set_gauge("db_replica_lag_seconds", value=self.lag if self.lag is not None else -1)
+        return self.lag
+
+    def _monitor(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def ensure_monitor(self):
+        """Arranca el thread de monitoreo en este proceso (una vez por pid)"""
+        pid = os.getpid()
+        if self._monitor_pid == pid:
+            return
+        with self._lock:
+            if self._monitor_pid != pid:
+                self._monitor_pid = pid
+                self.check()
+                threading.Thread(target=self._monitor, name='replica-monitor', daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def healthy(self):
+        return self.lag is not None and self.lag <= self.max_lag
+
+    # -- Read-your-writes ----------------------------------------------------
+
+    def mark_write(self, user_id):
+        """
+        Registra que el usuario escribió: sus lecturas van al primario un rato.
+        Se anota en el proceso y en replication_recent_writes del primario,
+        para cuando la lectura la atiende otro worker.
+        """
+        until = time.time() + self.sticky_seconds
+        if user_id is None:
+            return until
+        with self._lock:
+            self._recent_writes[user_id] = until
+            if len(self._recent_writes) > 10000:
+                now = time.time()
+                self._recent_writes = {u: t for u, t in self._recent_writes.items() if t > now}
+        connection = self.primary.connect()
+        try:
+            cursor = connection.cursor()
+            cursor.execute('''
+                INSERT INTO replication_recent_writes (user_id, primary_until) VALUES (%s, %s)
+                ON DUPLICATE KEY UPDATE primary_until = VALUES(primary_until)
+            ''', (user_id, until))
+            connection.commit()
+            cursor.close()
+        finally:
+            connection.close()
+        return until
+
+    def _shared_until(self, user_id):
+        """Hasta cuándo lee del primario el usuario, según lo anotado por todos los workers"""
+        connection = self.primary.connect()
+        try:
+            cursor = connection.cursor()
+            cursor.execute('SELECT primary_until FROM replication_recent_writes WHERE user_id = %s', (user_id,))
+            row = cursor.fetchone()
+            cursor.close()
+        finally:
+            connection.close()
+        return float(row[0]) if row else 0
+
+    def is_sticky(self, user_id):
+        """
+        True si el usuario escribió hace menos de sticky_seconds, en este
+        proceso o en otro (una consulta por clave primaria al primario). Si
+        no se puede consultar, se asume que sí.
+        """
+        if user_id is None:
+            return False
+        now = time.time()
+        if self._recent_writes.get(user_id, 0) > now:
+            return True
+        try:
+            return self._shared_until(user_id) > now
+        except Exception as e:
+            print(f"ERROR consultando escrituras recientes: {str(e)}")
+            return True
+
+    # -- Selección -----------------------------------------------------------
+
+    def choose(self, user_id=None):
+        """Retorna (backend, motivo) para una conexión de lectura"""
+        self.ensure_monitor()
+        if not self.healthy():
+            return self.primary, 'retraso'
+        if self.is_sticky(user_id):
+            return self.primary, 'escritura_reciente'
+        return self.replica, 'replica'
+
+
+def read_request_context():
+    """
+    Si la petición actual es de solo lectura, retorna (user_id,); si no
+    (escrituras, o fuera de una petición), retorna None.
+    """
+    if not has_request_context() or request.method not in READ_METHODS:
+        return None
+    return ((request.view_args or {}).get('user_id'),)
+
+
+def init_app(app, router_getter):
+    """Marca a los usuarios que escriben para que lean sus propios cambios"""
+
+    @app.after_request
+    def _mark_write(response):
+        router = router_getter()
+        if router is None or request.method in READ_METHODS or response.status_code >= 400:
+            return response
+        try:
+            router.mark_write((request.view_args or {}).get('user_id'))
+        except Exception as e:
+            print(f"ERROR registrando escritura reciente: {str(e)}")
+        return response
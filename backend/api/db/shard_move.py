@@ -0,0 +1,412 @@
+# Herramienta para mover un tenant entre shards sin detener la API
+import argparse
+import json
+import sys
+import time
+
+from api.db import db_config
+from api.db.sharding import FROZEN_ERROR, MAP_TTL
+
+# Tablas de un tenant en orden de dependencias: (tabla, clave primaria, filtro)
+TENANT_TABLES = [
+    ('users', ('id',), 'id = %s'),
+    ('categories', ('id',), 'user_id = %s'),
+    ('category_tree', ('ancestor_id', 'descendant_id'), 'user_id = %s'),
+    ('products', ('id',), 'user_id = %s'),
+    ('stock', ('product_id',), 'user_id = %s'),
+    ('suppliers', ('id',), 'user_id = %s'),
+    ('suppliers_products', ('supplier_id', 'product_id'), 'user_id = %s'),
+    ('purchase_orders', ('id',), 'user_id = %s'),
+    ('order_products', ('id',), 'order_id IN (SELECT id FROM purchase_orders WHERE user_id = %s)'),
+    ('purchase_orders_history', ('id',), 'user_id = %s'),
+    ('order_products_history', ('id',), 'user_id = %s'),
+    ('idempotency_keys', ('user_id', 'idem_key'), 'user_id = %s'),
+]
+
+# Tablas con id autoincremental (que debe ser único entre shards)
+AUTO_INCREMENT_TABLES = ['categories', 'products', 'suppliers', 'purchase_orders', 'order_products']
+
+# Filas por lote: cada lote es una transacción corta en el destino
+BATCH_SIZE = 1000
+
+# Margen (segundos) sobre DB_SHARD_MAP_TTL antes de borrar el origen, para que
+# ningún proceso siga leyendo de él con el mapa viejo
+FREEZE_MARGIN = 2.0
+
+# Claves por consulta al leer las filas cambiadas
+KEYS_PER_QUERY = 500
+
+
+def _fetch(backend, table, pk, where, user_id, keys=None):
+    """
+    Filas del tenant en 'table' como {clave primaria: fila}; con 'keys',
+    solo las de esas claves primarias.
+    """
+    if keys is None:
+        queries = [(f'SELECT * FROM {table} WHERE {where}', (user_id,))]
+    else:
+        condition = ' AND '.join(f'{col} = %s' for col in pk)
+        queries = []
+        for start in range(0, len(keys), KEYS_PER_QUERY):
+            batch = keys[start:start + KEYS_PER_QUERY]
+            matches = ' OR '.join(f'({condition})' for _ in batch)
+            queries.append((f'SELECT * FROM {table} WHERE {where} AND ({matches})',
+                            (user_id,) + tuple(value for key in batch for value in key)))
+
+    columns, rows = None, []
+    connection = backend.connect()
+    try:
+        cursor = connection.cursor()
+        for sql, params in queries:
+            cursor.execute(sql, params)
+            columns = [d[0] for d in cursor.description]
+            rows += cursor.fetchall()
+        cursor.close()
+    finally:
+        connection.close()
+    if columns is None:
+        return None, {}
+    positions = [columns.index(col) for col in pk]
+    return columns, {tuple(row[i] for i in positions): tuple(row) for row in rows}
+
+
+def _run_batches(backend, sql, rows):
+    """Ejecuta 'sql' para cada fila, en transacciones de BATCH_SIZE filas"""
+    for start in range(0, len(rows), BATCH_SIZE):
+        connection = backend.connect()
+        try:
+            cursor = connection.cursor()
+            cursor.executemany(sql, rows[start:start + BATCH_SIZE])
+            connection.commit()
+            cursor.close()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+
+def sync_tenant(source, target, user_id, changed=None):
+    """
+    Deja en 'target' las mismas filas del tenant que hay en 'source'
+    (inserta, actualiza y borra por diferencia de clave primaria).
+
+    Args:
+        changed (dict): Tabla -> claves primarias a sincronizar (de
+            changed_keys); sin él se comparan todas las filas del tenant
+
+    Returns:
+        dict: tabla -> {"insertadas", "actualizadas", "borradas"}
+    """
+    summary = {}
+    missing_by_table = {}
+    for table, pk, where in TENANT_TABLES:
+        keys = None if changed is None else changed.get(table, [])
+        if keys == []:
+            summary[table] = {"insertadas": 0, "actualizadas": 0, "borradas": 0}
+            missing_by_table[table] = []
+            continue
+        columns, wanted = _fetch(source, table, pk, where, user_id, keys)
+        # Se lee el destino recién ahora: los triggers (ej: stock) ya corrieron
+        target_columns, current = _fetch(target, table, pk, where, user_id, keys)
+        columns = columns or target_columns
+
+        inserts = [row for key, row in wanted.items() if key not in current]
+        updates = [row for key, row in wanted.items() if key in current and current[key] != row]
+        missing_by_table[table] = [key for key in current if key not in wanted]
+
+        cols = ', '.join(columns)
+        if inserts:
+            placeholders = ', '.join(['%s'] * len(columns))
+            _run_batches(target, f'INSERT INTO {table} ({cols}) VALUES ({placeholders})', inserts)
+        if updates:
+            positions = [columns.index(col) for col in pk]
+            assignments = ', '.join(f'{col} = %s' for col in columns)
+            condition = ' AND '.join(f'{col} = %s' for col in pk)
+            _run_batches(
+                target, f'UPDATE {table} SET {assignments} WHERE {condition}',
+                [row + tuple(row[i] for i in positions) for row in updates]
+            )
+        summary[table] = {"insertadas": len(inserts), "actualizadas": len(updates), "borradas": 0}
+
+    # Los borrados van en orden inverso (primero las tablas hijas)
+    for table, pk, _ in reversed(TENANT_TABLES):
+        if missing_by_table[table]:
+            condition = ' AND '.join(f'{col} = %s' for col in pk)
+            _run_batches(target, f'DELETE FROM {table} WHERE {condition}', missing_by_table[table])
+            summary[table]["borradas"] = len(missing_by_table[table])
+    return summary
+
+
+def capture_triggers(dialect='mysql'):
+    """
+    Sentencias de los triggers que anotan en tenant_changes la clave de
+    cada fila escrita de un tenant, mientras figure en tenant_capture
+    (sin esa fila, el INSERT ... SELECT no inserta nada), y que rechazan la
+    escritura con FROZEN_ERROR si el tenant está congelado (frozen = 1).
+
+    En MySQL la fila de tenant_capture se lee con LOCK IN SHARE MODE: el
+    UPDATE que congela espera a que confirmen las transacciones que ya
+    escribieron filas del tenant, y las que escriben después ven frozen = 1.
+    En SQLite las escrituras ya están serializadas (BEGIN IMMEDIATE).
+    """
+    statements = []
+    for table, pk, _ in TENANT_TABLES:
+        for event, row in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+            if table == 'users':
+                owner = f'{row}.id'
+            elif table == 'order_products':
+                owner = f'(SELECT user_id FROM purchase_orders WHERE id = {row}.order_id)'
+            else:
+                owner = f'{row}.user_id'
+            second = f'{row}.{pk[1]}' if len(pk) > 1 else 'NULL'
+            name = f'{table}_capture_{event.lower()}'
+            statements.append(f'DROP TRIGGER IF EXISTS {name}')
+            if dialect == 'sqlite':
+                fence = (f"SELECT RAISE(ABORT, '{FROZEN_ERROR}') FROM tenant_capture "
+                         f"WHERE user_id = {owner} AND frozen = 1; ")
+            else:
+                fence = (f"IF (SELECT frozen FROM tenant_capture WHERE user_id = {owner} LOCK IN SHARE MODE) THEN "
+                         f"SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = '{FROZEN_ERROR}'; END IF; ")
+            statements.append(
+                f"CREATE TRIGGER {name} AFTER {event} ON {table} FOR EACH ROW BEGIN "
+                f"{fence}"
+                f"INSERT INTO tenant_changes (user_id, table_name, key1, key2) "
+                f"SELECT user_id, '{table}', {row}.{pk[0]}, {second} "
+                f"FROM tenant_capture WHERE user_id = {owner}; END"
+            )
+    return statements
+
+
+def install_capture(backend):
+    """Crea (o recrea) los triggers de captura de cambios en la base"""
+    connection = backend.connect()
+    try:
+        cursor = connection.cursor()
+        for statement in capture_triggers(backend.name):
+            cursor.execute(statement)
+        connection.commit()
+        cursor.close()
+    finally:
+        connection.close()
+
+
+def _set_capture(backend, user_id, enabled):
+    """Empieza a anotar los cambios del tenant, o deja de hacerlo y borra los anotados"""
+    connection = backend.connect()
+    try:
+        cursor = connection.cursor()
+        cursor.execute('DELETE FROM tenant_changes WHERE user_id = %s', (user_id,))
+        cursor.execute('DELETE FROM tenant_capture WHERE user_id = %s', (user_id,))
+        if enabled:
+            cursor.execute('INSERT INTO tenant_capture (user_id) VALUES (%s)', (user_id,))
+        connection.commit()
+        cursor.close()
+    finally:
+        connection.close()
+
+
+def changed_keys(backend, user_id):
+    """
+    Claves de las filas del tenant escritas desde que empezó la captura.
+
+    Se leen siempre todas las anotadas (no solo las posteriores a la pasada
+    anterior): un id de tenant_changes asignado por una transacción que
+    confirmó tarde puede ser menor que otro ya leído.
+
+    Returns:
+        tuple: (tabla -> [claves primarias], último id de tenant_changes)
+    """
+    pk_sizes = {table: len(pk) for table, pk, _ in TENANT_TABLES}
+    connection = backend.connect()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(
+            'SELECT DISTINCT table_name, key1, key2 FROM tenant_changes WHERE user_id = %s',
+            (user_id,)
+        )
+        rows = cursor.fetchall()
+        cursor.execute('SELECT MAX(id) FROM tenant_changes WHERE user_id = %s', (user_id,))
+        last_id = cursor.fetchone()[0] or 0
+        cursor.close()
+    finally:
+        connection.close()
+    changed = {}
+    for table, key1, key2 in rows:
+        changed.setdefault(table, []).append((key1, key2)[:pk_sizes[table]])
+    return changed, last_id
+
+
+def _freeze(backend, user_id):
+    """
+    Congela las escrituras del tenant en la base (los triggers de captura
+    las rechazan desde que confirma). En MySQL el UPDATE espera a que
+    confirmen las transacciones en curso que ya escribieron filas del
+    tenant, así al volver ninguna escritura puede llegar al origen.
+    """
+    connection = backend.connect()
+    try:
+        cursor = connection.cursor()
+        cursor.execute('UPDATE tenant_capture SET frozen = 1 WHERE user_id = %s', (user_id,))
+        connection.commit()
+        cursor.close()
+    finally:
+        connection.close()
+
+
+def delete_tenant(backend, user_id, keep_user=False):
+    """Borra por lotes las filas del tenant (keep_user: conserva el registro de users)"""
+    for table, pk, where in reversed(TENANT_TABLES):
+        if table == 'users' and keep_user:
+            continue
+        _, rows = _fetch(backend, table, pk, where, user_id)
+        condition = ' AND '.join(f'{col} = %s' for col in pk)
+        _run_batches(backend, f'DELETE FROM {table} WHERE {condition}', list(rows))
+
+
+def count_rows(backend, user_id):
+    """Cantidad de filas del tenant por tabla"""
+    counts = {}
+    connection = backend.connect()
+    try:
+        cursor = connection.cursor()
+        for table, _, where in TENANT_TABLES:
+            cursor.execute(f'SELECT COUNT(*) FROM {table} WHERE {where}', (user_id,))
+            counts[table] = cursor.fetchone()[0]
+        cursor.close()
+    finally:
+        connection.close()
+    return counts
+
+
+def _set_assignment(shard_map, user_id, shard, status):
+    """Guarda (o borra, si coincide con la regla) la asignación del tenant"""
+    connection = shard_map.directory.connect()
+    try:
+        cursor = connection.cursor()
+        cursor.execute('DELETE FROM tenant_shards WHERE user_id = %s', (user_id,))
+        if status != 'active' or shard != shard_map.rule_shard(user_id):
+            cursor.execute(
+                'INSERT INTO tenant_shards (user_id, shard, status) VALUES (%s, %s, %s)',
+                (user_id, shard, status)
+            )
+        connection.commit()
+        cursor.close()
+    finally:
+        connection.close()
+    shard_map.overrides(force=True)
+
+
+def align_ids(shard_map, name):
+    """Ajusta los autoincrementales del shard a su espacio de ids"""
+    backend = shard_map.backends[name]
+    connection = backend.connect()
+    try:
+        for table in AUTO_INCREMENT_TABLES:
+            backend.align_ids(connection, table, shard_map.index_of(name), len(shard_map.names))
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def move_tenant(shard_map, user_id, target_name, log=print):
+    """
+    Mueve un tenant a otro shard con la API funcionando.
+
+    1. Empieza a anotar en el origen las filas que escribe el tenant
+       (tenant_changes, con los triggers de captura).
+    2. Copia inicial completa y una segunda pasada solo con las filas anotadas
+       (lecturas y escrituras siguen en el origen).
+    3. Congela las escrituras del tenant: tenant_shards.status = 'moving' (cada
+       escritura consulta su estado sin caché y recibe 503 con Retry-After) y,
+       en el origen, tenant_capture.frozen = 1, con lo que los triggers rechazan
+       también las que pasaron ese chequeo antes del congelamiento.
+    4. Última sincronización, otra vez solo con las filas anotadas, y
+       verificación de cantidades.
+    5. Apunta el tenant al destino y descongela en el mismo cambio (el origen
+       sigue rechazando escrituras de procesos con el mapa viejo).
+    6. Espera DB_SHARD_MAP_TTL (para que nadie lea del origen con el mapa
+       viejo) y borra los datos del origen por lotes.
+
+    Las escrituras quedan bloqueadas solo en los pasos 3 a 5, cuyo costo
+    depende de las filas escritas durante la mudanza y no del tamaño del tenant
+    (salvo el conteo de verificación, que usa los índices por user_id).
+    """
+    source_name = shard_map.shard_for(user_id)
+    if target_name not in shard_map.backends:
+        raise ValueError(f"Shard desconocido: {target_name}")
+    if source_name == target_name:
+        raise ValueError(f"El usuario {user_id} ya está en el shard {target_name}")
+    source, target = shard_map.backends[source_name], shard_map.backends[target_name]
+    start = time.perf_counter()
+
+    log(f"→ Copiando usuario {user_id}: {source_name} → {target_name}")
+    install_capture(source)
+    _set_capture(source, user_id, True)
+    try:
+        log(f"  copia inicial: {json.dumps(sync_tenant(source, target, user_id))}")
+        changed, _ = changed_keys(source, user_id)
+        log(f"  cambios durante la copia: {json.dumps(sync_tenant(source, target, user_id, changed))}")
+
+        _set_assignment(shard_map, user_id, source_name, 'moving')
+        frozen_at = time.perf_counter()
+        _freeze(source, user_id)
+        changed, _ = changed_keys(source, user_id)
+        log(f"  sincronización final: {json.dumps(sync_tenant(source, target, user_id, changed))}")
+        expected, copied = count_rows(source, user_id), count_rows(target, user_id)
+        if expected != copied:
+            raise RuntimeError(f"Cantidades distintas tras copiar: {expected} != {copied}")
+        align_ids(shard_map, target_name)
+        _set_assignment(shard_map, user_id, target_name, 'active')
+        frozen = time.perf_counter() - frozen_at
+    except Exception:
+        # Cancelada (ej: un id copiado ya existe en el destino): el origen sigue intacto
+        log("❌ Mudanza cancelada, se descarta la copia")
+        _set_assignment(shard_map, user_id, source_name, 'active')
+        _set_capture(source, user_id, False)
+        delete_tenant(target, user_id, keep_user=target is shard_map.directory)
+        raise
+
+    # Los procesos que no escriben pueden tener el mapa viejo hasta DB_SHARD_MAP_TTL
+    time.sleep(MAP_TTL + FREEZE_MARGIN)
+    _set_capture(source, user_id, False)
+    delete_tenant(source, user_id, keep_user=source is shard_map.directory)
+    log(f"✅ Usuario {user_id} movido en {time.perf_counter() - start:.1f}s "
+        f"(escrituras bloqueadas {frozen:.1f}s)")
+    return {"origen": source_name, "destino": target_name, "filas": copied,
+            "segundos_bloqueado": round(frozen, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Administración de shards de tenants")
+    commands = parser.add_subparsers(dest="comando", required=True)
+    commands.add_parser("preparar", help="Ajusta los ids autoincrementales de cada shard "
+                                         "y crea los triggers de captura de cambios")
+    where = commands.add_parser("ubicar", help="Muestra el shard de un usuario")
+    where.add_argument("user_id", type=int)
+    move = commands.add_parser("mover", help="Mueve un usuario a otro shard")
+    move.add_argument("user_id", type=int)
+    move.add_argument("shard")
+    args = parser.parse_args()
+
+    shard_map = db_config.get_shard_map()
+    if shard_map is None:
+        print("❌ Configurar DB_SHARDS para usar esta herramienta")
+        sys.exit(2)
+
+    if args.comando == "preparar":
+        for name in shard_map.names:
+            align_ids(shard_map, name)
+            install_capture(shard_map.backends[name])
+            print(f"✅ {name}: {shard_map.backends[name].describe()}")
+    elif args.comando == "ubicar":
+        name = shard_map.shard_for(args.user_id)
+        print(json.dumps({"user_id": args.user_id, "shard": name,
+                          "filas": count_rows(shard_map.backends[name], args.user_id)}))
+    else:
+        move_tenant(shard_map, args.user_id, args.shard.lower())
+
+
+if __name__ == '__main__':
+    # python -m api.db.shard_move mover <user_id> <shard>
+    main()
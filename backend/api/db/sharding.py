@@ -0,0 +1,177 @@
+# Módulo de particionado de tenants (user_id) entre varias bases
+import os
+import threading
+import time
+
+from flask import has_request_context, jsonify, request
+
+# Formato de DB_SHARDS: "a,b" (hash: user_id % cantidad) o "a:1-50000,b:50001-"
+# (rangos de user_id). 'principal' es la base configurada con DB_*; el resto se
+# configura con DB_SHARD_<NOMBRE>_BACKEND, DB_SHARD_<NOMBRE>_HOST, ...
+
+# Segundos que un proceso reutiliza las asignaciones de tenant_shards
+MAP_TTL = float(os.getenv('DB_SHARD_MAP_TTL', '1'))
+
+# Con SQLite, los ids autoincrementales de cada shard empiezan en índice * ID_BLOCK
+# para que un tenant se mueva conservando sus ids (con MySQL se intercalan con
+# auto_increment_offset; ver 'preparar' en api.db.shard_move)
+ID_BLOCK = 100_000_000
+
+DIRECTORY = 'principal'
+
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+# Mensaje con el que los triggers de captura rechazan las escrituras de un
+# tenant congelado (ver api.db.shard_move)
+FROZEN_ERROR = 'tenant_congelado'
+
+
+def parse_shards(spec):
+    """
+    Interpreta DB_SHARDS.
+
+    Returns:
+        tuple: (nombres en orden, rangos [(desde, hasta|None, nombre)] o None si es hash)
+    """
+    names, ranges = [], []
+    for item in (part.strip() for part in spec.split(',')):
+        if not item:
+            continue
+        name, _, bounds = item.partition(':')
+        names.append(name.strip().lower())
+        if bounds:
+            start, _, end = bounds.partition('-')
+            ranges.append((int(start), int(end) if end.strip() else None, names[-1]))
+    if ranges and len(ranges) != len(names):
+        raise ValueError("DB_SHARDS: o todos los shards tienen rango o ninguno")
+    return names, (ranges or None)
+
+
+class ShardMap:
+    """
+    Resuelve en qué base vive cada tenant.
+
+    La regla (hash o rangos) da el shard por defecto; la tabla tenant_shards
+    de la base principal guarda las excepciones (tenants movidos) y el estado
+    'moving', durante el cual el tenant no acepta escrituras.
+    """
+
+    def __init__(self, names, ranges, backends, directory):
+        self.names = names
+        self.ranges = ranges
+        self.backends = backends
+        self.directory = directory
+        self._overrides = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def rule_shard(self, user_id):
+        """Shard que corresponde al tenant según la regla configurada"""
+        if self.ranges is None:
+            return self.names[int(user_id) % len(self.names)]
+        for start, end, name in self.ranges:
+            if int(user_id) >= start and (end is None or int(user_id) <= end):
+                return name
+        raise ValueError(f"El usuario {user_id} no entra en ningún rango de DB_SHARDS")
+
+    def _load_overrides(self):
+        connection = self.directory.connect()
+        try:
+            cursor = connection.cursor()
+            cursor.execute('SELECT user_id, shard, status FROM tenant_shards')
+            rows = cursor.fetchall()
+            cursor.close()
+        finally:
+            connection.close()
+        return {user_id: (shard, status) for user_id, shard, status in rows}
+
+    def overrides(self, force=False):
+        now = time.monotonic()
+        if force or now - self._loaded_at > MAP_TTL:
+            with self._lock:
+                if force or now - self._loaded_at > MAP_TTL:
+                    self._overrides = self._load_overrides()
+                    self._loaded_at = time.monotonic()
+        return self._overrides
+
+    def refresh(self, user_id):
+        """Relee (sin caché) la asignación de un tenant; para las escrituras"""
+        connection = self.directory.connect()
+        try:
+            cursor = connection.cursor()
+            cursor.execute('SELECT shard, status FROM tenant_shards WHERE user_id = %s', (int(user_id),))
+            row = cursor.fetchone()
+            cursor.close()
+        finally:
+            connection.close()
+        with self._lock:
+            overrides = dict(self._overrides)
+            if row is None:
+                overrides.pop(int(user_id), None)
+            else:
+                overrides[int(user_id)] = tuple(row)
+            self._overrides = overrides
+
+    def shard_for(self, user_id):
+        """Nombre del shard donde viven los datos del tenant"""
+        override = self.overrides().get(int(user_id))
+        return override[0] if override else self.rule_shard(user_id)
+
+    def backend_for(self, user_id):
+        return self.backends[self.shard_for(user_id)]
+
+    def is_frozen(self, user_id):
+        """True si el tenant se está moviendo (escrituras bloqueadas)"""
+        override = self.overrides().get(int(user_id))
+        return override is not None and override[1] == 'moving'
+
+    def index_of(self, name):
+        return self.names.index(name) if name in self.names else 0
+
+
+def request_user_id():
+    """user_id de la ruta actual (/usuario/<user_id>/...), si lo hay"""
+    if not has_request_context():
+        return None
+    return (request.view_args or {}).get('user_id')
+
+
+def _frozen_response():
+    response = jsonify({"error": "Cuenta en mantenimiento, reintentar en unos segundos"})
+    response.headers['Retry-After'] = str(int(MAP_TTL) + 1)
+    return response, 503
+
+
+def init_app(app, map_getter):
+    """
+    Rechaza escrituras de tenants que se están moviendo de shard. Cada
+    escritura relee la asignación de su tenant (una consulta por clave
+    primaria), así el congelamiento y el cambio de shard rigen al instante
+    en todos los procesos sin esperar DB_SHARD_MAP_TTL.
+
+    Una escritura que pasó el chequeo antes del congelamiento la rechazan
+    los triggers de captura en el origen; la ruta responde 500 con el error
+    de la base y aquí se convierte en el mismo 503.
+    """
+
+    @app.before_request
+    def _reject_frozen_writes():
+        shard_map = map_getter()
+        if shard_map is None or request.method not in WRITE_METHODS:
+            return None
+        user_id = request_user_id()
+        if user_id is None:
+            return None
+        shard_map.refresh(user_id)
+        if shard_map.is_frozen(user_id):
+            return _frozen_response()
+        return None
+
+    @app.after_request
+    def _frozen_by_trigger(response):
+        if (response.status_code == 500 and request.method in WRITE_METHODS
+                and FROZEN_ERROR in response.get_data(as_text=True)):
+            frozen, status = _frozen_response()
+            frozen.status_code = status
+            return frozen
+        return response
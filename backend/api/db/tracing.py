@@ -0,0 +1,87 @@
+# Módulo de registro de consultas SQL (línea de tiempo para el perfilado)
+import re
+import time
+
+from flask import g, has_request_context
+
+# Largo máximo de cada sentencia guardada en la línea de tiempo
+MAX_SQL_LENGTH = 500
+
+
+def tracing_enabled():
+    """Indica si la petición actual está registrando sus consultas"""
+    return has_request_context() and g.get('sql_timeline') is not None
+
+
+class TracingCursor:
+    """Cursor que registra cada consulta (inicio, duración y filas) en g.sql_timeline"""
+
+    def __init__(self, cursor, timeline, origin):
+        self._cursor = cursor
+        self._timeline = timeline
+        self._origin = origin
+
+    def _record(self, operation, start, params_count):
+        end = time.perf_counter()
+        self._timeline.append({
+            "inicio_ms": round((start - self._origin) * 1000, 3),
+            "duracion_ms": round((end - start) * 1000, 3),
+            "sql": re.sub(r'\s+', ' ', str(operation)).strip()[:MAX_SQL_LENGTH],
+            "parametros": params_count,
+            "filas": getattr(self._cursor, 'rowcount', -1)
+        })
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, params, *args, **kwargs)
+        finally:
+            self._record(operation, start, len(params) if params else 0)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        seq_params = list(seq_params)
+        start = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            self._record(operation, start, len(seq_params))
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class TracingConnection:
+    """Conexión cuyos cursores registran las consultas ejecutadas"""
+
+    def __init__(self, connection, timeline, origin):
+        self._connection = connection
+        self._timeline = timeline
+        self._origin = origin
+
+    def cursor(self, *args, **kwargs):
+        return TracingCursor(self._connection.cursor(*args, **kwargs), self._timeline, self._origin)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._connection.close()
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+def trace_connection(connection):
+    """Envuelve la conexión si la petición actual se está perfilando"""
+    if not tracing_enabled():
+        return connection
+    return TracingConnection(connection, g.sql_timeline, g.sql_timeline_origin)
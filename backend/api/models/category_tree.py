@@ -0,0 +1,177 @@
+from api.db.db_config import get_db_connection
+
+
+class CategoryTree:
+    """
+    Jerarquía de categorías guardada como tabla de clausura: category_tree
+    tiene una fila (ancestro, descendiente, profundidad) por cada camino,
+    incluida la de cada categoría consigo misma (profundidad 0). Los métodos
+    que reciben un cursor trabajan en su transacción (sin commit).
+    """
+
+    @staticmethod
+    def validate_parent(cursor, user_id, category_id, parent_id):
+        """
+        Retorna un mensaje de error si 'parent_id' no puede ser padre de
+        'category_id' (no existe o crearía un ciclo), None si es válido.
+        """
+        if parent_id is None:
+            return None
+        if not isinstance(parent_id, int) or isinstance(parent_id, bool):
+            return "parent_id debe ser un id de categoría"
+        cursor.execute(
+            'SELECT id FROM categories WHERE id = %s AND user_id = %s',
+            (parent_id, user_id)
+        )
+        if not cursor.fetchone():
+            return "Categoría padre no encontrada"
+        if category_id is not None:
+            cursor.execute(
+                'SELECT 1 FROM category_tree WHERE ancestor_id = %s AND descendant_id = %s',
+                (category_id, parent_id)
+            )
+            if cursor.fetchone():
+                return "Una categoría no puede moverse dentro de sí misma"
+        return None
+
+    @staticmethod
+    def add(cursor, user_id, category_id, parent_id=None):
+        """Agrega una categoría nueva como hoja de 'parent_id' (o como raíz)"""
+        cursor.execute('''
+            INSERT INTO category_tree (ancestor_id, descendant_id, depth, user_id)
+            SELECT ancestor_id, %s, depth + 1, user_id
+            FROM category_tree
+            WHERE descendant_id = %s
+            UNION ALL
+            SELECT %s, %s, 0, %s
+        ''', (category_id, parent_id, category_id, category_id, user_id))
+
+    @staticmethod
+    def move(cursor, user_id, category_id, parent_id):
+        """
+        Mueve la categoría y todo su subárbol bajo 'parent_id' (None = raíz)
+        con tres sentencias, sin importar el tamaño del subárbol: borra los
+        caminos desde los ancestros actuales, crea los caminos desde los
+        nuevos y actualiza parent_id. Llamar antes validate_parent.
+        """
+        # Las subconsultas van envueltas en una tabla derivada: MySQL no permite
+        # leer directamente la tabla que modifica el DELETE
+        cursor.execute('''
+            DELETE FROM category_tree
+            WHERE descendant_id IN (
+                SELECT descendant_id FROM (
+                    SELECT descendant_id FROM category_tree WHERE ancestor_id = %s
+                ) subtree
+            )
+            AND ancestor_id NOT IN (
+                SELECT descendant_id FROM (
+                    SELECT descendant_id FROM category_tree WHERE ancestor_id = %s
+                ) subtree_again
+            )
+        ''', (category_id, category_id))
+        if parent_id is not None:
+            cursor.execute('''
+                INSERT INTO category_tree (ancestor_id, descendant_id, depth, user_id)
+                SELECT a.ancestor_id, d.descendant_id, a.depth + d.depth + 1, %s
+                FROM category_tree a
+                JOIN category_tree d ON d.ancestor_id = %s
+                WHERE a.descendant_id = %s
+            ''', (user_id, category_id, parent_id))
+        cursor.execute(
+            'UPDATE categories SET parent_id = %s WHERE id = %s AND user_id = %s',
+            (parent_id, category_id, user_id)
+        )
+
+    @staticmethod
+    def remove(cursor, user_id, category_id):
+        """
+        Quita la categoría del árbol antes de borrarla: sus hijas pasan a su
+        padre y los caminos que la atravesaban se acortan en un nivel.
+        """
+        cursor.execute(
+            'SELECT parent_id FROM categories WHERE id = %s AND user_id = %s',
+            (category_id, user_id)
+        )
+        row = cursor.fetchone()
+        parent_id = row[0] if row else None
+        cursor.execute('''
+            UPDATE category_tree SET depth = depth - 1
+            WHERE descendant_id IN (
+                SELECT descendant_id FROM (
+                    SELECT descendant_id FROM category_tree WHERE ancestor_id = %s AND depth > 0
+                ) below
+            )
+            AND ancestor_id IN (
+                SELECT ancestor_id FROM (
+                    SELECT ancestor_id FROM category_tree WHERE descendant_id = %s AND depth > 0
+                ) above
+            )
+        ''', (category_id, category_id))
+        cursor.execute(
+            'DELETE FROM category_tree WHERE ancestor_id = %s OR descendant_id = %s',
+            (category_id, category_id)
+        )
+        cursor.execute(
+            'UPDATE categories SET parent_id = %s WHERE parent_id = %s AND user_id = %s',
+            (parent_id, category_id, user_id)
+        )
+
+    @classmethod
+    def aggregates(cls, user_id, root_id=None):
+        """
+        Categorías con los totales de su subárbol (ella y sus descendientes):
+        productos, unidades en stock y valorización (unidades × precio). Un
+        solo JOIN sobre la tabla de clausura, sin recorrer el árbol en Python.
+
+        Args:
+            root_id (int): Solo esta categoría y sus descendientes (opcional)
+
+        Returns:
+            list: Un diccionario por categoría (depth 0 = raíz), o None si
+            root_id no existe
+        """
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        try:
+            scope, params = '', [user_id]
+            if root_id is not None:
+                cursor.execute(
+                    'SELECT id FROM categories WHERE id = %s AND user_id = %s',
+                    (root_id, user_id)
+                )
+                if not cursor.fetchone():
+                    return None
+                scope = ' AND c.id IN (SELECT descendant_id FROM category_tree WHERE ancestor_id = %s)'
+                params.append(root_id)
+
+            cursor.execute(f'''
+                SELECT c.id, c.name, c.parent_id, c.product_count,
+                       (SELECT MAX(depth) FROM category_tree WHERE descendant_id = c.id) as depth,
+                       COUNT(p.id) as products,
+                       COALESCE(SUM(s.quantity), 0) as units,
+                       COALESCE(SUM(s.quantity * p.price), 0) as value
+                FROM categories c
+                JOIN category_tree t ON t.ancestor_id = c.id
+                LEFT JOIN products p ON p.category_id = t.descendant_id
+                LEFT JOIN stock s ON s.product_id = p.id
+                WHERE c.user_id = %s{scope}
+                GROUP BY c.id, c.name, c.parent_id, c.product_count
+                ORDER BY depth, c.name
+            ''', params)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+            connection.close()
+
+        return [{
+            "id": row[0],
+            "name": row[1],
+            "parent_id": row[2],
+            "depth": row[4] or 0,
+            "product_count": row[3],
+            "subtree": {
+                "products": row[5],
+                "units": int(row[6]),
+                "value": round(float(row[7]), 2)
+            }
+        } for row in rows]
@@ -0,0 +1,99 @@
+from api.db.archive import tenant_units_by_product
+from api.db.db_config import get_db_connection
+from api.utils import pareto
+import numpy as np
+import os
+
+# Participación acumulada del valor que cubren las clases A y A+B
+CUTOFF_A = float(os.getenv('ABC_CUTOFF_A', '0.8'))
+CUTOFF_B = float(os.getenv('ABC_CUTOFF_B', '0.95'))
+
+# Productos por UPDATE al guardar las clases
+UPDATE_BATCH = 1000
+
+
+class AbcClassification:
+    """Modelo de clasificación ABC de artículos por valor pedido"""
+
+    @classmethod
+    def compute(cls, user_id, cutoff_a=CUTOFF_A, cutoff_b=CUTOFF_B):
+        """
+        Calcula la clase de cada producto con una consulta agregada y una suma
+        acumulada de NumPy. El valor es unidades pedidas (incluye órdenes
+        archivadas) × precio actual.
+
+        Returns:
+            dict: "data" (productos de mayor a menor valor), "summary" por clase
+            y los cortes usados
+        """
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        try:
+            units, params = tenant_units_by_product(user_id)
+            cursor.execute(f'''
+                SELECT p.id, p.name, p.price, COALESCE(t.units, 0) as units
+                FROM products p
+                LEFT JOIN ({units}) t ON p.id = t.product_id
+                WHERE p.user_id = %s
+            ''', params + (user_id,))
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+            connection.close()
+
+        result = {"cutoff_a": cutoff_a, "cutoff_b": cutoff_b, "data": [],
+                  "summary": {c: {"products": 0, "value": 0.0, "share": 0.0} for c in pareto.CLASSES}}
+        if not rows:
+            return result
+
+        columns = list(zip(*rows))
+        price = np.array([float(p or 0) for p in columns[2]])
+        units = np.array(columns[3], dtype=np.float64)
+        values = price * units
+        classes, share, order = pareto.classify(values, cutoff_a, cutoff_b)
+
+        total = values.sum()
+        for name in pareto.CLASSES:
+            mask = classes == name
+            value = float(values[mask].sum())
+            result["summary"][name] = {
+                "products": int(mask.sum()),
+                "value": round(value, 2),
+                "share": round(value / total, 4) if total > 0 else 0.0
+            }
+        for i in order.tolist():
+            result["data"].append({
+                "id": rows[i][0],
+                "name": rows[i][1],
+                "units": int(units[i]),
+                "value": round(float(values[i]), 2),
+                "cumulative_share": round(float(share[i]), 4),
+                "abc_class": str(classes[i])
+            })
+        return result
+
+    @classmethod
+    def store(cls, user_id, report):
+        """Guarda en products.abc_class las clases de un informe de compute()"""
+        by_class = {name: [] for name in pareto.CLASSES}
+        for item in report["data"]:
+            by_class[item["abc_class"]].append(item["id"])
+
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        try:
+            for name, ids in by_class.items():
+                for start in range(0, len(ids), UPDATE_BATCH):
+                    batch = ids[start:start + UPDATE_BATCH]
+                    cursor.execute(
+                        f"UPDATE products SET abc_class = %s WHERE user_id = %s "
+                        f"AND id IN ({', '.join(['%s'] * len(batch))})",
+                        [name, user_id] + batch
+                    )
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+            connection.close()
@@ -0,0 +1,53 @@
+class ProductCounters:
+    """
+    Contadores product_count de suppliers (vínculos en suppliers_products) y
+    categories (productos con esa categoría). Se actualizan en la misma
+    transacción que el cambio; api.db.counters los verifica y repara.
+    """
+
+    @staticmethod
+    def adjust_category(cursor, user_id, category_id, delta):
+        """Suma 'delta' al contador de la categoría del usuario (nada si no hay categoría)"""
+        if category_id is None or not delta:
+            return
+        cursor.execute(
+            'UPDATE categories SET product_count = product_count + %s WHERE id = %s AND user_id = %s',
+            (delta, category_id, user_id)
+        )
+
+    @staticmethod
+    def adjust_supplier(cursor, user_id, supplier_id, delta):
+        """Suma 'delta' al contador del proveedor del usuario"""
+        if not delta:
+            return
+        cursor.execute(
+            'UPDATE suppliers SET product_count = product_count + %s WHERE id = %s AND user_id = %s',
+            (delta, supplier_id, user_id)
+        )
+
+    @staticmethod
+    def lock_supplier(cursor, user_id, supplier_id):
+        """
+        Bloquea la fila del proveedor hasta el fin de la transacción y retorna
+        True si existe. Los cambios de vínculos la toman antes de tocar
+        suppliers_products: así los de un mismo proveedor se serializan y el
+        delta de uno no se calcula sobre vínculos que otro está cambiando.
+        """
+        cursor.execute(
+            'SELECT id FROM suppliers WHERE id = %s AND user_id = %s FOR UPDATE',
+            (supplier_id, user_id)
+        )
+        return cursor.fetchone() is not None
+
+    @staticmethod
+    def before_product_delete(cursor, user_id, product_id, category_id):
+        """
+        Descuenta el producto de su categoría y de sus proveedores. Se llama
+        antes del DELETE: los vínculos se borran en cascada sin pasar por aquí.
+        """
+        ProductCounters.adjust_category(cursor, user_id, category_id, -1)
+        cursor.execute('''
+            UPDATE suppliers SET product_count = product_count - 1
+            WHERE user_id = %s
+              AND id IN (SELECT supplier_id FROM suppliers_products WHERE product_id = %s AND user_id = %s)
+        ''', (user_id, product_id, user_id))
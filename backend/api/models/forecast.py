@@ -0,0 +1,124 @@
+from api.db.archive import tenant_order_lines
+from api.db.db_config import get_db_connection
+from api.utils import forecast
+from api.utils.cache import LRUCache
+from datetime import date, timedelta
+import numpy as np
+import os
+
+# Semanas de historial y de pronóstico por defecto
+WEEKS = int(os.getenv('FORECAST_WEEKS', '26'))
+HORIZON = int(os.getenv('FORECAST_HORIZON', '4'))
+
+
+class DemandForecast:
+    """Modelo de pronóstico de demanda semanal por producto"""
+
+    # (user_id, fin de la serie, semanas, horizonte, método) -> (versión, resultado)
+    _results = LRUCache('pronostico_demanda', maxsize=64)
+
+    @staticmethod
+    def _version(cursor, user_id):
+        """
+        Cambia cuando se crea o elimina una orden del tenant (o se archivan)
+        o un producto: un resultado cacheado con otra versión se recalcula.
+        """
+        cursor.execute('''
+            SELECT (SELECT COUNT(*) FROM purchase_orders WHERE user_id = %s AND status != 'deleted'),
+                   (SELECT COALESCE(MAX(id), 0) FROM purchase_orders WHERE user_id = %s AND status != 'deleted'),
+                   (SELECT COUNT(*) FROM products WHERE user_id = %s),
+                   (SELECT COALESCE(MAX(id), 0) FROM products WHERE user_id = %s)
+        ''', (user_id,) * 4)
+        return tuple(cursor.fetchone())
+
+    @classmethod
+    def _load(cls, cursor, user_id, start, end):
+        """Productos y unidades pedidas por producto y día entre start y end"""
+        cursor.execute('SELECT id, name FROM products WHERE user_id = %s ORDER BY id', (user_id,))
+        products = cursor.fetchall()
+        lines, params = tenant_order_lines(
+            user_id, "AND po.status != 'deleted' AND po.order_date >= %s AND po.order_date < %s", (start, end)
+        )
+        cursor.execute(f'''
+            SELECT product_id, order_date, SUM(quantity)
+            FROM ({lines}) l
+            GROUP BY product_id, order_date
+        ''', params)
+        return products, cursor.fetchall()
+
+    @classmethod
+    def compute(cls, user_id, weeks=WEEKS, horizon=HORIZON, method='simple'):
+        """
+        Pronostica las próximas 'horizon' semanas de todos los productos a partir
+        de las últimas 'weeks' semanas completas (de lunes a domingo).
+
+        Returns:
+            dict: "weeks" (inicio de cada semana de la serie), "data" (un
+            elemento por producto, de mayor a menor demanda pronosticada) y
+            "summary" con el error medio
+        """
+        # La serie termina el lunes de esta semana: al cambiar de semana es otra clave
+        end = date.today() - timedelta(days=date.today().weekday())
+        start = end - timedelta(weeks=weeks)
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        try:
+            key = (user_id, end, weeks, horizon, method)
+            version = cls._version(cursor, user_id)
+            cached = cls._results.get(key)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+
+            products, rows = cls._load(cursor, user_id, start, end)
+        finally:
+            cursor.close()
+            connection.close()
+
+        result = cls._build(products, rows, start, weeks, horizon, method)
+        cls._results.set(key, (version, result))
+        return result
+
+    @staticmethod
+    def _build(products, rows, start, weeks, horizon, method):
+        week_starts = [str(start + timedelta(weeks=w)) for w in range(weeks)]
+        result = {"method": method, "weeks": week_starts, "horizon": horizon, "data": [],
+                  "summary": {"products": len(products), "mae": None, "rmse": None, "mape": None}}
+        if not products:
+            return result
+
+        ids = np.array([row[0] for row in products], dtype=np.int64)
+        if rows:
+            columns = list(zip(*rows))
+            product_ids = np.array(columns[0], dtype=np.int64)
+            index = np.minimum(np.searchsorted(ids, product_ids), len(ids) - 1)
+            known = ids[index] == product_ids
+            days = (np.array(columns[1], dtype='datetime64[D]') - np.datetime64(start, 'D')).astype(np.int64)
+            series = forecast.weekly_matrix(
+                index[known], days[known] // 7, np.array(columns[2], dtype=np.float64)[known], len(ids), weeks
+            )
+        else:
+            series = np.zeros((len(ids), weeks))
+
+        fitted = forecast.fit(series, horizon, method)
+        totals = fitted["forecast"].sum(axis=1)
+        with np.errstate(invalid='ignore'):
+            result["summary"].update({
+                "mae": round(float(fitted["mae"].mean()), 3),
+                "rmse": round(float(fitted["rmse"].mean()), 3),
+                "mape": round(float(np.nanmean(fitted["mape"])), 4) if np.isfinite(fitted["mape"]).any() else None
+            })
+
+        for i in np.argsort(-totals, kind='stable').tolist():
+            mape = fitted["mape"][i]
+            result["data"].append({
+                "product_id": int(ids[i]),
+                "product_name": products[i][1],
+                "history": series[i].astype(np.int64).tolist(),
+                "forecast": np.round(fitted["forecast"][i], 2).tolist(),
+                "alpha": float(fitted["alpha"][i]),
+                "beta": float(fitted["beta"][i]),
+                "mae": round(float(fitted["mae"][i]), 3),
+                "rmse": round(float(fitted["rmse"][i]), 3),
+                "mape": round(float(mape), 4) if np.isfinite(mape) else None
+            })
+        return result
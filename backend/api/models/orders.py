@@ -1,6 +1,5 @@
 from api.db.db_config import get_db_connection, DBError
 from flask import request, jsonify
-from api import app
 import datetime
 
 class Order:
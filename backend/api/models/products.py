@@ -1,5 +1,4 @@
 from api.db.db_config import get_db_connection, DBError
-from api import app
 
 class Product:
     """Modelo para gestión de productos"""
@@ -0,0 +1,153 @@
+from api.db.archive import tenant_order_lines
+from api.db.db_config import get_db_connection
+from api.utils import replenishment
+from datetime import date, timedelta
+import numpy as np
+import os
+
+# Días de historial de órdenes usados para medir consumo y plazos de entrega
+WINDOW_DAYS = int(os.getenv('REPLENISHMENT_WINDOW_DAYS', '180'))
+
+# Probabilidad de no quedarse sin stock mientras llega el pedido
+SERVICE_LEVEL = float(os.getenv('REPLENISHMENT_SERVICE_LEVEL', '0.95'))
+
+# Días de consumo que debe cubrir cada pedido además del punto de pedido
+REVIEW_DAYS = int(os.getenv('REPLENISHMENT_REVIEW_DAYS', '14'))
+
+# Plazo de entrega supuesto cuando el tenant no tiene órdenes recibidas
+DEFAULT_LEAD_DAYS = int(os.getenv('REPLENISHMENT_DEFAULT_LEAD_DAYS', '7'))
+
+
+class Replenishment:
+    """Modelo de sugerencias de reposición a partir del historial de órdenes"""
+
+    @classmethod
+    def _load(cls, cursor, user_id, since):
+        """Productos con su stock y líneas de órdenes del tenant (dos consultas)"""
+        cursor.execute('''
+            SELECT p.id, p.name, COALESCE(s.quantity, 0)
+            FROM products p
+            LEFT JOIN stock s ON p.id = s.product_id
+            WHERE p.user_id = %s
+            ORDER BY p.id
+        ''', (user_id,))
+        products = cursor.fetchall()
+
+        # Incluye las órdenes archivadas y todas las pendientes (stock en camino)
+        lines, params = tenant_order_lines(
+            user_id, "AND po.status != 'deleted' AND (po.order_date >= %s OR po.status = 'pending')", (since,)
+        )
+        cursor.execute(f'SELECT product_id, order_date, received_date, status, quantity FROM ({lines}) l', params)
+        lines = cursor.fetchall()
+        return products, lines
+
+    @classmethod
+    def plan(cls, user_id, window_days=WINDOW_DAYS, service_level=SERVICE_LEVEL, review_days=REVIEW_DAYS):
+        """
+        Calcula punto de pedido y cantidad sugerida de todos los productos.
+
+        Returns:
+            list: Un diccionario por producto, los que hay que reponer primero
+        """
+        today = date.today()
+        since = today - timedelta(days=window_days)
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        try:
+            products, lines = cls._load(cursor, user_id, since)
+        finally:
+            cursor.close()
+            connection.close()
+        if not products:
+            return []
+
+        ids = np.array([row[0] for row in products], dtype=np.int64)
+        stock = np.array([row[2] for row in products], dtype=np.float64)
+        n = len(ids)
+
+        if lines:
+            columns = list(zip(*lines))
+            index = np.searchsorted(ids, np.array(columns[0], dtype=np.int64))
+            index = np.minimum(index, n - 1)
+            known = ids[index] == np.array(columns[0], dtype=np.int64)
+            ordered = np.array(columns[1], dtype='datetime64[D]')
+            received = np.array(columns[2], dtype='datetime64[D]')
+            pending = np.array(columns[3]) == 'pending'
+            quantity = np.array(columns[4], dtype=np.float64)
+        else:
+            index = np.zeros(0, dtype=np.int64)
+            known = pending = np.zeros(0, dtype=bool)
+            ordered = received = np.zeros(0, dtype='datetime64[D]')
+            quantity = np.zeros(0)
+
+        offset = (ordered - np.datetime64(since, 'D')).astype(np.int64)
+        in_window = known & (offset >= 0)
+        rate, sigma = replenishment.consumption(
+            index[in_window], offset[in_window], quantity[in_window], n, window_days
+        )
+
+        delivered = in_window & ~np.isnat(received)
+        lead_days = (received[delivered] - ordered[delivered]).astype(np.float64)
+        lead = replenishment.lead_times(index[delivered], lead_days, n, DEFAULT_LEAD_DAYS)
+
+        on_order = np.bincount(index[known & pending], weights=quantity[known & pending], minlength=n)
+        result = replenishment.reorder_plan(stock, on_order, rate, sigma, lead, service_level, review_days)
+
+        # Primero lo que hay que pedir, y entre eso lo que se agota antes
+        order = np.lexsort((result["days_of_cover"], result["suggested_quantity"] == 0))
+        plan = []
+        for i in order.tolist():
+            cover = result["days_of_cover"][i]
+            plan.append({
+                "product_id": int(ids[i]),
+                "product_name": products[i][1],
+                "quantity": int(stock[i]),
+                "on_order": int(on_order[i]),
+                "daily_consumption": round(float(rate[i]), 3),
+                "lead_time_days": round(float(lead[i]), 1),
+                "reorder_point": int(result["reorder_point"][i]),
+                "suggested_quantity": int(result["suggested_quantity"][i]),
+                "days_of_cover": round(float(cover), 1) if np.isfinite(cover) else None
+            })
+        return plan
+
+    @classmethod
+    def draft_order(cls, user_id, product_ids=None, **options):
+        """
+        Crea una orden pendiente con las cantidades sugeridas.
+
+        Args:
+            user_id (int): ID del usuario
+            product_ids (list): Limitar la orden a estos productos (opcional)
+
+        Returns:
+            tuple: (order_id o None si no hay nada que pedir, líneas de la orden)
+        """
+        wanted = set(product_ids) if product_ids else None
+        items = [
+            item for item in cls.plan(user_id, **options)
+            if item["suggested_quantity"] > 0 and (wanted is None or item["product_id"] in wanted)
+        ]
+        if not items:
+            return None, []
+
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        try:
+            cursor.execute(
+                'INSERT INTO purchase_orders (order_date, status, user_id) VALUES (%s, %s, %s)',
+                (date.today(), 'pending', user_id)
+            )
+            order_id = cursor.lastrowid
+            cursor.executemany(
+                'INSERT INTO order_products (order_id, product_id, quantity) VALUES (%s, %s, %s)',
+                [(order_id, item["product_id"], item["suggested_quantity"]) for item in items]
+            )
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+        return order_id, items
@@ -0,0 +1,192 @@
+from api.db.db_config import get_db_connection
+from api.utils.cache import LRUCache
+from api.utils.search import TrigramIndex
+import os
+import re
+
+# Activa el índice de trigramas en memoria para búsquedas con errores de tipeo
+TRIGRAM_ENABLED = os.getenv('SEARCH_TRIGRAM_ENABLED', '1') == '1'
+
+# Segundos que se reutiliza el índice de un usuario antes de reconstruirlo
+TRIGRAM_TTL = int(os.getenv('SEARCH_TRIGRAM_TTL', '300'))
+
+# Largo mínimo de palabra indexado por FULLTEXT (innodb_ft_min_token_size)
+FULLTEXT_MIN_TOKEN = 3
+
+
+class Search:
+    """Modelo para búsqueda de artículos, categorías y proveedores"""
+
+    # tipo -> (tabla, columna del nombre, columnas del índice FULLTEXT)
+    ENTITIES = {
+        "articulos": ('products', 'name', 'name, description'),
+        "clasificaciones": ('categories', 'name', 'name'),
+        "distribuidores": ('suppliers', 'name_supplier', 'name_supplier'),
+    }
+
+    _indexes = LRUCache('busqueda_trigramas', maxsize=32, ttl=TRIGRAM_TTL)
+
+    @staticmethod
+    def _words(query):
+        """Palabras del texto del usuario, sin los operadores de BOOLEAN MODE"""
+        return re.sub(r'[+\-<>()~*"@]', ' ', query).split()
+
+    @staticmethod
+    def _like_escape(word):
+        """Escapa los comodines de LIKE (se usa ESCAPE '!')"""
+        return re.sub(r'([!%_])', r'!\1', word)
+
+    @classmethod
+    def _entity_query(cls, entity, user_id, words):
+        """
+        Consulta de un tipo: las palabras largas se buscan con FULLTEXT (todas
+        obligatorias, como prefijo) y las cortas, que FULLTEXT ignora, como
+        prefijo de alguna palabra del nombre con LIKE.
+
+        Returns:
+            tuple: (sql, parámetros)
+        """
+        table, name, columns = cls.ENTITIES[entity]
+        boolean_query = ' '.join(f"+{word}*" for word in words if len(word) >= FULLTEXT_MIN_TOKEN)
+        score, params = '1.0', []
+        conditions = ['user_id = %s']
+        where_params = [user_id]
+        if boolean_query:
+            score = f'MATCH({columns}) AGAINST (%s IN BOOLEAN MODE)'
+            params.append(boolean_query)
+            conditions.append(score)
+            where_params.append(boolean_query)
+        for word in words:
+            if len(word) < FULLTEXT_MIN_TOKEN:
+                escaped = cls._like_escape(word)
+                conditions.append(f"({name} LIKE %s ESCAPE '!' OR {name} LIKE %s ESCAPE '!')")
+                where_params.extend([f"{escaped}%", f"% {escaped}%"])
+        sql = (f"SELECT '{entity}' AS tipo, id, {name} AS name, {score} AS score "
+               f"FROM {table} WHERE {' AND '.join(conditions)}")
+        return sql, params + where_params
+
+    @classmethod
+    def fulltext(cls, user_id, query, entities, page=1, per_page=20):
+        """
+        Búsqueda con los índices FULLTEXT de MySQL (y LIKE para las palabras
+        más cortas que innodb_ft_min_token_size).
+
+        Args:
+            user_id (int): ID del usuario
+            query (str): Texto a buscar
+            entities (list): Tipos a incluir (claves de ENTITIES)
+            page (int): Página (desde 1)
+            per_page (int): Resultados por página
+
+        Returns:
+            tuple: (lista de resultados, total de coincidencias)
+        """
+        words = cls._words(query)
+        if not words:
+            return [], 0
+
+        parts, params = [], []
+        for entity in entities:
+            sql, entity_params = cls._entity_query(entity, user_id, words)
+            parts.append(sql)
+            params.extend(entity_params)
+        union = ' UNION ALL '.join(parts)
+
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f'SELECT COUNT(*) FROM ({union}) r', params)
+            total = cursor.fetchone()[0]
+
+            cursor.execute(
+                f'SELECT tipo, id, name, score FROM ({union}) r '
+                'ORDER BY score DESC, name LIMIT %s OFFSET %s',
+                params + [per_page, (page - 1) * per_page]
+            )
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+            connection.close()
+
+        return [
+            {
+                "tipo": row[0],
+                "id": row[1],
+                "name": row[2],
+                "score": round(float(row[3]), 4)
+            }
+            for row in rows
+        ], total
+
+    @classmethod
+    def fuzzy(cls, user_id, query, entities, page=1, per_page=20):
+        """
+        Búsqueda aproximada con el índice de trigramas del usuario.
+
+        Returns:
+            tuple: (lista de resultados, total de coincidencias)
+        """
+        index = cls.get_index(user_id)
+        matches = index.search(query, entities=set(entities))
+        start = (page - 1) * per_page
+
+        return [
+            {
+                "tipo": entity,
+                "id": item_id,
+                "name": name,
+                "score": score
+            }
+            for score, entity, item_id, name in matches[start:start + per_page]
+        ], len(matches)
+
+    @classmethod
+    def get_index(cls, user_id):
+        """
+        Obtiene (o construye) el índice de trigramas de un usuario. El índice
+        guardado se reutiliza mientras users.search_version no cambie, así
+        que las modificaciones hechas en otro worker también lo descartan.
+        """
+        connection = get_db_connection(user_id)
+        cursor = connection.cursor()
+        try:
+            cursor.execute('SELECT search_version FROM users WHERE id = %s', (user_id,))
+            row = cursor.fetchone()
+            version = row[0] if row else 0
+            cached = cls._indexes.get(user_id)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+
+            index = TrigramIndex()
+            for entity, (table, name, _) in cls.ENTITIES.items():
+                cursor.execute(f'SELECT id, {name} FROM {table} WHERE user_id = %s', (user_id,))
+                for item_id, text in cursor.fetchall():
+                    index.add(entity, item_id, text)
+        finally:
+            cursor.close()
+            connection.close()
+
+        cls._indexes.set(user_id, (version, index))
+        return index
+
+    @classmethod
+    def invalidate(cls, user_id):
+        """
+        Descarta el índice de un usuario tras modificar sus datos: en este
+        proceso y, al subir search_version, en los demás workers
+        """
+        cls._indexes.invalidate(user_id)
+        try:
+            connection = get_db_connection(user_id)
+            cursor = connection.cursor()
+            try:
+                cursor.execute(
+                    'UPDATE users SET search_version = search_version + 1 WHERE id = %s',
+                    (user_id,)
+                )
+                connection.commit()
+            finally:
+                cursor.close()
+                connection.close()
+        except Exception as e:
+            print(f"ERROR invalidando índice de búsqueda: {str(e)}")
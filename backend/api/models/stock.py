@@ -1,11 +1,15 @@
 from api.db.db_config import get_db_connection, DBError
-from api import app
+import os
 
 class Stock:
     """Modelo para gestión de inventario"""
     
-    # Umbral predeterminado para alertas de bajo stock (modificado de 10 a 5)
-    DEFAULT_LOW_STOCK_THRESHOLD = 5
+    # Umbral general para alertas de bajo stock (modificado de 10 a 5); cada
+    # producto o categoría puede definir el suyo (low_stock_threshold)
+    DEFAULT_LOW_STOCK_THRESHOLD = int(os.getenv('LOW_STOCK_THRESHOLD', '5'))
+
+    # Umbral efectivo de un producto (alias p = products, c = categories)
+    THRESHOLD_SQL = 'COALESCE(p.low_stock_threshold, c.low_stock_threshold, %s)'
     
     schema = {
         "quantity": int
@@ -97,13 +101,16 @@ class Stock:
                 'UPDATE stock SET quantity = %s WHERE product_id = %s AND user_id = %s',
                 (new_quantity, product_id, user_id)
             )
+            cls.refresh_low_stock(cursor, user_id, [product_id])
+            cursor.execute('SELECT low_stock FROM stock WHERE product_id = %s', (product_id,))
+            low_stock = cursor.fetchone()[0]
             
             connection.commit()
             
             # Verificar si el stock está bajo
             warning = ""
-            if new_quantity <= cls.DEFAULT_LOW_STOCK_THRESHOLD:
-                warning = f" ⚠️ ALERTA: Stock bajo (≤{cls.DEFAULT_LOW_STOCK_THRESHOLD} unidades)"
+            if low_stock:
+                warning = " ⚠️ ALERTA: Stock bajo"
             
             return {"message": f"Stock actualizado exitosamente{warning}"}
             
@@ -116,6 +123,55 @@ class Stock:
             cursor.close()
             connection.close()
 
+    @staticmethod
+    def parse_threshold(value):
+        """
+        Valida un umbral de stock bajo recibido por la API.
+        
+        Returns:
+            int o None: El umbral (None = usar el de la categoría o el general)
+            
+        Raises:
+            ValueError: Si no es un entero >= 0
+        """
+        if value is None:
+            return None
+        if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+            raise ValueError("El umbral de stock bajo debe ser un entero mayor o igual a 0")
+        return value
+
+    @classmethod
+    def refresh_low_stock(cls, cursor, user_id, product_ids=None, category_id=None):
+        """
+        Recalcula la marca stock.low_stock en la transacción del cursor. Se llama
+        después de cambiar cantidades o umbrales; solo toca las filas indicadas.
+        
+        Args:
+            cursor: Cursor de la conexión que hizo el cambio (sin commit aún)
+            user_id (int): ID del usuario
+            product_ids (list): Productos a recalcular
+            category_id (int): Recalcular los productos de esta categoría
+            (sin product_ids ni category_id se recalcula todo el inventario)
+        """
+        sql = '''
+            UPDATE stock SET low_stock = CASE WHEN quantity <= COALESCE((
+                SELECT COALESCE(p.low_stock_threshold, c.low_stock_threshold)
+                FROM products p
+                LEFT JOIN categories c ON p.category_id = c.id
+                WHERE p.id = stock.product_id
+            ), %s) THEN 1 ELSE 0 END
+            WHERE user_id = %s'''
+        params = [cls.DEFAULT_LOW_STOCK_THRESHOLD, user_id]
+        if product_ids is not None:
+            if not product_ids:
+                return
+            sql += f" AND product_id IN ({', '.join(['%s'] * len(product_ids))})"
+            params += list(product_ids)
+        if category_id is not None:
+            sql += ' AND product_id IN (SELECT id FROM products WHERE category_id = %s AND user_id = %s)'
+            params += [category_id, user_id]
+        cursor.execute(sql, params)
+
     @classmethod
     def check_low_stock(cls, user_id, threshold=None):
         """
@@ -123,7 +179,8 @@ class Stock:
         
         Args:
             user_id (int): ID del usuario autenticado
-            threshold (int): Umbral personalizado (por defecto 5)
+            threshold (int): Umbral único para todos los productos (por defecto
+                se usa la marca low_stock, según el umbral de cada producto)
             
         Returns:
             list o dict: Lista de productos con stock bajo o mensaje
@@ -131,21 +188,29 @@ class Stock:
         Raises:
             DBError: Si hay errores en la consulta
         """
-        if threshold is None:
-            threshold = cls.DEFAULT_LOW_STOCK_THRESHOLD
-
         connection = get_db_connection()
         cursor = connection.cursor()
         
         try:
-            cursor.execute(
-                '''SELECT stock.product_id, products.name, stock.quantity 
-                   FROM stock 
-                   JOIN products ON stock.product_id = products.id 
-                   WHERE stock.quantity <= %s AND stock.user_id = %s
-                   ORDER BY stock.quantity ASC, products.name''',
-                (threshold, user_id)
-            )
+            if threshold is None:
+                threshold = "por producto"
+                cursor.execute(
+                    '''SELECT stock.product_id, products.name, stock.quantity 
+                       FROM stock 
+                       JOIN products ON stock.product_id = products.id 
+                       WHERE stock.user_id = %s AND stock.low_stock = 1
+                       ORDER BY stock.quantity ASC, products.name''',
+                    (user_id,)
+                )
+            else:
+                cursor.execute(
+                    '''SELECT stock.product_id, products.name, stock.quantity 
+                       FROM stock 
+                       JOIN products ON stock.product_id = products.id 
+                       WHERE stock.quantity <= %s AND stock.user_id = %s
+                       ORDER BY stock.quantity ASC, products.name''',
+                    (threshold, user_id)
+                )
             data = cursor.fetchall()
 
             if data:
@@ -186,7 +251,7 @@ class Stock:
         
         try:
             cursor.execute('''
-                SELECT stock.product_id, products.name, stock.quantity
+                SELECT stock.product_id, products.name, stock.quantity, stock.low_stock
                 FROM stock 
                 JOIN products ON stock.product_id = products.id
                 WHERE stock.user_id = %s
@@ -201,7 +266,8 @@ class Stock:
                         "product_id": row[0],
                         "product_name": row[1],
                         "quantity": row[2],
-                        "low_stock": row[2] <= cls.DEFAULT_LOW_STOCK_THRESHOLD
+                        # Marca según el umbral de cada producto (ver refresh_low_stock)
+                        "low_stock": bool(row[3])
                     }
                     for row in data
                 ]
@@ -244,10 +310,10 @@ class Stock:
             )
             total_units = cursor.fetchone()[0] or 0
             
-            # Productos con stock bajo
+            # Productos con stock bajo (marca según el umbral de cada producto)
             cursor.execute(
-                'SELECT COUNT(*) FROM stock WHERE user_id = %s AND quantity <= %s',
-                (user_id, cls.DEFAULT_LOW_STOCK_THRESHOLD)
+                'SELECT COUNT(*) FROM stock WHERE user_id = %s AND low_stock = 1',
+                (user_id,)
             )
             low_stock_count = cursor.fetchone()[0]
             
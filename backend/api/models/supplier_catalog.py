@@ -0,0 +1,236 @@
+from api.db.db_config import get_db_connection
+from api.models.counters import ProductCounters
+from decimal import Decimal, InvalidOperation
+import csv
+import os
+
+# Filas por INSERT ... ON DUPLICATE KEY UPDATE (y por transacción)
+IMPORT_BATCH_SIZE = int(os.getenv('SUPPLIER_IMPORT_BATCH_SIZE', '500'))
+
+# Errores por fila que se devuelven como detalle (el resto solo se cuentan)
+MAX_REPORTED_ERRORS = 100
+
+# Nombres de columna aceptados en la cabecera del CSV
+COLUMNS = {
+    "product": ('producto', 'product', 'product_id', 'id', 'nombre', 'name'),
+    "cost": ('costo', 'coste', 'cost', 'precio', 'price'),
+    "lead_time": ('plazo', 'plazo_dias', 'plazo_entrega', 'lead_time', 'lead_time_days')
+}
+
+
+def _header_positions(row):
+    """Posición de cada columna si la fila es una cabecera, None si son datos"""
+    names = [cell.strip().lower() for cell in row]
+    positions = {}
+    for key, aliases in COLUMNS.items():
+        for i, name in enumerate(names):
+            if name in aliases:
+                positions[key] = i
+                break
+    if "product" in positions and "cost" in positions:
+        return positions
+    return None
+
+
+def _parse_cost(value):
+    value = value.strip().replace(' ', '')
+    if ',' in value and '.' not in value:
+        value = value.replace(',', '.')
+    cost = Decimal(value)
+    if not cost.is_finite() or cost < 0:
+        raise InvalidOperation
+    return cost.quantize(Decimal('0.01'))
+
+
+def _parse_lead_time(value):
+    value = value.strip()
+    if not value:
+        return None
+    days = int(value)
+    if days < 0:
+        raise ValueError
+    return days
+
+
+class SupplierCatalog:
+    """Modelo de listas de precios de proveedores (costo y plazo por producto)"""
+
+    @staticmethod
+    def _product_index(cursor, user_id):
+        """
+        Ids y mapa nombre -> id de los productos del tenant (una consulta por
+        importación). Los nombres repetidos se marcan como ambiguos (None).
+        """
+        cursor.execute('SELECT id, name FROM products WHERE user_id = %s', (user_id,))
+        ids, by_name = set(), {}
+        for product_id, name in cursor.fetchall():
+            ids.add(product_id)
+            key = name.strip().lower()
+            by_name[key] = None if key in by_name else product_id
+        return ids, by_name
+
+    @staticmethod
+    def _upsert(cursor, supplier_id, user_id, batch):
+        # Los vínculos nuevos del lote suman al contador del proveedor. Con el
+        # proveedor bloqueado, el conteo (lectura con bloqueo: ve lo último
+        # confirmado) no cambia hasta el commit
+        ProductCounters.lock_supplier(cursor, user_id, supplier_id)
+        product_ids = list({row[0] for row in batch})
+        cursor.execute(
+            f"SELECT COUNT(*) FROM suppliers_products WHERE supplier_id = %s "
+            f"AND product_id IN ({', '.join(['%s'] * len(product_ids))}) FOR UPDATE",
+            [supplier_id] + product_ids
+        )
+        ProductCounters.adjust_supplier(cursor, user_id, supplier_id, len(product_ids) - cursor.fetchone()[0])
+
+        params = []
+        for product_id, cost, lead_time in batch:
+            params += [supplier_id, product_id, user_id, cost, lead_time]
+        cursor.execute(
+            'INSERT INTO suppliers_products (supplier_id, product_id, user_id, cost, lead_time_days) VALUES '
+            + ', '.join(['(%s, %s, %s, %s, %s)'] * len(batch))
+            + ' ON DUPLICATE KEY UPDATE cost = VALUES(cost), lead_time_days = VALUES(lead_time_days)',
+            params
+        )
+
+    @classmethod
+    def import_csv(cls, user_id, supplier_id, lines, delimiter=','):
+        """
+        Importa la lista de precios de un proveedor leyendo el CSV fila a fila.
+
+        Cada fila tiene producto (id o nombre exacto, sin distinguir mayúsculas),
+        costo y plazo de entrega en días (opcional); la primera puede ser una
+        cabecera. Las filas válidas se vinculan o actualizan en lotes de
+        IMPORT_BATCH_SIZE, cada uno en su transacción; las inválidas se omiten.
+
+        Args:
+            lines: Iterable de líneas de texto (un archivo abierto o un stream)
+
+        Returns:
+            dict: Filas leídas, importadas, con error y detalle de los errores,
+            o None si el proveedor no existe
+        """
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        result = {"rows": 0, "imported": 0, "errors": 0, "error_details": []}
+
+        def error(line, message):
+            result["errors"] += 1
+            if len(result["error_details"]) < MAX_REPORTED_ERRORS:
+                result["error_details"].append({"line": line, "error": message})
+
+        try:
+            cursor.execute(
+                'SELECT id FROM suppliers WHERE id = %s AND user_id = %s',
+                (supplier_id, user_id)
+            )
+            if not cursor.fetchone():
+                return None
+            ids, by_name = cls._product_index(cursor, user_id)
+
+            positions = {"product": 0, "cost": 1, "lead_time": 2}
+            batch, first = [], True
+            for number, row in enumerate(csv.reader(lines, delimiter=delimiter), start=1):
+                if not any(cell.strip() for cell in row):
+                    continue
+                if first:
+                    first = False
+                    header = _header_positions(row)
+                    if header:
+                        positions = header
+                        continue
+                result["rows"] += 1
+
+                def cell(key):
+                    i = positions.get(key)
+                    return row[i] if i is not None and i < len(row) else ''
+
+                product = cell("product").strip()
+                product_id = int(product) if product.isdigit() and int(product) in ids else by_name.get(product.lower(), 0)
+                if product_id is None:
+                    error(number, f"Nombre de producto repetido: {product}")
+                    continue
+                if not product_id:
+                    error(number, f"Producto no encontrado: {product}")
+                    continue
+                try:
+                    cost = _parse_cost(cell("cost"))
+                except (InvalidOperation, ValueError):
+                    error(number, f"Costo inválido: {cell('cost')}")
+                    continue
+                try:
+                    lead_time = _parse_lead_time(cell("lead_time"))
+                except ValueError:
+                    error(number, f"Plazo inválido: {cell('lead_time')}")
+                    continue
+
+                batch.append((product_id, cost, lead_time))
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    cls._upsert(cursor, supplier_id, user_id, batch)
+                    connection.commit()
+                    result["imported"] += len(batch)
+                    batch = []
+
+            if batch:
+                cls._upsert(cursor, supplier_id, user_id, batch)
+                connection.commit()
+                result["imported"] += len(batch)
+            return result
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+
+    @classmethod
+    def cheapest(cls, user_id, product_id=None):
+        """
+        Proveedor con menor costo de cada producto (o de uno). Usa el índice
+        (user_id, product_id, cost): MIN por producto sin leer las filas y
+        búsqueda directa del proveedor con ese costo. Los empates se resuelven
+        por menor plazo de entrega.
+
+        Returns:
+            list: Un diccionario por producto con costo cargado
+        """
+        where, params = '', [user_id]
+        if product_id is not None:
+            where, params = ' AND product_id = %s', [user_id, product_id]
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f'''
+                SELECT p.id, p.name, p.price, s.id, s.name_supplier, sp.cost, sp.lead_time_days
+                FROM (
+                    SELECT product_id, MIN(cost) as cost
+                    FROM suppliers_products
+                    WHERE user_id = %s AND cost IS NOT NULL{where}
+                    GROUP BY product_id
+                ) m
+                JOIN suppliers_products sp
+                    ON sp.user_id = %s AND sp.product_id = m.product_id AND sp.cost = m.cost
+                JOIN products p ON p.id = m.product_id
+                JOIN suppliers s ON s.id = sp.supplier_id
+                ORDER BY p.id, sp.lead_time_days IS NULL, sp.lead_time_days, s.id
+            ''', params + [user_id])
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+            connection.close()
+
+        result, seen = [], set()
+        for row in rows:
+            if row[0] in seen:
+                continue
+            seen.add(row[0])
+            result.append({
+                "product_id": row[0],
+                "product_name": row[1],
+                "price": float(row[2]),
+                "supplier_id": row[3],
+                "supplier_name": row[4],
+                "cost": float(row[5]),
+                "lead_time_days": row[6]
+            })
+        return result
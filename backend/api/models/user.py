@@ -1,12 +1,10 @@
-from api.db.db_config import get_db_connection, DBError
+from api.db.db_config import get_db_connection, provision_tenant, DBError
 from werkzeug.security import generate_password_hash, check_password_hash
 import jwt
 import datetime
-from api import app
+from flask import current_app
 import re
 
-app.config['SECRET_KEY'] = "clave_app_segura_2024"
-
 class User:
     """Modelo para gestión de usuarios del sistema"""
     
@@ -107,6 +105,9 @@ class User:
             # Recuperar el objeto creado
             cursor.execute('SELECT * FROM users WHERE id = %s', (user_id,))
             nuevo = cursor.fetchone()
+
+            # Con sharding, el usuario también se registra en la base de su tenant
+            provision_tenant(user_id)
             
             return User(nuevo).to_json()
             
@@ -156,7 +157,7 @@ class User:
                 'username': auth.username,
                 'id': row[0],
                 'exp': exp_timestamp
-            }, app.config['SECRET_KEY'], algorithm="HS256")
+            }, current_app.config['SECRET_KEY'], algorithm="HS256")
             
             return {
                 "token": token, 
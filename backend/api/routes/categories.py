@@ -1,12 +1,17 @@
-from api import app
-from flask import request, jsonify
+from flask import Blueprint, request, jsonify
 from api.db.db_config import get_db_connection
+from api.models.category_tree import CategoryTree
+from api.models.search import Search
+from api.models.stock import Stock
+from api.utils import columnar
+
+bp = Blueprint('categories', __name__)
 
 # RUTAS DE CATEGORÍAS
 
-@app.route('/usuario/<int:user_id>/clasificaciones', methods=['GET', 'OPTIONS'])
+@bp.route('/usuario/<int:user_id>/clasificaciones', methods=['GET', 'OPTIONS'])
 def obtener_clasificaciones(user_id):
-    """Obtiene todas las categorías de un usuario"""
+    """Obtiene todas las categorías de un usuario (?formato=columnas: columnas + filas)"""
     if request.method == 'OPTIONS':
         return '', 200
     
@@ -15,8 +20,8 @@ def obtener_clasificaciones(user_id):
         cursor = connection.cursor()
         
         cursor.execute('''
-            SELECT id, name, descripcion,
-                   (SELECT COUNT(*) FROM products WHERE category_id = categories.id) as product_count
+            SELECT id, name, COALESCE(descripcion, '') as descripcion, product_count,
+                   low_stock_threshold, parent_id
             FROM categories 
             WHERE user_id = %s 
             ORDER BY name
@@ -26,23 +31,58 @@ def obtener_clasificaciones(user_id):
         cursor.close()
         connection.close()
         
-        categories = []
-        for row in rows:
-            categories.append({
-                "id": row[0],
-                "name": row[1],
-                "descripcion": row[2] or "",
-                "product_count": row[3]
-            })
-        
-        return jsonify({"data": categories}), 200
+        columns = ["id", "name", "descripcion", "product_count", "low_stock_threshold", "parent_id"]
+        return jsonify(columnar.body(columns, rows)), 200
         
     except Exception as e:
         print(f"ERROR en GET clasificaciones: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/usuario/<int:user_id>/clasificaciones/<int:category_id>', methods=['GET', 'OPTIONS'])
+@bp.route('/usuario/<int:user_id>/clasificaciones/arbol', methods=['GET', 'OPTIONS'])
+def obtener_arbol_clasificaciones(user_id):
+    """Obtiene el árbol de categorías con productos, unidades y valor de cada subárbol"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        nodes = CategoryTree.aggregates(user_id)
+        
+        # Las filas vienen por nivel: cada padre aparece antes que sus hijas
+        by_id, roots = {}, []
+        for node in nodes:
+            node["children"] = []
+            by_id[node["id"]] = node
+            parent = by_id.get(node["parent_id"])
+            (parent["children"] if parent else roots).append(node)
+        
+        return jsonify({"data": roots}), 200
+        
+    except Exception as e:
+        print(f"ERROR en GET arbol clasificaciones: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@bp.route('/usuario/<int:user_id>/clasificaciones/<int:category_id>/subarbol', methods=['GET', 'OPTIONS'])
+def obtener_subarbol_clasificacion(user_id, category_id):
+    """Obtiene una categoría y sus descendientes con los totales de cada subárbol"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        nodes = CategoryTree.aggregates(user_id, category_id)
+        if nodes is None:
+            return jsonify({"error": "Categoría no encontrada"}), 404
+        
+        root = next(node for node in nodes if node["id"] == category_id)
+        return jsonify({"data": nodes, "total": root["subtree"]}), 200
+        
+    except Exception as e:
+        print(f"ERROR en GET subarbol clasificacion: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@bp.route('/usuario/<int:user_id>/clasificaciones/<int:category_id>', methods=['GET', 'OPTIONS'])
 def obtener_clasificacion(user_id, category_id):
     """Obtiene una categoría específica por ID"""
     if request.method == 'OPTIONS':
@@ -53,7 +93,7 @@ def obtener_clasificacion(user_id, category_id):
         cursor = connection.cursor()
         
         cursor.execute(
-            'SELECT id, name, descripcion FROM categories WHERE id = %s AND user_id = %s',
+            'SELECT id, name, descripcion, low_stock_threshold, product_count, parent_id FROM categories WHERE id = %s AND user_id = %s',
             (category_id, user_id)
         )
         
@@ -68,7 +108,10 @@ def obtener_clasificacion(user_id, category_id):
             "data": {
                 "id": row[0],
                 "name": row[1],
-                "descripcion": row[2] or ""
+                "descripcion": row[2] or "",
+                "low_stock_threshold": row[3],
+                "product_count": row[4],
+                "parent_id": row[5]
             }
         }), 200
         
@@ -77,7 +120,7 @@ def obtener_clasificacion(user_id, category_id):
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/usuario/<int:user_id>/clasificaciones', methods=['POST'])
+@bp.route('/usuario/<int:user_id>/clasificaciones', methods=['POST'])
 def crear_clasificacion(user_id):
     """Crea una nueva categoría"""
     try:
@@ -88,6 +131,11 @@ def crear_clasificacion(user_id):
         if not name:
             return jsonify({"error": "El nombre es requerido"}), 400
         
+        try:
+            threshold = Stock.parse_threshold(data.get('low_stock_threshold'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
         connection = get_db_connection()
         cursor = connection.cursor()
         
@@ -100,13 +148,22 @@ def crear_clasificacion(user_id):
             connection.close()
             return jsonify({"error": "Ya existe una categoría con ese nombre"}), 400
         
+        parent_id = data.get('parent_id')
+        error = CategoryTree.validate_parent(cursor, user_id, None, parent_id)
+        if error:
+            cursor.close()
+            connection.close()
+            return jsonify({"error": error}), 400
+        
         cursor.execute(
-            'INSERT INTO categories (name, descripcion, user_id) VALUES (%s, %s, %s)',
-            (name, descripcion, user_id)
+            'INSERT INTO categories (name, descripcion, low_stock_threshold, parent_id, user_id) VALUES (%s, %s, %s, %s, %s)',
+            (name, descripcion, threshold, parent_id, user_id)
         )
+        CategoryTree.add(cursor, user_id, cursor.lastrowid, parent_id)
         connection.commit()
         cursor.close()
         connection.close()
+        Search.invalidate(user_id)
         
         return jsonify({"message": "Categoría creada exitosamente"}), 201
         
@@ -115,7 +172,7 @@ def crear_clasificacion(user_id):
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/usuario/<int:user_id>/clasificaciones/<int:category_id>', methods=['PUT', 'OPTIONS'])
+@bp.route('/usuario/<int:user_id>/clasificaciones/<int:category_id>', methods=['PUT', 'OPTIONS'])
 def actualizar_clasificacion(user_id, category_id):
     """Actualiza una categoría"""
     if request.method == 'OPTIONS':
@@ -129,25 +186,51 @@ def actualizar_clasificacion(user_id, category_id):
         if not name:
             return jsonify({"error": "El nombre es requerido"}), 400
         
+        try:
+            threshold = Stock.parse_threshold(data.get('low_stock_threshold'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
         connection = get_db_connection()
         cursor = connection.cursor()
         
         cursor.execute(
-            'SELECT id FROM categories WHERE id = %s AND user_id = %s',
+            'SELECT id, parent_id FROM categories WHERE id = %s AND user_id = %s',
             (category_id, user_id)
         )
-        if not cursor.fetchone():
+        category = cursor.fetchone()
+        if not category:
             cursor.close()
             connection.close()
             return jsonify({"error": "Categoría no encontrada"}), 404
         
+        # Mover la categoría (con su subárbol) si cambia el padre
+        parent_id = data.get('parent_id', category[1])
+        if parent_id != category[1]:
+            # Bloquea al usuario: dos movimientos simultáneos podrían formar un ciclo
+            cursor.execute('SELECT id FROM users WHERE id = %s FOR UPDATE', (user_id,))
+            error = CategoryTree.validate_parent(cursor, user_id, category_id, parent_id)
+            if error:
+                connection.rollback()
+                cursor.close()
+                connection.close()
+                return jsonify({"error": error}), 400
+            CategoryTree.move(cursor, user_id, category_id, parent_id)
+        
         cursor.execute(
             'UPDATE categories SET name = %s, descripcion = %s WHERE id = %s AND user_id = %s',
             (name, descripcion, category_id, user_id)
         )
+        if 'low_stock_threshold' in data:
+            cursor.execute(
+                'UPDATE categories SET low_stock_threshold = %s WHERE id = %s AND user_id = %s',
+                (threshold, category_id, user_id)
+            )
+            Stock.refresh_low_stock(cursor, user_id, category_id=category_id)
         connection.commit()
         cursor.close()
         connection.close()
+        Search.invalidate(user_id)
         
         return jsonify({"message": "Categoría actualizada exitosamente"}), 200
         
@@ -156,7 +239,7 @@ def actualizar_clasificacion(user_id, category_id):
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/usuario/<int:user_id>/clasificaciones/<int:category_id>', methods=['DELETE', 'OPTIONS'])
+@bp.route('/usuario/<int:user_id>/clasificaciones/<int:category_id>', methods=['DELETE', 'OPTIONS'])
 def eliminar_clasificacion(user_id, category_id):
     """Elimina una categoría"""
     if request.method == 'OPTIONS':
@@ -167,19 +250,31 @@ def eliminar_clasificacion(user_id, category_id):
         cursor = connection.cursor()
         
         cursor.execute(
-            'SELECT id FROM categories WHERE id = %s AND user_id = %s',
+            'SELECT id, low_stock_threshold FROM categories WHERE id = %s AND user_id = %s',
             (category_id, user_id)
         )
-        if not cursor.fetchone():
+        category = cursor.fetchone()
+        if not category:
             cursor.close()
             connection.close()
             return jsonify({"error": "Categoría no encontrada"}), 404
         
+        # Sus productos vuelven al umbral general (si la categoría tenía uno propio)
+        product_ids = []
+        if category[1] is not None:
+            cursor.execute(
+                'SELECT id FROM products WHERE category_id = %s AND user_id = %s',
+                (category_id, user_id)
+            )
+            product_ids = [row[0] for row in cursor.fetchall()]
         cursor.execute(
             'UPDATE products SET category_id = NULL WHERE category_id = %s AND user_id = %s',
             (category_id, user_id)
         )
+        Stock.refresh_low_stock(cursor, user_id, product_ids)
         
+        # Sus subcategorías pasan a depender de su padre
+        CategoryTree.remove(cursor, user_id, category_id)
         cursor.execute(
             'DELETE FROM categories WHERE id = %s AND user_id = %s',
             (category_id, user_id)
@@ -187,11 +282,10 @@ def eliminar_clasificacion(user_id, category_id):
         connection.commit()
         cursor.close()
         connection.close()
+        Search.invalidate(user_id)
         
         return jsonify({"message": "Categoría eliminada exitosamente"}), 200
         
     except Exception as e:
         print(f"ERROR en DELETE clasificaciones: {str(e)}")
         return jsonify({"error": str(e)}), 500
-
-print("✅ Rutas de categorías cargadas correctamente")
\ No newline at end of file
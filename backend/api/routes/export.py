@@ -0,0 +1,246 @@
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from api.db.archive import tenant_orders_by_status, tenant_units_by_product
+from api.db.db_config import get_db_connection
+from api.models.classification import AbcClassification
+from api.models.forecast import DemandForecast, HORIZON, WEEKS
+from api.utils import export
+from api.utils.forecast import METHODS
+
+bp = Blueprint('export', __name__)
+
+# RUTAS DE EXPORTACIÓN (CSV / XLSX en streaming)
+
+
+def _export_options():
+    """Formato (?formato=csv|xlsx) y compresión (?gzip=1) pedidos"""
+    fmt = request.args.get('formato', 'csv').lower()
+    if fmt not in export.FORMATS:
+        raise ValueError(f"El formato debe ser uno de: {', '.join(export.FORMATS)}")
+    if fmt not in export.available_formats():
+        raise ValueError("El formato xlsx requiere el paquete XlsxWriter en el servidor")
+    return fmt, request.args.get('gzip', '0') in ('1', 'true')
+
+
+def _response(name, header, rows, fmt, gzip):
+    """Respuesta que genera el archivo a medida que se envía"""
+    filename = f"{name}.{fmt}" + ('.gz' if gzip else '')
+    return Response(
+        stream_with_context(export.stream(header, rows, fmt, gzip, sheet_name=name)),
+        mimetype='application/gzip' if gzip else export.CONTENT_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+def _drop_pending_result(connection):
+    """
+    Corta la conexión con el servidor cuando el cliente abandonó la descarga:
+    el cursor de mysql-connector no usa buffer, así que quedan filas sin leer
+    y el pool la entregaría así a la próxima petición ("Unread result found").
+    Leer el resto podría tardar tanto como la exportación; al pedirla de nuevo
+    el pool la reconecta. En SQLite no hace falta (close() descarta el resultado).
+    """
+    # PooledMySQLConnection (la conexión real está en _cnx) o una directa
+    raw = getattr(connection, '_cnx', None) or connection
+    if not hasattr(raw, 'disconnect'):
+        return
+    raw.disconnect()
+    raw.unread_result = False
+
+
+def _quietly(function, *args):
+    """Llama a function(*args) registrando el error en lugar de propagarlo"""
+    try:
+        function(*args)
+    except Exception as e:
+        print(f"ERROR al liberar la conexión de exportación: {str(e)}")
+
+
+def _query_rows(queries):
+    """
+    Ejecuta la primera consulta ya (así un error responde 500 antes de empezar
+    a enviar) y devuelve un generador con las filas de todas, leídas con
+    fetchmany. La conexión se libera al terminar o si el cliente corta.
+    """
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    try:
+        cursor.execute(*queries[0])
+    except Exception:
+        cursor.close()
+        connection.close()
+        raise
+
+    def rows():
+        finished = False
+        try:
+            yield from export.cursor_rows(cursor)
+            for query in queries[1:]:
+                cursor.execute(*query)
+                yield from export.cursor_rows(cursor)
+            finished = True
+        finally:
+            if not finished:
+                _quietly(_drop_pending_result, connection)
+            _quietly(cursor.close)
+            # close() devuelve la conexión al pool aunque falle (ej. al
+            # restablecer la sesión de una conexión ya cortada)
+            _quietly(connection.close)
+
+    return rows()
+
+
+@bp.route('/usuario/<int:user_id>/exportar/inventario', methods=['GET', 'OPTIONS'])
+def exportar_inventario(user_id):
+    """Exporta el inventario (mismas columnas que GET /inventario)"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        try:
+            fmt, gzip = _export_options()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        rows = _query_rows([('''
+            SELECT p.id, p.name, p.price, COALESCE(c.name, 'Sin categoría') as category_name,
+                   COALESCE(s.quantity, 0), p.category_id
+            FROM products p
+            LEFT JOIN categories c ON p.category_id = c.id
+            LEFT JOIN stock s ON p.id = s.product_id
+            WHERE p.user_id = %s
+            ORDER BY p.name
+        ''', (user_id,))])
+        header = ["id", "name", "price", "category_name", "quantity", "category_id"]
+        return _response("inventario", header, rows, fmt, gzip)
+    
+    except Exception as e:
+        print(f"ERROR en exportar inventario: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+# Una fila por línea de orden (las órdenes sin líneas salen con producto vacío)
+ORDER_LINES_SQL = '''
+    SELECT po.id, po.order_date, po.received_date, po.status,
+           op.product_id, p.name, op.quantity
+    FROM {orders} po
+    LEFT JOIN {lines} op ON op.order_id = po.id
+    LEFT JOIN products p ON p.id = op.product_id
+    WHERE po.user_id = %s AND po.status != 'deleted'
+    ORDER BY po.id
+'''
+
+
+@bp.route('/usuario/<int:user_id>/exportar/pedidos', methods=['GET', 'OPTIONS'])
+def exportar_pedidos(user_id):
+    """Exporta las órdenes con sus líneas (?historial=1 incluye las archivadas)"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        try:
+            fmt, gzip = _export_options()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        # Sin UNION: cada tabla se recorre en orden de id y se envía a continuación
+        queries = []
+        if request.args.get('historial', '0') in ('1', 'true'):
+            queries.append((ORDER_LINES_SQL.format(
+                orders='purchase_orders_history', lines='order_products_history'), (user_id,)))
+        queries.append((ORDER_LINES_SQL.format(orders='purchase_orders', lines='order_products'), (user_id,)))
+        
+        header = ["order_id", "order_date", "received_date", "status", "product_id", "product_name", "quantity"]
+        return _response("pedidos", header, _query_rows(queries), fmt, gzip)
+    
+    except Exception as e:
+        print(f"ERROR en exportar pedidos: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+def _report_resumen_inventario(user_id):
+    header = ["categoria", "productos", "unidades", "stock_bajo", "sin_stock", "valor"]
+    return header, _query_rows([('''
+        SELECT COALESCE(c.name, 'Sin categoría') as categoria, COUNT(p.id),
+               COALESCE(SUM(s.quantity), 0),
+               COALESCE(SUM(CASE WHEN s.low_stock = 1 AND s.quantity > 0 THEN 1 ELSE 0 END), 0),
+               COALESCE(SUM(CASE WHEN s.quantity = 0 THEN 1 ELSE 0 END), 0),
+               COALESCE(SUM(s.quantity * p.price), 0)
+        FROM products p
+        LEFT JOIN categories c ON p.category_id = c.id
+        LEFT JOIN stock s ON s.product_id = p.id
+        WHERE p.user_id = %s
+        GROUP BY c.name
+        ORDER BY categoria
+    ''', (user_id,))])
+
+
+def _report_articulos_populares(user_id):
+    header = ["id", "name", "total_ordered"]
+    units, params = tenant_units_by_product(user_id)
+    return header, _query_rows([(f'''
+        SELECT p.id, p.name, COALESCE(t.units, 0) as total_ordered
+        FROM products p
+        LEFT JOIN ({units}) t ON p.id = t.product_id
+        WHERE p.user_id = %s
+        ORDER BY total_ordered DESC
+    ''', params + (user_id,))])
+
+
+def _report_pedidos_por_estado(user_id):
+    header = ["status", "cantidad"]
+    return header, _query_rows([tenant_orders_by_status(user_id)])
+
+
+def _report_abc(user_id):
+    report = AbcClassification.compute(user_id)
+    header = ["id", "name", "units", "value", "cumulative_share", "abc_class"]
+    return header, (
+        (item["id"], item["name"], item["units"], item["value"], item["cumulative_share"], item["abc_class"])
+        for item in report["data"]
+    )
+
+
+def _report_pronostico_demanda(user_id):
+    method = request.args.get('metodo', 'simple')
+    if method not in METHODS:
+        raise ValueError(f"El método debe ser uno de: {', '.join(METHODS)}")
+    report = DemandForecast.compute(user_id, WEEKS, HORIZON, method)
+    header = ["product_id", "product_name", "alpha", "beta", "mae", "rmse", "mape"]
+    header += [f"semana_{i + 1}" for i in range(report["horizon"])]
+    return header, (
+        [item["product_id"], item["product_name"], item["alpha"], item["beta"],
+         item["mae"], item["rmse"], item["mape"]] + item["forecast"]
+        for item in report["data"]
+    )
+
+
+# Informes exportables: nombre en la URL -> función (user_id) -> (cabecera, filas)
+REPORTS = {
+    'resumen-inventario': _report_resumen_inventario,
+    'articulos-populares': _report_articulos_populares,
+    'pedidos-por-estado': _report_pedidos_por_estado,
+    'abc': _report_abc,
+    'pronostico-demanda': _report_pronostico_demanda,
+}
+
+
+@bp.route('/usuario/<int:user_id>/exportar/informes/<report>', methods=['GET', 'OPTIONS'])
+def exportar_informe(user_id, report):
+    """Exporta un informe completo (sin límite de filas)"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        if report not in REPORTS:
+            return jsonify({"error": f"El informe debe ser uno de: {', '.join(REPORTS)}"}), 404
+        try:
+            fmt, gzip = _export_options()
+            header, rows = REPORTS[report](user_id)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        return _response(f"informe-{report}", header, rows, fmt, gzip)
+    
+    except Exception as e:
+        print(f"ERROR en exportar informe {report}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
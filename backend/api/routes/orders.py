@@ -1,52 +1,91 @@
-from api import app
-from flask import request, jsonify
+from flask import Blueprint, request, jsonify
+from api.db.archive import ORDER_TABLES
 from api.db.db_config import get_db_connection
+from api.models.stock import Stock
+from api.utils import columnar, fieldsets
+from api.utils.idempotency import idempotent
 from datetime import date
 
+bp = Blueprint('orders', __name__)
+
+
+def _optional_str(value):
+    """Fecha como texto (o None)"""
+    return str(value) if value else None
+
+
+# Campos de GET /pedidos (?campos=): nombre -> (expresión SQL, join que necesita)
+ORDER_FIELDS = {
+    "id": ("po.id", None),
+    "order_date": ("po.order_date", None),
+    "received_date": ("po.received_date", None),
+    "status": ("po.status", None),
+    "product_count": ("COUNT(op.product_id)", 'lines'),
+}
+
+
 # RUTAS SIMPLES DE ÓRDENES
 
-@app.route('/usuario/<int:user_id>/pedidos', methods=['GET', 'OPTIONS'])
+@bp.route('/usuario/<int:user_id>/pedidos', methods=['GET', 'OPTIONS'])
 def obtener_pedidos(user_id):
-    """Obtiene todas las órdenes"""
+    """
+    Obtiene todas las órdenes (?campos=status: solo esos campos;
+    ?formato=columnas: columnas + filas)
+    """
     if request.method == 'OPTIONS':
         return '', 200
     
     try:
+        # historial=1 incluye las órdenes archivadas (tablas *_history)
+        historial = request.args.get('historial', '0') in ('1', 'true')
+        try:
+            columns = fieldsets.requested(ORDER_FIELDS)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        fields, joins, used = fieldsets.select(
+            ORDER_FIELDS, {'lines': 'LEFT JOIN {lines} op ON po.id = op.order_id'}, columns
+        )
+        # Sin product_count no hace falta recorrer las líneas ni agrupar
+        group_by = 'GROUP BY po.id, po.order_date, po.received_date, po.status' if 'lines' in used else ''
+        
+        # Con historial, una rama por par de tablas, cada una con su filtro por
+        # user_id (sin las vistas *_all); order_date va al final para ordenar
+        # la unión y se descarta después
+        sort = ', po.order_date AS sort_date' if historial else ''
+        branches = [
+            f'''
+            SELECT {fields}{sort}
+            FROM {orders} po
+            {joins.format(lines=lines)}
+            WHERE po.user_id = %s AND po.status != 'deleted'
+            {group_by}
+            '''
+            for orders, lines in (ORDER_TABLES if historial else ORDER_TABLES[:1])
+        ]
+
         connection = get_db_connection()
         cursor = connection.cursor()
         
-        cursor.execute('''
-            SELECT po.id, po.order_date, po.received_date, po.status,
-                   COUNT(op.product_id) as product_count
-            FROM purchase_orders po
-            LEFT JOIN order_products op ON po.id = op.order_id
-            WHERE po.user_id = %s AND po.status != 'deleted'
-            GROUP BY po.id
-            ORDER BY po.order_date DESC
-        ''', (user_id,))
+        cursor.execute(
+            'UNION ALL'.join(branches) + ('ORDER BY sort_date DESC' if historial else 'ORDER BY po.order_date DESC'),
+            (user_id,) * len(branches)
+        )
         
         rows = cursor.fetchall()
+        if historial:
+            rows = [row[:-1] for row in rows]
         cursor.close()
         connection.close()
         
-        orders = []
-        for row in rows:
-            orders.append({
-                "id": row[0],
-                "order_date": str(row[1]),
-                "received_date": str(row[2]) if row[2] else None,
-                "status": row[3],
-                "product_count": row[4]
-            })
-        
-        return jsonify({"data": orders}), 200
+        return jsonify(columnar.body(columns, rows, {"order_date": str, "received_date": _optional_str})), 200
         
     except Exception as e:
         print(f"ERROR en GET pedidos: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/usuario/<int:user_id>/pedidos', methods=['POST'])
+@bp.route('/usuario/<int:user_id>/pedidos', methods=['POST'])
+@idempotent
 def crear_pedido(user_id):
     """Crea una nueva orden"""
     try:
@@ -88,7 +127,7 @@ def crear_pedido(user_id):
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/usuario/<int:user_id>/pedidos/<int:order_id>', methods=['GET', 'OPTIONS'])
+@bp.route('/usuario/<int:user_id>/pedidos/<int:order_id>', methods=['GET', 'OPTIONS'])
 def obtener_pedido_detalle(user_id, order_id):
     """Obtiene los detalles de una orden"""
     if request.method == 'OPTIONS':
@@ -98,7 +137,7 @@ def obtener_pedido_detalle(user_id, order_id):
         connection = get_db_connection()
         cursor = connection.cursor()
         
-        # Obtener orden
+        # Obtener orden (las archivadas se buscan en el historial)
         cursor.execute('''
             SELECT id, order_date, received_date, status
             FROM purchase_orders
@@ -106,15 +145,24 @@ def obtener_pedido_detalle(user_id, order_id):
         ''', (order_id, user_id))
         
         order_row = cursor.fetchone()
+        lines_table = 'order_products'
+        if not order_row:
+            cursor.execute('''
+                SELECT id, order_date, received_date, status
+                FROM purchase_orders_history
+                WHERE id = %s AND user_id = %s
+            ''', (order_id, user_id))
+            order_row = cursor.fetchone()
+            lines_table = 'order_products_history'
         if not order_row:
             cursor.close()
             connection.close()
             return jsonify({"error": "Orden no encontrada"}), 404
         
         # Obtener productos de la orden
-        cursor.execute('''
+        cursor.execute(f'''
             SELECT p.id, p.name, op.quantity
-            FROM order_products op
+            FROM {lines_table} op
             JOIN products p ON op.product_id = p.id
             WHERE op.order_id = %s
         ''', (order_id,))
@@ -144,7 +192,8 @@ def obtener_pedido_detalle(user_id, order_id):
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/usuario/<int:user_id>/pedidos/<int:order_id>/confirmar', methods=['PUT', 'OPTIONS'])
+@bp.route('/usuario/<int:user_id>/pedidos/<int:order_id>/confirmar', methods=['PUT', 'OPTIONS'])
+@idempotent
 def confirmar_pedido(user_id, order_id):
     """Confirma una orden y actualiza el stock"""
     if request.method == 'OPTIONS':
@@ -187,6 +236,8 @@ def confirmar_pedido(user_id, order_id):
                 WHERE product_id = %s
             ''', (quantity, product_id))
         
+        Stock.refresh_low_stock(cursor, user_id, [product_id for product_id, _ in products])
+        
         # Actualizar estado de la orden
         cursor.execute('''
             UPDATE purchase_orders 
@@ -205,7 +256,7 @@ def confirmar_pedido(user_id, order_id):
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/usuario/<int:user_id>/pedidos/<int:order_id>', methods=['DELETE'])
+@bp.route('/usuario/<int:user_id>/pedidos/<int:order_id>', methods=['DELETE'])
 def eliminar_pedido(user_id, order_id):
     """Elimina (marca como eliminada) una orden"""
     try:
@@ -236,5 +287,3 @@ def eliminar_pedido(user_id, order_id):
     except Exception as e:
         print(f"ERROR en DELETE pedidos: {str(e)}")
         return jsonify({"error": str(e)}), 500
-
-print("✅ Rutas de órdenes cargadas correctamente")
\ No newline at end of file
@@ -1,60 +1,91 @@
-from api import app
-from flask import request, jsonify
+from flask import Blueprint, request, jsonify
 from api.db.db_config import get_db_connection
+from api.models.counters import ProductCounters
+from api.models.search import Search
+from api.models.stock import Stock
+from api.utils import columnar, fieldsets
+
+bp = Blueprint('products', __name__)
+
+# Campos de GET /articulos (?campos=): nombre -> (expresión SQL, join que necesita)
+PRODUCT_FIELDS = {
+    "id": ("p.id", None),
+    "name": ("p.name", None),
+    "price": ("p.price", None),
+    "category_id": ("p.category_id", None),
+    "category_name": ("COALESCE(c.name, 'Sin categoría')", 'categories'),
+    "stock": ("COALESCE(s.quantity, 0)", 'stock'),
+    "abc_class": ("p.abc_class", None),
+}
+
+PRODUCT_JOINS = {
+    'categories': 'LEFT JOIN categories c ON p.category_id = c.id',
+    'stock': 'LEFT JOIN stock s ON p.id = s.product_id',
+}
+
+
+def _owns_category(cursor, user_id, category_id):
+    """True si no hay categoría o si la categoría pertenece al usuario"""
+    if category_id is None:
+        return True
+    cursor.execute('SELECT id FROM categories WHERE id = %s AND user_id = %s', (category_id, user_id))
+    return cursor.fetchone() is not None
+
 
 # RUTAS SIMPLES DE PRODUCTOS
 
-@app.route('/usuario/<int:user_id>/articulos', methods=['GET', 'OPTIONS'])
+@bp.route('/usuario/<int:user_id>/articulos', methods=['GET', 'OPTIONS'])
 def obtener_articulos(user_id):
-    """Obtiene todos los productos de un usuario"""
+    """
+    Obtiene todos los productos de un usuario (?campos=name,price: solo esos
+    campos; ?formato=columnas: columnas + filas)
+    """
     if request.method == 'OPTIONS':
         return '', 200
     
     try:
+        # clase=A|B|C filtra por la última clasificación ABC guardada
+        abc_class = request.args.get('clase', '').strip().upper()
+        if abc_class and abc_class not in ('A', 'B', 'C'):
+            return jsonify({"error": "La clase debe ser A, B o C"}), 400
+        try:
+            columns = fieldsets.requested(PRODUCT_FIELDS)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        fields, joins, _ = fieldsets.select(PRODUCT_FIELDS, PRODUCT_JOINS, columns)
+        
         connection = get_db_connection()
         cursor = connection.cursor()
         
-        cursor.execute('''
-            SELECT p.id, p.name, p.price, p.category_id,
-                   c.name as category_name,
-                   COALESCE(s.quantity, 0) as stock_quantity
+        cursor.execute(f'''
+            SELECT {fields}
             FROM products p
-            LEFT JOIN categories c ON p.category_id = c.id
-            LEFT JOIN stock s ON p.id = s.product_id
-            WHERE p.user_id = %s
+            {joins}
+            WHERE p.user_id = %s{' AND p.abc_class = %s' if abc_class else ''}
             ORDER BY p.name
-        ''', (user_id,))
+        ''', (user_id, abc_class) if abc_class else (user_id,))
         
         rows = cursor.fetchall()
         cursor.close()
         connection.close()
         
-        products = []
-        for row in rows:
-            products.append({
-                "id": row[0],
-                "name": row[1],
-                "price": float(row[2]) if row[2] else 0,
-                "category_id": row[3],
-                "category_name": row[4] or "Sin categoría",
-                "stock": row[5]
-            })
-        
-        return jsonify({"data": products}), 200
+        return jsonify(columnar.body(columns, rows, {"price": columnar.price}, {"price": float})), 200
         
     except Exception as e:
         print(f"ERROR en GET articulos: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/usuario/<int:user_id>/articulos', methods=['POST'])
+@bp.route('/usuario/<int:user_id>/articulos', methods=['POST'])
 def crear_articulo(user_id):
     """Crea un nuevo producto"""
     try:
         data = request.get_json()
         name = data.get('name', '').strip()
+        description = (data.get('description') or '').strip()
         price = float(data.get('price', 0))
         category_id = data.get('category_id')
+        category_id = int(category_id) if category_id not in (None, '') else None
         quantity = int(data.get('quantity', 0))
         
         if not name:
@@ -62,6 +93,11 @@ def crear_articulo(user_id):
         
         if price < 0:
             return jsonify({"error": "El precio no puede ser negativo"}), 400
+        
+        try:
+            threshold = Stock.parse_threshold(data.get('low_stock_threshold'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
             
         connection = get_db_connection()
         cursor = connection.cursor()
@@ -76,12 +112,18 @@ def crear_articulo(user_id):
             connection.close()
             return jsonify({"error": "Ya existe un producto con ese nombre"}), 400
         
+        if not _owns_category(cursor, user_id, category_id):
+            cursor.close()
+            connection.close()
+            return jsonify({"error": "La categoría especificada no existe"}), 400
+        
         # Insertar producto (el trigger creará el stock automáticamente)
         cursor.execute(
-            'INSERT INTO products (name, price, category_id, user_id) VALUES (%s, %s, %s, %s)',
-            (name, price, category_id, user_id)
+            'INSERT INTO products (name, description, price, low_stock_threshold, category_id, user_id) VALUES (%s, %s, %s, %s, %s, %s)',
+            (name, description, price, threshold, category_id, user_id)
         )
         product_id = cursor.lastrowid
+        ProductCounters.adjust_category(cursor, user_id, category_id, 1)
         
         # Si se especificó cantidad inicial, actualizar el stock
         if quantity > 0:
@@ -89,10 +131,12 @@ def crear_articulo(user_id):
                 'UPDATE stock SET quantity = %s WHERE product_id = %s',
                 (quantity, product_id)
             )
+        Stock.refresh_low_stock(cursor, user_id, [product_id])
         
         connection.commit()
         cursor.close()
         connection.close()
+        Search.invalidate(user_id)
         
         return jsonify({"message": "Producto creado exitosamente"}), 201
         
@@ -101,7 +145,7 @@ def crear_articulo(user_id):
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/usuario/<int:user_id>/articulos/<int:product_id>', methods=['PUT'])
+@bp.route('/usuario/<int:user_id>/articulos/<int:product_id>', methods=['PUT'])
 def actualizar_articulo(user_id, product_id):
     """Actualiza un producto"""
     try:
@@ -109,31 +153,59 @@ def actualizar_articulo(user_id, product_id):
         name = data.get('name', '').strip()
         price = float(data.get('price', 0))
         category_id = data.get('category_id')
+        category_id = int(category_id) if category_id not in (None, '') else None
         
         if not name:
             return jsonify({"error": "El nombre es requerido"}), 400
         
+        try:
+            threshold = Stock.parse_threshold(data.get('low_stock_threshold'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
         connection = get_db_connection()
         cursor = connection.cursor()
         
-        # Verificar que existe
+        # Verificar que existe (y bloquearlo: su categoría define los contadores)
         cursor.execute(
-            'SELECT id FROM products WHERE id = %s AND user_id = %s',
+            'SELECT category_id FROM products WHERE id = %s AND user_id = %s FOR UPDATE',
             (product_id, user_id)
         )
-        if not cursor.fetchone():
+        current = cursor.fetchone()
+        if not current:
             cursor.close()
             connection.close()
             return jsonify({"error": "Producto no encontrado"}), 404
         
+        if category_id != current[0] and not _owns_category(cursor, user_id, category_id):
+            cursor.close()
+            connection.close()
+            return jsonify({"error": "La categoría especificada no existe"}), 400
+        
         # Actualizar
         cursor.execute(
             'UPDATE products SET name = %s, price = %s, category_id = %s WHERE id = %s AND user_id = %s',
             (name, price, category_id, product_id, user_id)
         )
+        if current[0] != category_id:
+            ProductCounters.adjust_category(cursor, user_id, current[0], -1)
+            ProductCounters.adjust_category(cursor, user_id, category_id, 1)
+        if 'description' in data:
+            cursor.execute(
+                'UPDATE products SET description = %s WHERE id = %s AND user_id = %s',
+                ((data.get('description') or '').strip(), product_id, user_id)
+            )
+        if 'low_stock_threshold' in data:
+            cursor.execute(
+                'UPDATE products SET low_stock_threshold = %s WHERE id = %s AND user_id = %s',
+                (threshold, product_id, user_id)
+            )
+        # La categoría o el umbral pueden haber cambiado
+        Stock.refresh_low_stock(cursor, user_id, [product_id])
         connection.commit()
         cursor.close()
         connection.close()
+        Search.invalidate(user_id)
         
         return jsonify({"message": "Producto actualizado exitosamente"}), 200
         
@@ -142,7 +214,7 @@ def actualizar_articulo(user_id, product_id):
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/usuario/<int:user_id>/articulos/<int:product_id>', methods=['DELETE'])
+@bp.route('/usuario/<int:user_id>/articulos/<int:product_id>', methods=['DELETE'])
 def eliminar_articulo(user_id, product_id):
     """Elimina un producto"""
     try:
@@ -151,13 +223,15 @@ def eliminar_articulo(user_id, product_id):
         
         # Verificar que existe
         cursor.execute(
-            'SELECT id FROM products WHERE id = %s AND user_id = %s',
+            'SELECT category_id FROM products WHERE id = %s AND user_id = %s FOR UPDATE',
             (product_id, user_id)
         )
-        if not cursor.fetchone():
+        current = cursor.fetchone()
+        if not current:
             cursor.close()
             connection.close()
             return jsonify({"error": "Producto no encontrado"}), 404
+        ProductCounters.before_product_delete(cursor, user_id, product_id, current[0])
         
         # Eliminar stock
         cursor.execute(
@@ -173,11 +247,10 @@ def eliminar_articulo(user_id, product_id):
         connection.commit()
         cursor.close()
         connection.close()
+        Search.invalidate(user_id)
         
         return jsonify({"message": "Producto eliminado exitosamente"}), 200
         
     except Exception as e:
         print(f"ERROR en DELETE articulos: {str(e)}")
         return jsonify({"error": str(e)}), 500
-
-print("✅ Rutas de productos cargadas correctamente")
\ No newline at end of file
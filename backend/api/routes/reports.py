@@ -1,102 +1,162 @@
-from api import app
-from flask import request, jsonify
-from api.db.db_config import get_db_connection
+from flask import Blueprint, request, jsonify
+from api.db.archive import tenant_orders_by_status, tenant_units_by_product
+from api.db.db_config import get_db_connection, get_router
+from api.models.classification import AbcClassification, CUTOFF_A, CUTOFF_B
+from api.models.forecast import DemandForecast, HORIZON, WEEKS
+from api.utils.forecast import METHODS
+from api.utils.singleflight import SingleFlight
+
+bp = Blueprint('reports', __name__)
 
 # RUTAS SIMPLES DE REPORTES
 
-@app.route('/usuario/<int:user_id>/informes/resumen-inventario', methods=['GET', 'OPTIONS'])
+def _flight_key(user_id, *params):
+    """
+    Clave de coalescencia de un informe: usuario y parámetros. Con réplica,
+    incluye si el usuario escribió hace poco: quien lee del primario no debe
+    recibir un resultado leído de la réplica.
+    """
+    router = get_router()
+    return (user_id, params, router is not None and router.is_sticky(user_id))
+
+
+def _inventory_summary(user_id):
+    """Datos del informe de resumen del inventario"""
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    
+    # Total productos
+    cursor.execute('SELECT COUNT(*) FROM products WHERE user_id = %s', (user_id,))
+    total_products = cursor.fetchone()[0]
+    
+    # Total unidades
+    cursor.execute('''
+        SELECT COALESCE(SUM(s.quantity), 0) 
+        FROM stock s 
+        JOIN products p ON s.product_id = p.id 
+        WHERE p.user_id = %s
+    ''', (user_id,))
+    total_units = cursor.fetchone()[0]
+    
+    # Productos con stock bajo (1 al umbral de cada producto)
+    cursor.execute('''
+        SELECT COUNT(*) 
+        FROM stock s 
+        WHERE s.user_id = %s AND s.low_stock = 1 AND s.quantity > 0
+    ''', (user_id,))
+    low_stock_count = cursor.fetchone()[0]
+    
+    # Productos sin stock (0)
+    cursor.execute('''
+        SELECT COUNT(*) 
+        FROM stock s 
+        JOIN products p ON s.product_id = p.id 
+        WHERE p.user_id = %s AND s.quantity = 0
+    ''', (user_id,))
+    out_of_stock_count = cursor.fetchone()[0]
+    
+    # Productos con stock bajo (detalle)
+    cursor.execute('''
+        SELECT p.id, p.name, s.quantity, c.name as categoria
+        FROM stock s
+        JOIN products p ON p.id = s.product_id
+        LEFT JOIN categories c ON p.category_id = c.id
+        WHERE s.user_id = %s AND s.low_stock = 1
+        ORDER BY s.quantity ASC
+    ''', (user_id,))
+    
+    low_stock_rows = cursor.fetchall()
+    low_stock_products = []
+    for row in low_stock_rows:
+        low_stock_products.append({
+            "id": row[0],
+            "nombre": row[1],
+            "cantidad": row[2],
+            "categoria": row[3] or "Sin categoría"
+        })
+    
+    # Productos por categoría
+    cursor.execute('''
+        SELECT COALESCE(c.name, 'Sin categoría') as categoria, COUNT(p.id) as cantidad
+        FROM products p
+        LEFT JOIN categories c ON p.category_id = c.id
+        WHERE p.user_id = %s
+        GROUP BY c.name
+    ''', (user_id,))
+    
+    category_rows = cursor.fetchall()
+    by_category = {}
+    for row in category_rows:
+        by_category[row[0]] = row[1]
+    
+    cursor.close()
+    connection.close()
+    
+    return {
+        "total_products": total_products,
+        "total_units": total_units,
+        "low_stock_count": low_stock_count,
+        "out_of_stock_count": out_of_stock_count,
+        "low_stock_products": low_stock_products,
+        "by_category": by_category
+    }
+
+
+# Los tableros abiertos a la vez por varios usuarios de un tenant piden los
+# mismos informes al mismo tiempo: las peticiones idénticas en curso se
+# resuelven con una sola consulta
+_summary_flight = SingleFlight('informe_resumen_inventario')
+
+
+@bp.route('/usuario/<int:user_id>/informes/resumen-inventario', methods=['GET', 'OPTIONS'])
 def informe_resumen_inventario(user_id):
     """Genera informe completo del inventario"""
     if request.method == 'OPTIONS':
         return '', 200
     
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        
-        # Total productos
-        cursor.execute('SELECT COUNT(*) FROM products WHERE user_id = %s', (user_id,))
-        total_products = cursor.fetchone()[0]
-        
-        # Total unidades
-        cursor.execute('''
-            SELECT COALESCE(SUM(s.quantity), 0) 
-            FROM stock s 
-            JOIN products p ON s.product_id = p.id 
-            WHERE p.user_id = %s
-        ''', (user_id,))
-        total_units = cursor.fetchone()[0]
-        
-        # Productos con stock bajo (1-5)
-        cursor.execute('''
-            SELECT COUNT(*) 
-            FROM stock s 
-            JOIN products p ON s.product_id = p.id 
-            WHERE p.user_id = %s AND s.quantity > 0 AND s.quantity <= 5
-        ''', (user_id,))
-        low_stock_count = cursor.fetchone()[0]
-        
-        # Productos sin stock (0)
-        cursor.execute('''
-            SELECT COUNT(*) 
-            FROM stock s 
-            JOIN products p ON s.product_id = p.id 
-            WHERE p.user_id = %s AND s.quantity = 0
-        ''', (user_id,))
-        out_of_stock_count = cursor.fetchone()[0]
-        
-        # Productos con stock bajo (detalle)
-        cursor.execute('''
-            SELECT p.id, p.name, s.quantity, c.name as categoria
-            FROM products p
-            LEFT JOIN stock s ON p.id = s.product_id
-            LEFT JOIN categories c ON p.category_id = c.id
-            WHERE p.user_id = %s AND s.quantity <= 5
-            ORDER BY s.quantity ASC
-        ''', (user_id,))
-        
-        low_stock_rows = cursor.fetchall()
-        low_stock_products = []
-        for row in low_stock_rows:
-            low_stock_products.append({
-                "id": row[0],
-                "nombre": row[1],
-                "cantidad": row[2],
-                "categoria": row[3] or "Sin categoría"
-            })
-        
-        # Productos por categoría
-        cursor.execute('''
-            SELECT COALESCE(c.name, 'Sin categoría') as categoria, COUNT(p.id) as cantidad
-            FROM products p
-            LEFT JOIN categories c ON p.category_id = c.id
-            WHERE p.user_id = %s
-            GROUP BY c.name
-        ''', (user_id,))
-        
-        category_rows = cursor.fetchall()
-        by_category = {}
-        for row in category_rows:
-            by_category[row[0]] = row[1]
-        
-        cursor.close()
-        connection.close()
-        
-        return jsonify({
-            "total_products": total_products,
-            "total_units": total_units,
-            "low_stock_count": low_stock_count,
-            "out_of_stock_count": out_of_stock_count,
-            "low_stock_products": low_stock_products,
-            "by_category": by_category
-        }), 200
+        report = _summary_flight.do(_flight_key(user_id), _inventory_summary, user_id)
+        return jsonify(report), 200
         
     except Exception as e:
         print(f"ERROR en GET resumen-inventario: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/usuario/<int:user_id>/informes/articulos-populares', methods=['GET', 'OPTIONS'])
+def _popular_products(user_id, limit):
+    """Datos del informe de artículos más pedidos"""
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    
+    units, params = tenant_units_by_product(user_id)
+    cursor.execute(f'''
+        SELECT p.id, p.name, COALESCE(t.units, 0) as total_ordered
+        FROM products p
+        LEFT JOIN ({units}) t ON p.id = t.product_id
+        WHERE p.user_id = %s
+        ORDER BY total_ordered DESC
+        LIMIT %s
+    ''', params + (user_id, limit))
+    
+    rows = cursor.fetchall()
+    cursor.close()
+    connection.close()
+    
+    products = []
+    for row in rows:
+        products.append({
+            "id": row[0],
+            "name": row[1],
+            "total_ordered": row[2]
+        })
+    
+    return {"data": products}
+
+
+_popular_flight = SingleFlight('informe_articulos_populares')
+
+
+@bp.route('/usuario/<int:user_id>/informes/articulos-populares', methods=['GET', 'OPTIONS'])
 def informe_articulos_populares(user_id):
     """Genera informe de artículos más pedidos"""
     if request.method == 'OPTIONS':
@@ -104,40 +164,15 @@ def informe_articulos_populares(user_id):
     
     try:
         limit = request.args.get('limit', 10, type=int)
-        
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        
-        cursor.execute('''
-            SELECT p.id, p.name, COALESCE(SUM(op.quantity), 0) as total_ordered
-            FROM products p
-            LEFT JOIN order_products op ON p.id = op.product_id
-            WHERE p.user_id = %s
-            GROUP BY p.id, p.name
-            ORDER BY total_ordered DESC
-            LIMIT %s
-        ''', (user_id, limit))
-        
-        rows = cursor.fetchall()
-        cursor.close()
-        connection.close()
-        
-        products = []
-        for row in rows:
-            products.append({
-                "id": row[0],
-                "name": row[1],
-                "total_ordered": row[2]
-            })
-        
-        return jsonify({"data": products}), 200
+        report = _popular_flight.do(_flight_key(user_id, limit), _popular_products, user_id, limit)
+        return jsonify(report), 200
         
     except Exception as e:
         print(f"ERROR en GET articulos-populares: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/usuario/<int:user_id>/informes/pedidos-por-estado', methods=['GET', 'OPTIONS'])
+@bp.route('/usuario/<int:user_id>/informes/pedidos-por-estado', methods=['GET', 'OPTIONS'])
 def informe_pedidos_por_estado(user_id):
     """Genera informe de pedidos agrupados por estado"""
     if request.method == 'OPTIONS':
@@ -147,12 +182,7 @@ def informe_pedidos_por_estado(user_id):
         connection = get_db_connection()
         cursor = connection.cursor()
         
-        cursor.execute('''
-            SELECT status, COUNT(*) as cantidad
-            FROM purchase_orders
-            WHERE user_id = %s AND status != 'deleted'
-            GROUP BY status
-        ''', (user_id,))
+        cursor.execute(*tenant_orders_by_status(user_id))
         
         rows = cursor.fetchall()
         cursor.close()
@@ -168,4 +198,62 @@ def informe_pedidos_por_estado(user_id):
         print(f"ERROR en GET pedidos-por-estado: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
-print("✅ Rutas de reportes cargadas correctamente")
\ No newline at end of file
+
+def _abc_cutoffs():
+    """Cortes de las clases A y B (query string corte_a, corte_b)"""
+    cutoff_a = request.args.get('corte_a', CUTOFF_A, type=float)
+    cutoff_b = request.args.get('corte_b', CUTOFF_B, type=float)
+    if not 0 < cutoff_a < cutoff_b <= 1:
+        raise ValueError("Los cortes deben cumplir 0 < corte_a < corte_b <= 1")
+    return cutoff_a, cutoff_b
+
+
+@bp.route('/usuario/<int:user_id>/informes/abc', methods=['GET', 'POST', 'OPTIONS'])
+def informe_abc(user_id):
+    """Genera la clasificación ABC de artículos por valor (POST además la guarda)"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        try:
+            cutoff_a, cutoff_b = _abc_cutoffs()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        report = AbcClassification.compute(user_id, cutoff_a, cutoff_b)
+        if request.method == 'POST':
+            AbcClassification.store(user_id, report)
+        
+        limit = request.args.get('limit', type=int)
+        if limit is not None:
+            report["data"] = report["data"][:max(limit, 0)]
+        
+        return jsonify(report), 200
+        
+    except Exception as e:
+        print(f"ERROR en {request.method} informe abc: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@bp.route('/usuario/<int:user_id>/informes/pronostico-demanda', methods=['GET', 'OPTIONS'])
+def informe_pronostico_demanda(user_id):
+    """Genera el pronóstico de demanda semanal por producto"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        weeks = min(max(request.args.get('semanas', WEEKS, type=int), 4), 104)
+        horizon = min(max(request.args.get('horizonte', HORIZON, type=int), 1), 26)
+        method = request.args.get('metodo', 'simple')
+        if method not in METHODS:
+            return jsonify({"error": f"El método debe ser uno de: {', '.join(METHODS)}"}), 400
+        limit = min(max(request.args.get('limit', 50, type=int), 0), 1000)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        
+        report = DemandForecast.compute(user_id, weeks, horizon, method)
+        
+        return jsonify({**report, "data": report["data"][offset:offset + limit]}), 200
+        
+    except Exception as e:
+        print(f"ERROR en GET pronostico-demanda: {str(e)}")
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,65 @@
+from flask import Blueprint, request, jsonify
+from api.models.search import Search, TRIGRAM_ENABLED
+
+bp = Blueprint('search', __name__)
+
+# RUTAS DE BÚSQUEDA
+
+@bp.route('/usuario/<int:user_id>/buscar', methods=['GET', 'OPTIONS'])
+def buscar(user_id):
+    """
+    Busca artículos, categorías y proveedores por nombre.
+
+    Parámetros (query string):
+    - q: texto a buscar (requerido)
+    - tipo: articulos, clasificaciones y/o distribuidores separados por coma
+    - modo: auto (FULLTEXT y, si no hay resultados, aproximada), fulltext o fuzzy
+    - pagina / por_pagina: paginación (por_pagina máximo 100)
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    try:
+        query = request.args.get('q', '').strip()
+        mode = request.args.get('modo', 'auto')
+        page = max(request.args.get('pagina', 1, type=int), 1)
+        per_page = min(max(request.args.get('por_pagina', 20, type=int), 1), 100)
+
+        if not query:
+            return jsonify({"error": "El parámetro q es requerido"}), 400
+
+        if mode not in ('auto', 'fulltext', 'fuzzy'):
+            return jsonify({"error": "Modo de búsqueda inválido"}), 400
+
+        if mode == 'fuzzy' and not TRIGRAM_ENABLED:
+            return jsonify({"error": "La búsqueda aproximada está deshabilitada"}), 400
+
+        entities = list(Search.ENTITIES)
+        if request.args.get('tipo'):
+            entities = [t.strip() for t in request.args['tipo'].split(',') if t.strip()]
+            invalid = [t for t in entities if t not in Search.ENTITIES]
+            if invalid:
+                return jsonify({"error": f"Tipo inválido: {', '.join(invalid)}"}), 400
+
+        results, total = [], 0
+        if mode != 'fuzzy':
+            results, total = Search.fulltext(user_id, query, entities, page, per_page)
+
+        # Sin coincidencias exactas: probar con el índice de trigramas
+        if mode == 'fuzzy' or (mode == 'auto' and total == 0 and TRIGRAM_ENABLED):
+            results, total = Search.fuzzy(user_id, query, entities, page, per_page)
+            mode = 'fuzzy'
+        else:
+            mode = 'fulltext'
+
+        return jsonify({
+            "data": results,
+            "total": total,
+            "pagina": page,
+            "por_pagina": per_page,
+            "modo": mode
+        }), 200
+
+    except Exception as e:
+        print(f"ERROR en GET buscar: {str(e)}")
+        return jsonify({"error": str(e)}), 500
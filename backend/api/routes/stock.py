@@ -1,25 +1,52 @@
-from api import app
-from flask import request, jsonify
+from flask import Blueprint, request, jsonify
 from api.db.db_config import get_db_connection
+from api.models.replenishment import Replenishment
+from api.models.stock import Stock
+from api.utils import columnar, fieldsets
+from api.utils.idempotency import idempotent
+
+bp = Blueprint('stock', __name__)
+
+# Campos de GET /inventario (?campos=): nombre -> (expresión SQL, join que necesita)
+INVENTORY_FIELDS = {
+    "id": ("p.id", None),
+    "name": ("p.name", None),
+    "price": ("p.price", None),
+    "category_name": ("COALESCE(c.name, 'Sin categoría')", 'categories'),
+    "quantity": ("COALESCE(s.quantity, 0)", 'stock'),
+    "category_id": ("p.category_id", None),
+}
+
+INVENTORY_JOINS = {
+    'categories': 'LEFT JOIN categories c ON p.category_id = c.id',
+    'stock': 'LEFT JOIN stock s ON p.id = s.product_id',
+}
 
 # RUTAS SIMPLES DE INVENTARIO/STOCK
 
-@app.route('/usuario/<int:user_id>/inventario', methods=['GET', 'OPTIONS'])
+@bp.route('/usuario/<int:user_id>/inventario', methods=['GET', 'OPTIONS'])
 def obtener_inventario(user_id):
-    """Obtiene el inventario completo"""
+    """
+    Obtiene el inventario completo (?campos=name,quantity: solo esos campos;
+    ?formato=columnas: columnas + filas)
+    """
     if request.method == 'OPTIONS':
         return '', 200
     
     try:
+        try:
+            columns = fieldsets.requested(INVENTORY_FIELDS)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        fields, joins, _ = fieldsets.select(INVENTORY_FIELDS, INVENTORY_JOINS, columns)
+        
         connection = get_db_connection()
         cursor = connection.cursor()
         
-        cursor.execute('''
-            SELECT p.id, p.name, p.price, c.name as category_name, 
-                   s.quantity, p.category_id
+        cursor.execute(f'''
+            SELECT {fields}
             FROM products p
-            LEFT JOIN categories c ON p.category_id = c.id
-            LEFT JOIN stock s ON p.id = s.product_id
+            {joins}
             WHERE p.user_id = %s
             ORDER BY p.name
         ''', (user_id,))
@@ -28,25 +55,14 @@ def obtener_inventario(user_id):
         cursor.close()
         connection.close()
         
-        items = []
-        for row in rows:
-            items.append({
-                "id": row[0],
-                "name": row[1],
-                "price": float(row[2]) if row[2] else 0,
-                "category_name": row[3] or "Sin categoría",
-                "quantity": row[4] or 0,
-                "category_id": row[5]
-            })
-        
-        return jsonify({"data": items}), 200
+        return jsonify(columnar.body(columns, rows, {"price": columnar.price}, {"price": float})), 200
         
     except Exception as e:
         print(f"ERROR en GET inventario: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/usuario/<int:user_id>/inventario/<int:product_id>', methods=['PUT', 'OPTIONS'])
+@bp.route('/usuario/<int:user_id>/inventario/<int:product_id>', methods=['PUT', 'OPTIONS'])
 def actualizar_stock(user_id, product_id):
     """Actualiza el stock de un producto"""
     if request.method == 'OPTIONS':
@@ -77,6 +93,7 @@ def actualizar_stock(user_id, product_id):
             'UPDATE stock SET quantity = %s WHERE product_id = %s',
             (quantity, product_id)
         )
+        Stock.refresh_low_stock(cursor, user_id, [product_id])
         connection.commit()
         cursor.close()
         connection.close()
@@ -88,9 +105,9 @@ def actualizar_stock(user_id, product_id):
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/usuario/<int:user_id>/inventario/alerta-bajo', methods=['GET', 'OPTIONS'])
+@bp.route('/usuario/<int:user_id>/inventario/alerta-bajo', methods=['GET', 'OPTIONS'])
 def obtener_stock_bajo(user_id):
-    """Obtiene productos con stock bajo (<=5)"""
+    """Obtiene productos con stock bajo (<= umbral del producto, su categoría o el general)"""
     if request.method == 'OPTIONS':
         return '', 200
     
@@ -98,14 +115,16 @@ def obtener_stock_bajo(user_id):
         connection = get_db_connection()
         cursor = connection.cursor()
         
-        cursor.execute('''
-            SELECT p.id, p.name, s.quantity, c.name as category_name
-            FROM products p
-            LEFT JOIN stock s ON p.id = s.product_id
+        # Recorre solo las filas marcadas (índice user_id, low_stock, quantity)
+        cursor.execute(f'''
+            SELECT p.id, p.name, s.quantity, c.name as category_name,
+                   {Stock.THRESHOLD_SQL} as threshold
+            FROM stock s
+            JOIN products p ON p.id = s.product_id
             LEFT JOIN categories c ON p.category_id = c.id
-            WHERE p.user_id = %s AND s.quantity <= 5
+            WHERE s.user_id = %s AND s.low_stock = 1
             ORDER BY s.quantity ASC
-        ''', (user_id,))
+        ''', (Stock.DEFAULT_LOW_STOCK_THRESHOLD, user_id))
         
         rows = cursor.fetchall()
         cursor.close()
@@ -117,7 +136,8 @@ def obtener_stock_bajo(user_id):
                 "id": row[0],
                 "name": row[1],
                 "quantity": row[2],
-                "category_name": row[3] or "Sin categoría"
+                "category_name": row[3] or "Sin categoría",
+                "threshold": row[4]
             })
         
         return jsonify({"data": items}), 200
@@ -127,7 +147,70 @@ def obtener_stock_bajo(user_id):
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/usuario/<int:user_id>/inventario/estadisticas', methods=['GET', 'OPTIONS'])
+def _replenishment_options():
+    """Parámetros del cálculo de reposición (query string), con sus límites"""
+    options = {}
+    days = request.args.get('dias', type=int)
+    if days is not None:
+        options["window_days"] = min(max(days, 7), 730)
+    level = request.args.get('nivel_servicio', type=float)
+    if level is not None:
+        options["service_level"] = min(max(level, 0.5), 0.999)
+    cover = request.args.get('cobertura', type=int)
+    if cover is not None:
+        options["review_days"] = min(max(cover, 0), 365)
+    return options
+
+
+@bp.route('/usuario/<int:user_id>/inventario/reposicion', methods=['GET', 'OPTIONS'])
+def obtener_reposicion(user_id):
+    """Obtiene punto de pedido y cantidad sugerida de cada producto"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        plan = Replenishment.plan(user_id, **_replenishment_options())
+        if request.args.get('solo_sugeridos', '0') in ('1', 'true'):
+            plan = [item for item in plan if item["suggested_quantity"] > 0]
+        return jsonify({"data": plan}), 200
+        
+    except Exception as e:
+        print(f"ERROR en GET reposicion: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@bp.route('/usuario/<int:user_id>/inventario/reposicion/pedidos', methods=['POST', 'OPTIONS'])
+@idempotent
+def crear_pedido_reposicion(user_id):
+    """Crea una orden pendiente con las cantidades sugeridas"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        data = request.get_json(silent=True) or {}
+        product_ids = data.get('product_ids')
+        if product_ids is not None and not all(isinstance(p, int) for p in product_ids):
+            return jsonify({"error": "product_ids debe ser una lista de ids"}), 400
+        
+        order_id, items = Replenishment.draft_order(user_id, product_ids, **_replenishment_options())
+        if order_id is None:
+            return jsonify({"message": "No hay artículos para reponer", "order_id": None, "items": []}), 200
+        
+        return jsonify({
+            "message": "Orden de reposición creada",
+            "order_id": order_id,
+            "items": [
+                {"product_id": item["product_id"], "quantity": item["suggested_quantity"]}
+                for item in items
+            ]
+        }), 201
+        
+    except Exception as e:
+        print(f"ERROR en POST reposicion: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@bp.route('/usuario/<int:user_id>/inventario/estadisticas', methods=['GET', 'OPTIONS'])
 def obtener_estadisticas_inventario(user_id):
     """Obtiene estadísticas del inventario"""
     if request.method == 'OPTIONS':
@@ -154,8 +237,7 @@ def obtener_estadisticas_inventario(user_id):
         cursor.execute('''
             SELECT COUNT(*) 
             FROM stock s 
-            JOIN products p ON s.product_id = p.id 
-            WHERE p.user_id = %s AND s.quantity <= 5 AND s.quantity > 0
+            WHERE s.user_id = %s AND s.low_stock = 1 AND s.quantity > 0
         ''', (user_id,))
         low_stock = cursor.fetchone()[0]
         
@@ -181,5 +263,3 @@ def obtener_estadisticas_inventario(user_id):
     except Exception as e:
         print(f"ERROR en GET estadisticas: {str(e)}")
         return jsonify({"error": str(e)}), 500
-
-print("✅ Rutas de inventario/stock cargadas correctamente")
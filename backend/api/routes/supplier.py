@@ -1,52 +1,70 @@
-from api import app
-from flask import request, jsonify
+from flask import Blueprint, request, jsonify
 from api.db.db_config import get_db_connection
+from api.models.counters import ProductCounters
+from api.models.search import Search
+from api.models.supplier_catalog import SupplierCatalog
+from api.utils import columnar, fieldsets
+import io
+import os
+
+bp = Blueprint('supplier', __name__)
+
+# Máximo de productos por petición de vinculación masiva
+BULK_MAX_IDS = int(os.getenv('SUPPLIER_BULK_MAX_IDS', '10000'))
+
+# Filas por INSERT/DELETE y por consulta IN en la vinculación masiva
+BULK_BATCH_SIZE = 500
+
+# Campos de GET /distribuidores (?campos=): nombre -> (expresión SQL, join que necesita)
+SUPPLIER_FIELDS = {
+    "id": ("id", None),
+    "name": ("name_supplier", None),
+    "contact": ("''", None),
+    "phone": ("COALESCE(phone, '')", None),
+    "email": ("COALESCE(mail, '')", None),
+    "product_count": ("product_count", None),
+}
 
 # RUTAS DE PROVEEDORES
 
-@app.route('/usuario/<int:user_id>/distribuidores', methods=['GET', 'OPTIONS'])
+@bp.route('/usuario/<int:user_id>/distribuidores', methods=['GET', 'OPTIONS'])
 def obtener_distribuidores(user_id):
-    """Obtiene todos los proveedores"""
+    """
+    Obtiene todos los proveedores (?campos=name,phone: solo esos campos;
+    ?formato=columnas: columnas + filas)
+    """
     if request.method == 'OPTIONS':
         return '', 200
     
     try:
+        try:
+            columns = fieldsets.requested(SUPPLIER_FIELDS)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        fields, _, _ = fieldsets.select(SUPPLIER_FIELDS, {}, columns)
+        
         connection = get_db_connection()
         cursor = connection.cursor()
         
-        cursor.execute('''
-            SELECT s.id, s.name_supplier, s.phone, s.mail,
-                   COUNT(sp.product_id) as product_count
-            FROM suppliers s
-            LEFT JOIN suppliers_products sp ON s.id = sp.supplier_id
-            WHERE s.user_id = %s
-            GROUP BY s.id
-            ORDER BY s.name_supplier
+        cursor.execute(f'''
+            SELECT {fields}
+            FROM suppliers
+            WHERE user_id = %s
+            ORDER BY name_supplier
         ''', (user_id,))
         
         rows = cursor.fetchall()
         cursor.close()
         connection.close()
         
-        suppliers = []
-        for row in rows:
-            suppliers.append({
-                "id": row[0],
-                "name": row[1],
-                "contact": "",
-                "phone": row[2] or "",
-                "email": row[3] or "",
-                "product_count": row[4]
-            })
-        
-        return jsonify({"data": suppliers}), 200
+        return jsonify(columnar.body(columns, rows)), 200
         
     except Exception as e:
         print(f"ERROR en GET distribuidores: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/usuario/<int:user_id>/distribuidores', methods=['POST'])
+@bp.route('/usuario/<int:user_id>/distribuidores', methods=['POST'])
 def crear_distribuidor(user_id):
     """Crea un nuevo proveedor"""
     try:
@@ -77,6 +95,7 @@ def crear_distribuidor(user_id):
         connection.commit()
         cursor.close()
         connection.close()
+        Search.invalidate(user_id)
         
         return jsonify({"message": "Proveedor creado exitosamente"}), 201
         
@@ -85,7 +104,7 @@ def crear_distribuidor(user_id):
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/usuario/<int:user_id>/distribuidores/<int:supplier_id>', methods=['DELETE', 'OPTIONS'])
+@bp.route('/usuario/<int:user_id>/distribuidores/<int:supplier_id>', methods=['DELETE', 'OPTIONS'])
 def eliminar_distribuidor(user_id, supplier_id):
     """Elimina un proveedor"""
     if request.method == 'OPTIONS':
@@ -116,6 +135,7 @@ def eliminar_distribuidor(user_id, supplier_id):
         connection.commit()
         cursor.close()
         connection.close()
+        Search.invalidate(user_id)
         
         return jsonify({"message": "Proveedor eliminado exitosamente"}), 200
         
@@ -126,7 +146,7 @@ def eliminar_distribuidor(user_id, supplier_id):
 
 # MEJORA 3: VINCULAR PROVEEDOR CON PRODUCTO
 
-@app.route('/usuario/<int:user_id>/proveedores/<int:supplier_id>/productos/<int:product_id>', methods=['POST', 'OPTIONS'])
+@bp.route('/usuario/<int:user_id>/proveedores/<int:supplier_id>/productos/<int:product_id>', methods=['POST', 'OPTIONS'])
 def vincular_proveedor_producto(user_id, supplier_id, product_id):
     """Vincula un proveedor con un producto"""
     if request.method == 'OPTIONS':
@@ -136,11 +156,8 @@ def vincular_proveedor_producto(user_id, supplier_id, product_id):
         connection = get_db_connection()
         cursor = connection.cursor()
         
-        cursor.execute(
-            'SELECT id FROM suppliers WHERE id = %s AND user_id = %s',
-            (supplier_id, user_id)
-        )
-        if not cursor.fetchone():
+        # Bloquea el proveedor (su contador) antes de tocar los vínculos
+        if not ProductCounters.lock_supplier(cursor, user_id, supplier_id):
             cursor.close()
             connection.close()
             return jsonify({"error": "Proveedor no encontrado"}), 404
@@ -167,6 +184,7 @@ def vincular_proveedor_producto(user_id, supplier_id, product_id):
             'INSERT INTO suppliers_products (supplier_id, product_id, user_id) VALUES (%s, %s, %s)',
             (supplier_id, product_id, user_id)
         )
+        ProductCounters.adjust_supplier(cursor, user_id, supplier_id, 1)
         connection.commit()
         cursor.close()
         connection.close()
@@ -178,13 +196,14 @@ def vincular_proveedor_producto(user_id, supplier_id, product_id):
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/usuario/<int:user_id>/proveedores/<int:supplier_id>/productos/<int:product_id>', methods=['DELETE'])
+@bp.route('/usuario/<int:user_id>/proveedores/<int:supplier_id>/productos/<int:product_id>', methods=['DELETE'])
 def desvincular_proveedor_producto(user_id, supplier_id, product_id):
     """Elimina la relación entre proveedor y producto"""
     try:
         connection = get_db_connection()
         cursor = connection.cursor()
         
+        ProductCounters.lock_supplier(cursor, user_id, supplier_id)
         cursor.execute(
             'DELETE FROM suppliers_products WHERE supplier_id = %s AND product_id = %s AND user_id = %s',
             (supplier_id, product_id, user_id)
@@ -195,6 +214,7 @@ def desvincular_proveedor_producto(user_id, supplier_id, product_id):
             connection.close()
             return jsonify({"error": "Relación no encontrada"}), 404
         
+        ProductCounters.adjust_supplier(cursor, user_id, supplier_id, -1)
         connection.commit()
         cursor.close()
         connection.close()
@@ -206,7 +226,107 @@ def desvincular_proveedor_producto(user_id, supplier_id, product_id):
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/usuario/<int:user_id>/distribuidores/<int:supplier_id>/productos', methods=['GET', 'OPTIONS'])
+def _bulk_product_ids(data):
+    """
+    Lee 'product_ids' del cuerpo: devuelve (ids únicos en orden, inválidos)
+    o None si no es una lista.
+    """
+    raw = (data or {}).get('product_ids')
+    if not isinstance(raw, list):
+        return None
+    ids, invalid, seen = [], [], set()
+    for value in raw:
+        if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+            invalid.append(value)
+        elif value not in seen:
+            seen.add(value)
+            ids.append(value)
+    return ids, invalid
+
+
+@bp.route('/usuario/<int:user_id>/proveedores/<int:supplier_id>/productos', methods=['POST', 'DELETE', 'OPTIONS'])
+def vincular_productos_masivo(user_id, supplier_id):
+    """
+    Vincula (POST) o desvincula (DELETE) una lista de productos de un proveedor.
+
+    Cuerpo: {"product_ids": [...]}. La propiedad se comprueba con dos consultas
+    (proveedor y productos del lote) y los cambios van en lotes de varias filas
+    dentro de una sola transacción.
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    parsed = _bulk_product_ids(request.get_json(silent=True))
+    if parsed is None:
+        return jsonify({"error": "product_ids debe ser una lista de ids"}), 400
+    ids, invalid = parsed
+    if len(ids) + len(invalid) > BULK_MAX_IDS:
+        return jsonify({"error": f"Máximo {BULK_MAX_IDS} productos por petición"}), 400
+    
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        
+        if not ProductCounters.lock_supplier(cursor, user_id, supplier_id):
+            cursor.close()
+            connection.close()
+            return jsonify({"error": "Proveedor no encontrado"}), 404
+        
+        owned = set()
+        for start in range(0, len(ids), BULK_BATCH_SIZE):
+            batch = ids[start:start + BULK_BATCH_SIZE]
+            cursor.execute(
+                f"SELECT id FROM products WHERE user_id = %s AND id IN ({', '.join(['%s'] * len(batch))})",
+                [user_id] + batch
+            )
+            owned.update(row[0] for row in cursor.fetchall())
+        invalid += [pid for pid in ids if pid not in owned]
+        valid = [pid for pid in ids if pid in owned]
+        
+        changed = 0
+        try:
+            for start in range(0, len(valid), BULK_BATCH_SIZE):
+                batch = valid[start:start + BULK_BATCH_SIZE]
+                if request.method == 'POST':
+                    params = []
+                    for pid in batch:
+                        params += [supplier_id, pid, user_id]
+                    cursor.execute(
+                        'INSERT IGNORE INTO suppliers_products (supplier_id, product_id, user_id) VALUES '
+                        + ', '.join(['(%s, %s, %s)'] * len(batch)),
+                        params
+                    )
+                else:
+                    cursor.execute(
+                        f"DELETE FROM suppliers_products WHERE supplier_id = %s AND user_id = %s "
+                        f"AND product_id IN ({', '.join(['%s'] * len(batch))})",
+                        [supplier_id, user_id] + batch
+                    )
+                changed += cursor.rowcount
+            ProductCounters.adjust_supplier(cursor, user_id, supplier_id, changed if request.method == 'POST' else -changed)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+        
+        # Omitidos: ya vinculados (POST) o sin vínculo (DELETE)
+        key = "linked" if request.method == 'POST' else "unlinked"
+        return jsonify({
+            key: changed,
+            "skipped": len(valid) - changed,
+            "invalid": len(invalid),
+            "invalid_ids": invalid
+        }), 200
+        
+    except Exception as e:
+        print(f"ERROR en vincular masivo: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@bp.route('/usuario/<int:user_id>/distribuidores/<int:supplier_id>/productos', methods=['GET', 'OPTIONS'])
 def obtener_productos_proveedor(user_id, supplier_id):
     """Obtiene todos los productos de un proveedor"""
     if request.method == 'OPTIONS':
@@ -242,7 +362,7 @@ def obtener_productos_proveedor(user_id, supplier_id):
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/usuario/<int:user_id>/articulos/<int:product_id>/proveedores', methods=['GET', 'OPTIONS'])
+@bp.route('/usuario/<int:user_id>/articulos/<int:product_id>/proveedores', methods=['GET', 'OPTIONS'])
 def obtener_proveedores_producto(user_id, product_id):
     """Obtiene todos los proveedores de un producto"""
     if request.method == 'OPTIONS':
@@ -253,10 +373,11 @@ def obtener_proveedores_producto(user_id, product_id):
         cursor = connection.cursor()
         
         cursor.execute('''
-            SELECT s.id, s.name_supplier, s.phone, s.mail
+            SELECT s.id, s.name_supplier, s.phone, s.mail, sp.cost, sp.lead_time_days
             FROM suppliers s
             INNER JOIN suppliers_products sp ON s.id = sp.supplier_id
             WHERE sp.product_id = %s AND sp.user_id = %s
+            ORDER BY sp.cost IS NULL, sp.cost, s.id
         ''', (product_id, user_id))
         
         rows = cursor.fetchall()
@@ -269,7 +390,9 @@ def obtener_proveedores_producto(user_id, product_id):
                 "id": row[0],
                 "name": row[1],
                 "phone": row[2] or "",
-                "email": row[3] or ""
+                "email": row[3] or "",
+                "cost": float(row[4]) if row[4] is not None else None,
+                "lead_time_days": row[5]
             })
         
         return jsonify({"data": suppliers}), 200
@@ -279,4 +402,49 @@ def obtener_proveedores_producto(user_id, product_id):
         return jsonify({"error": str(e)}), 500
 
 
-print("✅ Rutas de proveedores cargadas correctamente")
\ No newline at end of file
+# LISTAS DE PRECIOS DE PROVEEDORES
+
+@bp.route('/usuario/<int:user_id>/distribuidores/<int:supplier_id>/lista-precios', methods=['POST', 'OPTIONS'])
+def importar_lista_precios(user_id, supplier_id):
+    """Importa un CSV con costo y plazo de entrega por producto del proveedor"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    delimiter = request.args.get('separador', ',')
+    if delimiter == 'tab':
+        delimiter = '\t'
+    if len(delimiter) != 1:
+        return jsonify({"error": "separador debe ser un solo carácter"}), 400
+    
+    try:
+        # Archivo de un formulario o el cuerpo crudo; se lee sin cargarlo entero
+        upload = request.files.get('archivo')
+        stream = upload.stream if upload else request.stream
+        lines = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        
+        result = SupplierCatalog.import_csv(user_id, supplier_id, lines, delimiter)
+        if result is None:
+            return jsonify({"error": "Proveedor no encontrado"}), 404
+        
+        return jsonify(result), 200
+        
+    except UnicodeDecodeError:
+        return jsonify({"error": "El archivo debe estar en UTF-8"}), 400
+    except Exception as e:
+        print(f"ERROR en importar lista de precios: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@bp.route('/usuario/<int:user_id>/distribuidores/mas-baratos', methods=['GET', 'OPTIONS'])
+def obtener_proveedores_mas_baratos(user_id):
+    """Obtiene el proveedor de menor costo de cada artículo"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        product_id = request.args.get('product_id', type=int)
+        return jsonify({"data": SupplierCatalog.cheapest(user_id, product_id)}), 200
+        
+    except Exception as e:
+        print(f"ERROR en GET mas-baratos: {str(e)}")
+        return jsonify({"error": str(e)}), 500
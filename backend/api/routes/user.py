@@ -1,9 +1,10 @@
-from api import app
-from flask import request, jsonify
+from flask import Blueprint, request, jsonify
 from api.models.user import User
 from api.db.db_config import DBError
 
-@app.route('/register', methods=['POST'])
+bp = Blueprint('user', __name__)
+
+@bp.route('/register', methods=['POST'])
 def register():
     """
     Endpoint para registrar un nuevo usuario.
@@ -24,7 +25,7 @@ def register():
             return jsonify(info), info["code"]
         return jsonify({"message": str(e)}), 400
     
-@app.route('/login', methods=['POST'])
+@bp.route('/login', methods=['POST'])
 def login():
     """
     Endpoint para iniciar sesión.
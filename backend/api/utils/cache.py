@@ -0,0 +1,79 @@
+# Módulo de cachés en memoria del proceso
+import threading
+import time
+from collections import OrderedDict
+
+# Registro de todas las cachés creadas (nombre -> instancia)
+_registry = {}
+
+
+class LRUCache:
+    """
+    Caché LRU en memoria con expiración opcional.
+
+    Es local a cada proceso worker: sirve para evitar recalcular estructuras
+    costosas (índices, informes) entre peticiones, no para compartir estado.
+    Lleva la cuenta de aciertos y fallos para poder medir su efectividad.
+    """
+
+    def __init__(self, name, maxsize=128, ttl=None):
+        """
+        Args:
+            name (str): Nombre de la caché (se usa en el registro)
+            maxsize (int): Cantidad máxima de entradas
+            ttl (float): Segundos de validez de cada entrada (None = sin expiración)
+        """
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        _registry[name] = self
+
+    def get(self, key, default=None):
+        """Obtiene un valor de la caché, o default si no existe o expiró"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        """Guarda un valor, descartando la entrada menos usada si está llena"""
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key=None):
+        """Elimina una entrada, o todas si no se indica clave"""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def stats(self):
+        """Retorna estadísticas de uso de la caché"""
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+def get_caches():
+    """Retorna todas las cachés registradas"""
+    return dict(_registry)
@@ -0,0 +1,63 @@
+# Formato columnar de los listados: {"columns": [...], "rows": [[...], ...]}
+from flask import request
+
+
+def requested():
+    """True si la petición pide el formato columnar (?formato=columnas o ?format=columns)"""
+    return request.args.get('formato', request.args.get('format', '')) in ('columnas', 'columns')
+
+
+def convert(rows, converters):
+    """
+    Aplica las conversiones ({índice: función}) solo a esas columnas,
+    transponiendo con zip en lugar de recorrer cada fila en Python.
+    """
+    if not converters or not rows:
+        return rows
+    values = list(zip(*rows))
+    for index, function in converters.items():
+        values[index] = map(function, values[index])
+    return list(zip(*values))
+
+
+def table(columns, rows, converters=None):
+    """
+    Arma el cuerpo columnar directamente con las tuplas del cursor, sin un
+    diccionario por fila: los nombres de las columnas van una sola vez.
+
+    Args:
+        columns (list): Nombre de cada posición de las tuplas
+        rows (list): Filas tal como las devuelve fetchall()
+        converters (dict): Índice de columna -> función, solo para las que
+            la necesitan (ej. DECIMAL -> float)
+
+    Returns:
+        dict: {"columns": [...], "rows": [[...], ...]}
+    """
+    return {"columns": list(columns), "rows": convert(rows, converters)}
+
+
+def price(value):
+    """Precio como float; el cero (o nulo) como 0, como siempre lo devolvieron los listados"""
+    return float(value) if value else 0
+
+
+def _by_index(columns, converters):
+    """Nombre de columna -> función a índice -> función (ignora las ausentes)"""
+    return {index: converters[name] for index, name in enumerate(columns) if name in (converters or {})}
+
+
+def body(columns, rows, converters=None, table_converters=None):
+    """
+    Cuerpo del listado en el formato pedido: columnar con ?formato=columnas,
+    si no {"data": [objeto por fila]}.
+
+    Args:
+        converters (dict): Nombre de columna -> función (las ausentes en
+            'columns' se ignoran)
+        table_converters (dict): Las del formato columnar, si difieren
+            (ej. el precio 0 sale como 0 en objetos y como 0.0 en columnas)
+    """
+    if requested():
+        return table(columns, rows, _by_index(columns, converters if table_converters is None else table_converters))
+    return {"data": [dict(zip(columns, row)) for row in convert(rows, _by_index(columns, converters))]}
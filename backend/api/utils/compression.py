@@ -0,0 +1,165 @@
+# Módulo de compresión de respuestas (gzip y, si está instalado, brotli)
+import zlib
+
+from flask import current_app, request
+from werkzeug.wsgi import ClosingIterator
+
+from api.utils import metrics
+
+# Brotli es opcional: sin él solo se ofrece gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Tipos de contenido que vale la pena comprimir (los binarios ya comprimidos,
+# como los .gz y .xlsx de la exportación, se envían tal cual)
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'text/plain',
+    'text/csv',
+    'text/html',
+)
+
+# En respuestas en streaming, bytes sin comprimir que se acumulan antes de
+# forzar el envío de un bloque comprimido
+STREAM_FLUSH_BYTES = 16 * 1024
+
+metrics.describe("http_compressed_responses_total", "counter", "Respuestas comprimidas por codificación")
+metrics.describe("http_compression_bytes_total", "counter", "Bytes de las respuestas comprimidas antes y después de comprimir")
+
+
+class GzipEncoder:
+    name = 'gzip'
+
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        """Comprime de una vez el cuerpo completo"""
+        return self._compressor.compress(data) + self._compressor.flush()
+
+    def process(self, data, flush):
+        output = self._compressor.compress(data)
+        return output + self._compressor.flush(zlib.Z_SYNC_FLUSH) if flush else output
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    name = 'br'
+
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=quality)
+
+    def compress(self, data):
+        """Comprime de una vez el cuerpo completo"""
+        return self._compressor.process(data) + self._compressor.finish()
+
+    def process(self, data, flush):
+        output = self._compressor.process(data)
+        return output + self._compressor.flush() if flush else output
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def available_encodings():
+    """Codificaciones soportadas, en orden de preferencia a igual calidad"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def get_encoder(encoding, config):
+    """Compresor para 'encoding' con el nivel configurado"""
+    if encoding == 'br':
+        return BrotliEncoder(config['COMPRESS_BROTLI_QUALITY'])
+    return GzipEncoder(config['COMPRESS_GZIP_LEVEL'])
+
+
+def _compressible(response):
+    if response.mimetype not in COMPRESSIBLE_TYPES:
+        return False
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    # Archivos servidos con send_file (admiten rangos) y respuestas ya codificadas
+    if response.direct_passthrough or 'Content-Encoding' in response.headers:
+        return False
+    return 'no-transform' not in response.headers.get('Cache-Control', '')
+
+
+def _count(encoding, original, compressed):
+    metrics.registry.inc("http_compressed_responses_total", (("encoding", encoding),))
+    metrics.registry.inc("http_compression_bytes_total", (("encoding", encoding), ("stage", "original")), original)
+    metrics.registry.inc("http_compression_bytes_total", (("encoding", encoding), ("stage", "compressed")), compressed)
+
+
+def _stream(chunks, encoder):
+    """
+    Comprime al vuelo los bloques de una respuesta en streaming. Se fuerza
+    el envío cada STREAM_FLUSH_BYTES para que el cliente reciba datos a
+    medida que se generan, sin cortar la compresión en bloques diminutos.
+    """
+    original = compressed = pending = 0
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        original += len(chunk)
+        pending += len(chunk)
+        output = encoder.process(chunk, pending >= STREAM_FLUSH_BYTES)
+        if pending >= STREAM_FLUSH_BYTES:
+            pending = 0
+        if output:
+            compressed += len(output)
+            yield output
+    output = encoder.finish()
+    compressed += len(output)
+    yield output
+    _count(encoder.name, original, compressed)
+
+
+def compress_response(response):
+    """
+    Comprime la respuesta con la mejor codificación que acepte el cliente
+    (Accept-Encoding). Las respuestas completas más chicas que
+    COMPRESS_MIN_SIZE se envían sin comprimir; las de streaming se
+    comprimen siempre, bloque a bloque.
+    """
+    config = current_app.config
+    if not config['COMPRESS_ENABLED'] or not _compressible(response):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(available_encodings())
+    if encoding is None:
+        return response
+    encoder = get_encoder(encoding, config)
+
+    if response.is_streamed:
+        # Al cerrar la respuesta (o si el cliente corta) se cierra también el
+        # generador original, que libera lo que tenga abierto (ej. el cursor)
+        chunks = response.response
+        response.response = ClosingIterator(_stream(chunks, encoder), getattr(chunks, 'close', None))
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < config['COMPRESS_MIN_SIZE']:
+            return response
+        compressed = encoder.compress(data)
+        response.set_data(compressed)
+        _count(encoding, len(data), len(compressed))
+
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_app(app):
+    """Comprime las respuestas antes de enviarlas"""
+
+    @app.after_request
+    def _compress(response):
+        try:
+            return compress_response(response)
+        except Exception as e:
+            print(f"ERROR comprimiendo respuesta: {str(e)}")
+            return response
@@ -0,0 +1,118 @@
+# Módulo de exportación en streaming (CSV / XLSX, opcionalmente con gzip)
+import csv
+import io
+import os
+import tempfile
+import zlib
+
+# XlsxWriter es opcional: sin él solo se exporta CSV
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+FORMATS = ('csv', 'xlsx')
+
+# Filas que se piden a la base por vuelta (fetchmany)
+FETCH_SIZE = int(os.getenv('EXPORT_FETCH_SIZE', '2000'))
+
+# Bytes de CSV que se acumulan antes de enviar un bloque
+CHUNK_BYTES = 64 * 1024
+
+# Nivel de compresión del gzip al vuelo (1 = más rápido, 9 = más chico)
+GZIP_LEVEL = int(os.getenv('EXPORT_GZIP_LEVEL', '6'))
+
+# Filas de datos que admite una hoja de Excel (sin contar la cabecera)
+XLSX_MAX_ROWS = 1048575
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+def available_formats():
+    """Formatos que se pueden generar con las dependencias instaladas"""
+    return FORMATS if xlsxwriter is not None else ('csv',)
+
+
+def cursor_rows(cursor, size=FETCH_SIZE):
+    """Itera las filas del cursor de a 'size' sin traer el resultado completo"""
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield from rows
+
+
+def csv_chunks(header, rows):
+    """
+    Genera el CSV en bloques de ~CHUNK_BYTES (UTF-8 con BOM, para que Excel
+    detecte la codificación). La memoria usada no depende de la cantidad de filas.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def xlsx_chunks(header, rows, sheet_name='Datos'):
+    """
+    Genera un XLSX con XlsxWriter en modo constant_memory: cada fila se vuelca
+    a disco al escribir la siguiente. El archivo ZIP solo puede enviarse al
+    cerrarlo, así que se arma en un temporal y se envía en bloques. Las filas
+    que exceden el límite de una hoja (XLSX_MAX_ROWS) se omiten.
+    """
+    with tempfile.TemporaryFile() as output:
+        workbook = xlsxwriter.Workbook(output, {
+            'constant_memory': True,
+            'tmpdir': tempfile.gettempdir(),
+            'default_date_format': 'yyyy-mm-dd'
+        })
+        sheet = workbook.add_worksheet(sheet_name[:31])
+        bold = workbook.add_format({'bold': True})
+        sheet.write_row(0, 0, header, bold)
+        for number, row in enumerate(rows, start=1):
+            # Se siguen leyendo (sin escribir) para no dejar resultados pendientes
+            # en el cursor
+            if number <= XLSX_MAX_ROWS:
+                sheet.write_row(number, 0, row)
+        workbook.close()
+
+        output.seek(0)
+        while True:
+            chunk = output.read(CHUNK_BYTES)
+            if not chunk:
+                return
+            yield chunk
+
+
+def gzip_chunks(chunks, level=GZIP_LEVEL):
+    """Comprime al vuelo los bloques de otro generador (formato gzip)"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream(header, rows, fmt='csv', gzip=False, sheet_name='Datos'):
+    """
+    Bloques de bytes del archivo exportado.
+
+    Args:
+        header (list): Nombres de las columnas
+        rows (iterable): Filas (tuplas); se consumen de a una
+        fmt (str): 'csv' o 'xlsx'
+        gzip (bool): Comprimir el resultado
+    """
+    chunks = xlsx_chunks(header, rows, sheet_name) if fmt == 'xlsx' else csv_chunks(header, rows)
+    return gzip_chunks(chunks) if gzip else chunks
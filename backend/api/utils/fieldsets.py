@@ -0,0 +1,46 @@
+# Selección de campos de los listados (?campos=id,name,... o ?fields=...)
+from flask import request
+
+
+def requested(fields):
+    """
+    Campos pedidos, en el orden de la lista blanca (el id va siempre). Sin
+    el parámetro, todos.
+
+    Args:
+        fields (dict): Nombre -> (expresión SQL, join que necesita o None)
+
+    Raises:
+        ValueError: Si se pide un campo que no está en la lista blanca
+    """
+    raw = request.args.get('campos', request.args.get('fields', ''))
+    names = {name.strip() for name in raw.split(',') if name.strip()}
+    if not names:
+        return list(fields)
+    unknown = names - fields.keys()
+    if unknown:
+        raise ValueError(
+            f"Campos desconocidos: {', '.join(sorted(unknown))}. Disponibles: {', '.join(fields)}"
+        )
+    return [name for name in fields if name == 'id' or name in names]
+
+
+def select(fields, joins, names):
+    """
+    Arma la lista del SELECT y los JOIN para los campos 'names': los JOIN
+    que ningún campo pedido necesita no se agregan a la consulta.
+
+    Args:
+        fields (dict): Nombre -> (expresión SQL, join que necesita o None)
+        joins (dict): Nombre del join -> cláusula JOIN, en el orden a aplicar
+        names (list): Campos pedidos (de requested)
+
+    Returns:
+        tuple: (lista del SELECT, cláusulas JOIN, nombres de los joins usados)
+    """
+    used = {fields[name][1] for name in names} - {None}
+    return (
+        ', '.join(fields[name][0] for name in names),
+        '\n'.join(clause for join, clause in joins.items() if join in used),
+        used
+    )
@@ -0,0 +1,112 @@
+# Módulo de pronóstico de demanda por suavizado exponencial
+import numpy as np
+
+# Valores de alfa (nivel) y beta (tendencia) que se prueban al ajustar
+ALPHAS = np.array([0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9])
+BETAS = np.array([0.05, 0.1, 0.2, 0.3])
+
+METHODS = ('simple', 'holt')
+
+
+def weekly_matrix(product_index, week_index, quantity, n_products, n_weeks):
+    """Matriz productos × semanas con las unidades pedidas (np.add.at)"""
+    matrix = np.zeros((n_products, n_weeks))
+    np.add.at(matrix, (product_index, week_index), quantity)
+    return matrix
+
+
+def _simple(series, alpha):
+    """
+    Suavizado exponencial simple de todas las filas a la vez.
+
+    El bucle recorre las semanas (pocas); cada paso opera sobre todos los
+    productos como un vector.
+
+    Returns:
+        tuple: (nivel final, pronósticos un paso adelante de cada semana)
+    """
+    level = series[:, 0].copy()
+    fitted = np.empty_like(series)
+    fitted[:, 0] = level
+    for t in range(1, series.shape[1]):
+        fitted[:, t] = level
+        level = alpha * series[:, t] + (1 - alpha) * level
+    return level, fitted
+
+
+def _holt(series, alpha, beta):
+    """
+    Suavizado de Holt (nivel + tendencia) de todas las filas a la vez.
+
+    Returns:
+        tuple: (nivel final, tendencia final, pronósticos un paso adelante)
+    """
+    level = series[:, 0].copy()
+    # Tendencia inicial nula: con series ruidosas la diferencia de las dos
+    # primeras semanas arrastra una pendiente espuria
+    trend = np.zeros(series.shape[0])
+    fitted = np.empty_like(series)
+    fitted[:, 0] = level
+    for t in range(1, series.shape[1]):
+        fitted[:, t] = level + trend
+        previous = level
+        level = alpha * series[:, t] + (1 - alpha) * (level + trend)
+        trend = beta * (level - previous) + (1 - beta) * trend
+    return level, trend, fitted
+
+
+def _errors(series, fitted):
+    """Errores un paso adelante (sin la primera semana, que no tiene pronóstico)"""
+    return series[:, 1:] - fitted[:, 1:]
+
+
+def fit(series, horizon, method='simple'):
+    """
+    Ajusta el suavizado de cada producto (el alfa, y beta con Holt, que minimiza
+    el error cuadrático un paso adelante) y pronostica 'horizon' semanas.
+
+    Args:
+        series (ndarray): Matriz productos × semanas (la última es la más reciente)
+        horizon (int): Semanas a pronosticar
+        method (str): 'simple' o 'holt'
+
+    Returns:
+        dict: Arrays "forecast" (productos × horizon), "alpha", "beta", "mae",
+        "rmse" y "mape" (NaN si el producto no tuvo demanda)
+    """
+    n = series.shape[0]
+    best_sse = np.full(n, np.inf)
+    best = {"forecast": np.zeros((n, horizon)), "alpha": np.zeros(n), "beta": np.zeros(n),
+            "errors": np.zeros((n, max(series.shape[1] - 1, 0)))}
+    steps = np.arange(1, horizon + 1)
+
+    combos = [(a, None) for a in ALPHAS] if method == 'simple' else [(a, b) for a in ALPHAS for b in BETAS]
+    for alpha, beta in combos:
+        if beta is None:
+            level, fitted = _simple(series, alpha)
+            forecast = np.repeat(level[:, None], horizon, axis=1)
+        else:
+            level, trend, fitted = _holt(series, alpha, beta)
+            forecast = level[:, None] + trend[:, None] * steps[None, :]
+        errors = _errors(series, fitted)
+        sse = (errors ** 2).sum(axis=1)
+        better = sse < best_sse
+        best_sse = np.where(better, sse, best_sse)
+        best["forecast"][better] = forecast[better]
+        best["errors"][better] = errors[better]
+        best["alpha"][better] = alpha
+        best["beta"][better] = beta or 0.0
+
+    errors = best.pop("errors")
+    actual = series[:, 1:]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        best["mae"] = np.abs(errors).mean(axis=1) if errors.size else np.zeros(n)
+        best["rmse"] = np.sqrt((errors ** 2).mean(axis=1)) if errors.size else np.zeros(n)
+        nonzero = actual > 0
+        best["mape"] = np.where(
+            nonzero.any(axis=1),
+            (np.abs(errors) / np.where(nonzero, actual, 1) * nonzero).sum(axis=1) / nonzero.sum(axis=1),
+            np.nan
+        )
+    best["forecast"] = np.maximum(best["forecast"], 0)
+    return best
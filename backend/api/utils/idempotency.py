@@ -0,0 +1,220 @@
+# Módulo de idempotencia de escrituras (header Idempotency-Key)
+import datetime
+import functools
+import hashlib
+import os
+import threading
+import time
+
+from flask import Response, jsonify, make_response, request
+
+from api.db import db_config
+from api.utils import metrics
+
+HEADER = 'Idempotency-Key'
+
+# Segundos que se guarda la respuesta de una clave (reintentos dentro de ese plazo
+# reciben la respuesta original)
+TTL_SECONDS = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', str(24 * 3600)))
+
+# Segundos que una clave queda reservada por la petición que la está ejecutando;
+# pasado ese plazo (ej: el worker murió) otro reintento puede tomarla
+LOCK_SECONDS = int(os.getenv('IDEMPOTENCY_LOCK_SECONDS', '60'))
+
+# Cada cuántos segundos se borran las claves vencidas, y cuántas por transacción
+PURGE_INTERVAL = float(os.getenv('IDEMPOTENCY_PURGE_INTERVAL', '300'))
+PURGE_BATCH = 1000
+
+MAX_KEY_LENGTH = 255
+
+metrics.describe("idempotency_requests_total", "counter", "Escrituras con Idempotency-Key por resultado")
+
+_purger_pid = None
+_purger_lock = threading.Lock()
+
+
+def _now():
+    return datetime.datetime.now().replace(microsecond=0)
+
+
+def _request_hash():
+    """Huella de la petición: una clave reutilizada con otro cuerpo es un error"""
+    digest = hashlib.sha256(f"{request.method} {request.path}\n".encode())
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def _claim(cursor, user_id, key, request_hash):
+    """
+    Intenta reservar la clave. La clave primaria (user_id, idem_key) hace que
+    solo un INSERT gane aunque lleguen reintentos simultáneos a varios workers.
+
+    Returns:
+        tuple: (True, None) si se reservó, o (False, fila existente)
+    """
+    now = _now()
+    locked_until = now + datetime.timedelta(seconds=LOCK_SECONDS)
+    expires_at = now + datetime.timedelta(seconds=TTL_SECONDS)
+
+    # Una clave vencida se puede reutilizar como nueva
+    cursor.execute(
+        'DELETE FROM idempotency_keys WHERE user_id = %s AND idem_key = %s AND expires_at < %s',
+        (user_id, key, now)
+    )
+    cursor.execute('''
+        INSERT IGNORE INTO idempotency_keys (user_id, idem_key, request_hash, locked_until, expires_at)
+        VALUES (%s, %s, %s, %s, %s)
+    ''', (user_id, key, request_hash, locked_until, expires_at))
+    if cursor.rowcount == 1:
+        return True, None
+
+    # Una reserva abandonada (sin respuesta y con el plazo vencido) se toma de nuevo
+    cursor.execute('''
+        UPDATE idempotency_keys SET locked_until = %s
+        WHERE user_id = %s AND idem_key = %s AND request_hash = %s
+          AND status_code IS NULL AND locked_until < %s
+    ''', (locked_until, user_id, key, request_hash, now))
+    if cursor.rowcount == 1:
+        return True, None
+
+    cursor.execute(
+        'SELECT request_hash, status_code, response_body FROM idempotency_keys WHERE user_id = %s AND idem_key = %s',
+        (user_id, key)
+    )
+    return False, cursor.fetchone()
+
+
+def _execute(user_id, sql, params):
+    connection = db_config.get_db_connection(user_id)
+    try:
+        cursor = connection.cursor()
+        cursor.execute(sql, params)
+        connection.commit()
+        cursor.close()
+    finally:
+        connection.close()
+
+
+def _replay(row, request_hash):
+    """Respuesta para una clave ya usada: la original, o un error si no corresponde"""
+    stored_hash, status_code, body = row
+    if stored_hash != request_hash:
+        metrics.registry.inc("idempotency_requests_total", (("resultado", "conflicto"),))
+        return jsonify({"error": f"{HEADER} ya usada con otra petición"}), 422
+    if status_code is None:
+        metrics.registry.inc("idempotency_requests_total", (("resultado", "en_curso"),))
+        response = jsonify({"error": "La petición original todavía se está procesando"})
+        response.headers['Retry-After'] = '1'
+        return response, 409
+    metrics.registry.inc("idempotency_requests_total", (("resultado", "repetida"),))
+    response = Response(body, status=status_code, mimetype='application/json')
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(view):
+    """
+    Decorador para rutas /usuario/<user_id>/... de escritura: si la petición
+    trae Idempotency-Key, la primera ejecución guarda su respuesta y los
+    reintentos con la misma clave la reciben sin volver a ejecutar la ruta.
+    Las respuestas 5xx no se guardan (el cliente puede reintentar).
+    """
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key or request.method == 'OPTIONS':
+            return view(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({"error": f"{HEADER} admite hasta {MAX_KEY_LENGTH} caracteres"}), 400
+
+        user_id = kwargs['user_id']
+        request_hash = _request_hash()
+        ensure_purger()
+        try:
+            connection = db_config.get_db_connection(user_id)
+            try:
+                cursor = connection.cursor()
+                claimed, row = _claim(cursor, user_id, key, request_hash)
+                connection.commit()
+                cursor.close()
+            finally:
+                connection.close()
+        except Exception as e:
+            print(f"ERROR en {HEADER}: {str(e)}")
+            return jsonify({"error": str(e)}), 500
+        if not claimed:
+            return _replay(row, request_hash)
+
+        metrics.registry.inc("idempotency_requests_total", (("resultado", "nueva"),))
+        response = None
+        try:
+            response = view(*args, **kwargs)
+        finally:
+            try:
+                _store(user_id, key, response)
+            except Exception as e:
+                print(f"ERROR guardando respuesta de {HEADER}: {str(e)}")
+        return response
+
+    return wrapper
+
+
+def _store(user_id, key, response):
+    """Guarda la respuesta de la clave, o la libera si la ruta falló"""
+    if response is not None:
+        response = make_response(response)
+    if response is None or response.status_code >= 500:
+        _execute(user_id, 'DELETE FROM idempotency_keys WHERE user_id = %s AND idem_key = %s', (user_id, key))
+        return
+    _execute(user_id, '''
+        UPDATE idempotency_keys SET status_code = %s, response_body = %s
+        WHERE user_id = %s AND idem_key = %s
+    ''', (response.status_code, response.get_data(as_text=True), user_id, key))
+
+
+# -- Purga de claves vencidas -------------------------------------------------
+
+def purge_expired(backend, batch_size=PURGE_BATCH):
+    """Borra por lotes las claves vencidas de una base. Retorna cuántas borró"""
+    total = 0
+    while True:
+        connection = backend.connect()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(
+                'SELECT user_id, idem_key FROM idempotency_keys WHERE expires_at < %s LIMIT %s',
+                (_now(), batch_size)
+            )
+            rows = cursor.fetchall()
+            if rows:
+                cursor.executemany('DELETE FROM idempotency_keys WHERE user_id = %s AND idem_key = %s', rows)
+            connection.commit()
+            cursor.close()
+        finally:
+            connection.close()
+        total += len(rows)
+        if len(rows) < batch_size:
+            return total
+
+
+def _purge_loop():
+    while True:
+        for name, backend in db_config.tenant_backends().items():
+            try:
+                purge_expired(backend)
+            except Exception as e:
+                print(f"ERROR purgando claves de idempotencia en {name}: {str(e)}")
+        time.sleep(PURGE_INTERVAL)
+
+
+def ensure_purger():
+    """Arranca el thread de purga en este proceso (una vez por pid)"""
+    global _purger_pid
+    pid = os.getpid()
+    if _purger_pid == pid or PURGE_INTERVAL <= 0:
+        return
+    with _purger_lock:
+        if _purger_pid != pid:
+            _purger_pid = pid
+            threading.Thread(target=_purge_loop, name='idempotency-purge', daemon=True).start()
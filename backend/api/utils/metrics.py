@@ -0,0 +1,322 @@
+# Módulo de métricas (formato de texto de Prometheus)
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+
+from flask import Response, current_app, g, request
+
+# Límites (segundos) de los buckets de latencia
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Carpeta compartida por los workers (vacío = métricas solo de este proceso)
+METRICS_DIR = os.getenv('METRICS_DIR', '')
+
+# Cada cuántos segundos un worker vuelca sus métricas a su archivo
+FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '5'))
+
+# Archivo con los acumulados de los workers que ya terminaron
+DEAD_FILE = 'metrics_dead.json'
+
+# Nombre -> (tipo, ayuda) de cada métrica
+HELP = {
+    "http_requests_total": ("counter", "Peticiones HTTP atendidas"),
+    "http_request_duration_seconds": ("histogram", "Latencia de las peticiones por endpoint"),
+    "http_requests_in_flight": ("gauge", "Peticiones en curso"),
+    "db_pool_size": ("gauge", "Conexiones del pool por proceso"),
+    "db_pool_in_use": ("gauge", "Conexiones del pool en uso"),
+    "db_pool_overflow_total": ("counter", "Conexiones abiertas fuera del pool (pool agotado)"),
+    "cache_hits_total": ("counter", "Aciertos de caché"),
+    "cache_misses_total": ("counter", "Fallos de caché"),
+    "cache_size": ("gauge", "Entradas en caché"),
+}
+
+
+def describe(name, kind, help_text):
+    """Declara una métrica nueva para que aparezca en /metrics"""
+    HELP[name] = (kind, help_text)
+
+
+class Registry:
+    """
+    Métricas de un proceso.
+
+    Las actualizaciones solo toman un lock por un instante (sumas sobre
+    diccionarios). Para varios workers, cada proceso vuelca periódicamente
+    sus valores a METRICS_DIR/metrics_<pid>_<arranque>.json (un id por
+    arranque, para que un PID reutilizado no pise los de un worker muerto)
+    y el proceso que atiende /metrics suma los archivos de todos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.gauges = {}
+        self._last_flush = 0.0
+        self._boot = None
+        self._flusher = None
+
+    def boot_id(self):
+        """Id del arranque de este proceso (se renueva en cada fork)"""
+        if self._boot is None or self._boot[0] != os.getpid():
+            self._boot = (os.getpid(), uuid.uuid4().hex[:12])
+        return f"{self._boot[0]}_{self._boot[1]}"
+
+    def inc(self, name, labels=(), value=1):
+        key = (name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, labels=(), value=0):
+        with self._lock:
+            self.gauges[(name, labels)] = value
+
+    def add_gauge(self, name, labels=(), value=1):
+        key = (name, labels)
+        with self._lock:
+            self.gauges[key] = self.gauges.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        key = (name, labels)
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = [[0] * len(LATENCY_BUCKETS), 0.0, 0]
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    hist[0][i] += 1
+                    break
+            hist[1] += value
+            hist[2] += 1
+
+    def snapshot(self):
+        """Copia serializable de las métricas del proceso"""
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "boot": self.boot_id(),
+                "counters": [[n, list(l), v] for (n, l), v in self.counters.items()],
+                "gauges": [[n, list(l), v] for (n, l), v in self.gauges.items()],
+                "histograms": [[n, list(l), list(h[0]), h[1], h[2]]
+                               for (n, l), h in self.histograms.items()],
+            }
+
+    def maybe_flush(self, force=False):
+        """Vuelca las métricas al archivo del proceso (como máximo cada FLUSH_INTERVAL)"""
+        if not METRICS_DIR:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < FLUSH_INTERVAL:
+            return
+        self._last_flush = now
+        _sample_runtime_gauges()
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        _write_json(os.path.join(METRICS_DIR, f"metrics_{self.boot_id()}.json"), self.snapshot())
+
+    def start_flusher(self):
+        """
+        Vuelca las métricas cada FLUSH_INTERVAL desde un thread, también si
+        el worker no recibe peticiones (llamar después del fork)
+        """
+        if not METRICS_DIR or (self._flusher is not None and self._flusher[0] == os.getpid()):
+            return
+
+        def loop():
+            while True:
+                time.sleep(FLUSH_INTERVAL)
+                try:
+                    self.maybe_flush(force=True)
+                except Exception as e:
+                    print(f"ERROR en volcado de métricas: {str(e)}")
+
+        thread = threading.Thread(target=loop, name='metrics-flush', daemon=True)
+        self._flusher = (os.getpid(), thread)
+        thread.start()
+
+
+registry = Registry()
+
+
+def _write_json(path, data):
+    """Escribe el archivo de forma atómica (quien lee nunca ve uno a medias)"""
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _merge(snapshots, include_gauges):
+    """Suma contadores, histogramas y (de los procesos vivos) gauges"""
+    counters, gauges, histograms = {}, {}, {}
+    for snap in snapshots:
+        for name, labels, value in snap["counters"]:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        if include_gauges(snap):
+            for name, labels, value in snap.get("gauges", ()):
+                key = (name, tuple(map(tuple, labels)))
+                gauges[key] = gauges.get(key, 0) + value
+        for name, labels, buckets, total, count in snap["histograms"]:
+            key = (name, tuple(map(tuple, labels)))
+            hist = histograms.setdefault(key, [[0] * len(LATENCY_BUCKETS), 0.0, 0])
+            hist[0] = [a + b for a, b in zip(hist[0], buckets)]
+            hist[1] += total
+            hist[2] += count
+    return counters, gauges, histograms
+
+
+def fold_dead_worker(pid):
+    """
+    Suma los contadores e histogramas de un worker que terminó al archivo
+    de acumulados (DEAD_FILE) y borra el suyo, así los archivos no se
+    acumulan con cada reciclado. Lo llama el proceso maestro (child_exit).
+    """
+    if not METRICS_DIR:
+        return
+    paths = glob.glob(os.path.join(METRICS_DIR, f'metrics_{pid}_*.json'))
+    if not paths:
+        return
+    dead_path = os.path.join(METRICS_DIR, DEAD_FILE)
+    snapshots = [data for data in map(_read_json, [dead_path] + paths) if data is not None]
+    counters, _, histograms = _merge(snapshots, lambda snap: False)
+    _write_json(dead_path, {
+        "counters": [[n, list(l), v] for (n, l), v in counters.items()],
+        "histograms": [[n, list(l), h[0], h[1], h[2]] for (n, l), h in histograms.items()],
+    })
+    for path in paths:
+        os.remove(path)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except OSError:
+        return False
+
+
+def _collect():
+    """
+    Junta las métricas de todos los procesos.
+    Los contadores e histogramas se suman siempre (son acumulados, también
+    los de workers que ya terminaron); los gauges solo de procesos vivos.
+    """
+    _sample_runtime_gauges()
+    own = registry.snapshot()
+    snapshots = [own]
+    if METRICS_DIR:
+        for path in glob.glob(os.path.join(METRICS_DIR, 'metrics_*.json')):
+            data = _read_json(path)
+            if data is not None and data.get("boot") != own["boot"]:
+                snapshots.append(data)
+
+    def alive(snap):
+        return "pid" in snap and (snap["pid"] == os.getpid() or _pid_alive(snap["pid"]))
+
+    return _merge(snapshots, alive)
+
+
+def _sample_runtime_gauges():
+    """Actualiza los gauges del pool de conexiones y de las cachés"""
+    from api.db import db_config
+    from api.utils.cache import get_caches
+
+    pool = db_config.pool_stats()
+    registry.set_gauge("db_pool_size", value=pool["size"])
+    registry.set_gauge("db_pool_in_use", value=pool["in_use"])
+    with registry._lock:
+        registry.counters[("db_pool_overflow_total", ())] = pool["overflow"]
+        for name, cache in get_caches().items():
+            stats = cache.stats()
+            labels = (("cache", name),)
+            registry.counters[("cache_hits_total", labels)] = stats["hits"]
+            registry.counters[("cache_misses_total", labels)] = stats["misses"]
+            registry.gauges[("cache_size", labels)] = stats["size"]
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+def render():
+    """Genera el texto de /metrics"""
+    counters, gauges, histograms = _collect()
+    lines = []
+    for name, (kind, help_text) in HELP.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "histogram":
+            for (n, labels), (buckets, total, count) in sorted(histograms.items()):
+                if n != name:
+                    continue
+                cumulative = 0
+                for bound, value in zip(LATENCY_BUCKETS, buckets):
+                    cumulative += value
+                    lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        else:
+            source = counters if kind == "counter" else gauges
+            for (n, labels), value in sorted(source.items()):
+                if n == name:
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+    return '\n'.join(lines) + '\n'
+
+
+def _endpoint_name():
+    """Nombre de la vista (sin el prefijo del Blueprint), ej: obtener_articulos"""
+    endpoint = request.endpoint or 'desconocido'
+    return endpoint.rsplit('.', 1)[-1]
+
+
+def init_app(app):
+    """Registra los hooks de medición y la ruta /metrics"""
+
+    @app.before_request
+    def _metrics_start():
+        g.metrics_start = time.perf_counter()
+        registry.add_gauge("http_requests_in_flight", value=1)
+
+    @app.after_request
+    def _metrics_record(response):
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            endpoint = _endpoint_name()
+            registry.observe("http_request_duration_seconds", (("endpoint", endpoint),),
+                             time.perf_counter() - start)
+            registry.inc("http_requests_total", (("endpoint", endpoint),
+                                                 ("method", request.method),
+                                                 ("status", str(response.status_code))))
+        return response
+
+    @app.teardown_request
+    def _metrics_done(exc):
+        registry.add_gauge("http_requests_in_flight", value=-1)
+        registry.maybe_flush()
+
+    @app.route('/metrics')
+    def metrics():
+        """Métricas en formato de texto de Prometheus"""
+        token = current_app.config.get('METRICS_TOKEN')
+        if token and request.headers.get('Authorization') != f"Bearer {token}":
+            return Response("No autorizado\n", status=401, mimetype='text/plain')
+        return Response(render(), mimetype='text/plain; version=0.0.4')
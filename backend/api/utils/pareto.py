@@ -0,0 +1,40 @@
+# Módulo de clasificación ABC (Pareto) de artículos por valor
+import numpy as np
+
+CLASSES = ('A', 'B', 'C')
+
+
+def classify(values, cutoff_a=0.8, cutoff_b=0.95):
+    """
+    Asigna la clase ABC de cada artículo según su participación acumulada en
+    el valor total, ordenando de mayor a menor valor.
+
+    Un artículo es A si los artículos más valiosos que él suman menos de
+    cutoff_a del total (así el primero siempre es A), B si suman menos de
+    cutoff_b y C en otro caso. Los artículos sin valor son siempre C.
+
+    Args:
+        values (ndarray): Valor de cada artículo
+        cutoff_a (float): Participación acumulada que cubre la clase A
+        cutoff_b (float): Participación acumulada que cubren A y B
+
+    Returns:
+        tuple: (clase por artículo, participación acumulada por artículo,
+        orden de mayor a menor valor), en el orden de 'values' salvo el último
+    """
+    values = np.asarray(values, dtype=np.float64)
+    order = np.argsort(-values, kind='stable')
+    total = values.sum()
+    if total <= 0:
+        return np.full(values.shape, 'C'), np.zeros(values.shape), order
+
+    cumulative = np.cumsum(values[order]) / total
+    before = cumulative - values[order] / total
+    ranked = np.select([before < cutoff_a, before < cutoff_b], ['A', 'B'], 'C')
+    ranked[values[order] <= 0] = 'C'
+
+    classes = np.empty(values.shape, dtype='<U1')
+    share = np.empty(values.shape)
+    classes[order] = ranked
+    share[order] = cumulative
+    return classes, share, order
@@ -0,0 +1,214 @@
+# Módulo de perfilado de peticiones bajo demanda
+import cProfile
+import hashlib
+import hmac
+import json
+import os
+import pstats
+import random
+import re
+import sys
+import time
+
+from flask import abort, current_app, g, jsonify, request, send_file
+
+# Extensiones de los archivos que se guardan por cada perfil
+PROFILE_FILES = {
+    "pstats": "application/octet-stream",
+    "collapsed": "text/plain",
+    "json": "application/json",
+}
+
+# Profundidad máxima de las pilas del archivo collapsed
+MAX_STACK_DEPTH = 64
+
+
+def sign(path, expires, secret):
+    """Firma HMAC-SHA256 que habilita el perfilado de 'path' hasta 'expires'"""
+    message = f"{expires}:{path}".encode()
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+def _valid_signature(header):
+    """Valida un header 'X-Profile: <expira>.<firma>' para la ruta pedida"""
+    try:
+        expires, signature = header.split('.', 1)
+        if int(expires) < time.time():
+            return False
+    except ValueError:
+        return False
+    expected = sign(request.path, expires, current_app.config['SECRET_KEY'])
+    return hmac.compare_digest(expected, signature)
+
+
+def _should_profile():
+    header = request.headers.get('X-Profile')
+    if header:
+        return _valid_signature(header)
+    rate = current_app.config['PROFILE_SAMPLE_RATE']
+    return rate > 0 and random.random() < rate
+
+
+def _func_name(func):
+    filename, line, name = func
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def collapsed_stacks(stats):
+    """
+    Convierte un pstats.Stats al formato "pila;de;llamadas microsegundos"
+    que usan flamegraph.pl y speedscope.
+
+    cProfile solo guarda aristas llamador -> llamado, así que el tiempo de
+    cada función se reparte entre sus llamados en proporción a cada arista.
+    """
+    raw = stats.stats
+    children = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, (_, _, _, edge_ct) in callers.items():
+            children.setdefault(caller, []).append((func, edge_ct))
+
+    lines = {}
+
+    def walk(func, budget, stack):
+        _, _, tt, ct, _ = raw[func]
+        if ct <= 0 or budget <= 0:
+            return
+        stack = stack + [_func_name(func)]
+        scale = min(budget / ct, 1.0)
+        own = int(tt * scale * 1_000_000)
+        if own > 0:
+            key = ';'.join(stack)
+            lines[key] = lines.get(key, 0) + own
+        if len(stack) >= MAX_STACK_DEPTH:
+            return
+        for child, edge_ct in children.get(func, ()):
+            if _func_name(child) not in stack:
+                walk(child, edge_ct * scale, stack)
+
+    for func, (_, _, _, ct, callers) in raw.items():
+        if not callers:
+            walk(func, ct, [])
+
+    return '\n'.join(f"{stack} {value}" for stack, value in sorted(lines.items())) + '\n'
+
+
+def _profile_dir():
+    return current_app.config['PROFILE_DIR']
+
+
+def _enforce_limits(directory):
+    """Buffer circular: borra los perfiles más viejos al superar los límites"""
+    profiles = {}
+    for name in os.listdir(directory):
+        profile_id = name.rsplit('.', 1)[0]
+        size = os.path.getsize(os.path.join(directory, name))
+        profiles[profile_id] = profiles.get(profile_id, 0) + size
+
+    max_files = current_app.config['PROFILE_MAX_COUNT']
+    max_bytes = current_app.config['PROFILE_MAX_BYTES']
+    total = sum(profiles.values())
+    for profile_id in sorted(profiles):
+        if len(profiles) <= max_files and total <= max_bytes:
+            break
+        for ext in PROFILE_FILES:
+            try:
+                os.remove(os.path.join(directory, f"{profile_id}.{ext}"))
+            except FileNotFoundError:
+                pass
+        total -= profiles.pop(profile_id)
+
+
+def _save_profile(profiler, status_code, elapsed):
+    directory = _profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    profile_id = f"{time.time_ns()}_{os.getpid()}"
+    base = os.path.join(directory, profile_id)
+
+    profiler.dump_stats(f"{base}.pstats")
+    stats = pstats.Stats(profiler)
+    with open(f"{base}.collapsed", 'w') as f:
+        f.write(collapsed_stacks(stats))
+    with open(f"{base}.json", 'w') as f:
+        json.dump({
+            "id": profile_id,
+            "metodo": request.method,
+            "ruta": request.full_path.rstrip('?'),
+            "endpoint": request.endpoint,
+            "status": status_code,
+            "duracion_ms": round(elapsed * 1000, 3),
+            "sql": g.sql_timeline
+        }, f, ensure_ascii=False, indent=2)
+
+    _enforce_limits(directory)
+    return profile_id
+
+
+def init_app(app):
+    """Registra los hooks de perfilado y las rutas de descarga"""
+
+    @app.before_request
+    def _profile_start():
+        if request.endpoint in ('listar_perfiles', 'descargar_perfil') or not _should_profile():
+            return
+        g.sql_timeline = []
+        g.sql_timeline_origin = time.perf_counter()
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+    @app.after_request
+    def _profile_stop(response):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return response
+        profiler.disable()
+        try:
+            elapsed = time.perf_counter() - g.sql_timeline_origin
+            response.headers['X-Profile-Id'] = _save_profile(profiler, response.status_code, elapsed)
+        except Exception as e:
+            print(f"ERROR guardando perfil: {str(e)}")
+        return response
+
+    @app.teardown_request
+    def _profile_cleanup(exc):
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+
+    @app.route('/perfiles', methods=['GET'], endpoint='listar_perfiles')
+    def listar_perfiles():
+        """Lista los perfiles guardados (requiere header X-Profile firmado para /perfiles)"""
+        if not _valid_signature(request.headers.get('X-Profile', '')):
+            abort(404)
+        directory = _profile_dir()
+        perfiles = []
+        if os.path.isdir(directory):
+            for name in sorted(os.listdir(directory), reverse=True):
+                if name.endswith('.json'):
+                    with open(os.path.join(directory, name)) as f:
+                        data = json.load(f)
+                    data.pop('sql', None)
+                    perfiles.append(data)
+        return jsonify({"data": perfiles}), 200
+
+    @app.route('/perfiles/<profile_id>.<ext>', methods=['GET'], endpoint='descargar_perfil')
+    def descargar_perfil(profile_id, ext):
+        """Descarga un perfil: .pstats, .collapsed (flamegraph) o .json (línea de tiempo SQL)"""
+        if not _valid_signature(request.headers.get('X-Profile', '')):
+            abort(404)
+        if ext not in PROFILE_FILES or not re.fullmatch(r'\d+_\d+', profile_id):
+            abort(404)
+        path = os.path.join(_profile_dir(), f"{profile_id}.{ext}")
+        if not os.path.exists(path):
+            abort(404)
+        return send_file(path, mimetype=PROFILE_FILES[ext], as_attachment=True)
+
+
+if __name__ == '__main__':
+    # Genera el header para perfilar una ruta:
+    #   python -m api.utils.profiling /usuario/1/informes/resumen-inventario [segundos]
+    from api.config import Config
+
+    path = sys.argv[1]
+    expires = int(time.time()) + int(sys.argv[2] if len(sys.argv) > 2 else 600)
+    print(f"X-Profile: {expires}.{sign(path, expires, Config.SECRET_KEY)}")
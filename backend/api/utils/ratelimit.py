@@ -0,0 +1,201 @@
+# Módulo de control de admisión: límite de ritmo y de concurrencia por usuario
+import math
+import threading
+import time
+
+from flask import g, jsonify, request
+
+from api.db.sharding import request_user_id
+from api.utils import metrics
+
+# Redis es opcional: solo hace falta para compartir los límites entre procesos
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Rutas que nunca se limitan (verificación del servidor y métricas)
+EXEMPT_ENDPOINTS = ('index', 'health_check', 'metrics')
+
+# Segundos que sobrevive en Redis un contador de concurrencia sin actividad
+# (por si un worker muere con peticiones en curso)
+CONCURRENCY_TTL = 300
+
+metrics.describe("rate_limit_rejections_total", "counter", "Peticiones rechazadas con 429 por clase y motivo")
+
+
+class Budget:
+    """Presupuesto de una clase de peticiones por usuario"""
+
+    def __init__(self, rate, burst, concurrency):
+        self.rate = rate                # fichas por segundo
+        self.burst = burst              # fichas acumulables (ráfaga máxima)
+        self.concurrency = concurrency  # peticiones en curso a la vez (0 = sin límite)
+
+    @classmethod
+    def parse(cls, spec):
+        """Interpreta 'ritmo,ráfaga,concurrencia' (ej. '20,40,8')"""
+        rate, burst, concurrency = (part.strip() for part in spec.split(','))
+        if float(rate) <= 0 or float(burst) < 1:
+            raise ValueError(f"Presupuesto inválido: '{spec}' (ritmo > 0 y ráfaga >= 1)")
+        return cls(float(rate), float(burst), int(concurrency))
+
+
+def request_class():
+    """
+    Clase de la petición actual: 'reports' (informes y exportaciones),
+    'writes' (métodos que modifican) o 'reads' (el resto)
+    """
+    if '/informes/' in request.path or '/exportar/' in request.path:
+        return 'reports'
+    if request.method in ('POST', 'PUT', 'PATCH', 'DELETE'):
+        return 'writes'
+    return 'reads'
+
+
+class LocalLimiter:
+    """
+    Límites en memoria del proceso: un token bucket y un contador de
+    peticiones en curso por (usuario, clase). Cada chequeo toma un lock
+    por un instante (unas sumas sobre diccionarios).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._in_flight = {}
+
+    def acquire(self, key, budget):
+        """
+        Consume una ficha y un lugar de concurrencia.
+
+        Returns:
+            tuple: (None, 0) si se admite; si no, (motivo, segundos a esperar)
+        """
+        now = time.monotonic()
+        with self._lock:
+            if budget.concurrency and self._in_flight.get(key, 0) >= budget.concurrency:
+                return 'concurrency', 1
+            tokens, last = self._buckets.get(key, (budget.burst, now))
+            tokens = min(budget.burst, tokens + (now - last) * budget.rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                return 'rate', (1 - tokens) / budget.rate
+            self._buckets[key] = (tokens - 1, now)
+            self._in_flight[key] = self._in_flight.get(key, 0) + 1
+        return None, 0
+
+    def release(self, key):
+        with self._lock:
+            count = self._in_flight.get(key, 0) - 1
+            if count > 0:
+                self._in_flight[key] = count
+            else:
+                self._in_flight.pop(key, None)
+
+
+class RedisLimiter:
+    """
+    Límites compartidos por todos los workers en Redis. El bucket y el
+    contador de concurrencia se chequean con un solo script (atómico, un
+    viaje de ida y vuelta); el reloj es el del servidor Redis.
+    """
+
+    ACQUIRE_SCRIPT = '''
+        local rate, burst, concurrency = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+        if concurrency > 0 and tonumber(redis.call('GET', KEYS[2]) or '0') >= concurrency then
+            return {'concurrency', '1'}
+        end
+        local time = redis.call('TIME')
+        local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+        local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+        local tokens = tonumber(state[1]) or burst
+        tokens = math.min(burst, tokens + math.max(0, now - (tonumber(state[2]) or now)) * rate)
+        local ttl = math.ceil(burst / rate) + 1
+        if tokens < 1 then
+            redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+            redis.call('EXPIRE', KEYS[1], ttl)
+            return {'rate', tostring((1 - tokens) / rate)}
+        end
+        redis.call('HSET', KEYS[1], 'tokens', tostring(tokens - 1), 'ts', tostring(now))
+        redis.call('EXPIRE', KEYS[1], ttl)
+        redis.call('INCR', KEYS[2])
+        redis.call('EXPIRE', KEYS[2], ARGV[4])
+        return {'', '0'}
+    '''
+
+    def __init__(self, url, prefix='ratelimit'):
+        if redis is None:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL requiere el paquete redis")
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5)
+        self.prefix = prefix
+        self._acquire = self.client.register_script(self.ACQUIRE_SCRIPT)
+
+    def acquire(self, key, budget):
+        reason, wait = self._acquire(
+            keys=[f"{self.prefix}:bucket:{key}", f"{self.prefix}:inflight:{key}"],
+            args=[budget.rate, budget.burst, budget.concurrency, CONCURRENCY_TTL]
+        )
+        reason = reason.decode() if isinstance(reason, bytes) else reason
+        return (reason or None), float(wait)
+
+    def release(self, key):
+        self.client.decr(f"{self.prefix}:inflight:{key}")
+
+
+def create_limiter(config):
+    """Limitador configurado: en Redis si hay RATE_LIMIT_REDIS_URL, si no local"""
+    if config['RATE_LIMIT_REDIS_URL']:
+        return RedisLimiter(config['RATE_LIMIT_REDIS_URL'])
+    return LocalLimiter()
+
+
+def init_app(app):
+    """
+    Aplica los presupuestos por usuario (RATE_LIMIT_READS, _REPORTS, _WRITES)
+    antes de cada petición; las que los exceden reciben 429 con Retry-After.
+    Las peticiones sin usuario en la ruta (login, registro) se limitan por IP.
+    """
+    if not app.config['RATE_LIMIT_ENABLED']:
+        return
+    budgets = {
+        'reads': Budget.parse(app.config['RATE_LIMIT_READS']),
+        'reports': Budget.parse(app.config['RATE_LIMIT_REPORTS']),
+        'writes': Budget.parse(app.config['RATE_LIMIT_WRITES']),
+    }
+    limiter = create_limiter(app.config)
+
+    @app.before_request
+    def _admit():
+        if request.method == 'OPTIONS' or request.endpoint in EXEMPT_ENDPOINTS:
+            return None
+        user_id = request_user_id()
+        kind = request_class()
+        key = f"{user_id if user_id is not None else 'ip:' + str(request.remote_addr)}:{kind}"
+        try:
+            reason, wait = limiter.acquire(key, budgets[kind])
+        except Exception as e:
+            # Si el almacenamiento compartido falla, se admite (no se corta el servicio)
+            print(f"ERROR en limitador de peticiones: {str(e)}")
+            return None
+        if reason is None:
+            g.rate_limit_key = key
+            return None
+
+        metrics.registry.inc("rate_limit_rejections_total", (("class", kind), ("reason", reason)))
+        retry_after = max(1, math.ceil(wait))
+        message = ("Demasiadas peticiones en curso" if reason == 'concurrency'
+                   else "Demasiadas peticiones")
+        response = jsonify({"error": f"{message}, reintentar en {retry_after} s"})
+        response.headers['Retry-After'] = str(retry_after)
+        return response, 429
+
+    @app.teardown_request
+    def _release(exc):
+        key = g.pop('rate_limit_key', None)
+        if key is None:
+            return
+        try:
+            limiter.release(key)
+        except Exception as e:
+            print(f"ERROR en limitador de peticiones: {str(e)}")
@@ -0,0 +1,80 @@
+# Módulo de cálculo de puntos de pedido y cantidades de reposición
+from statistics import NormalDist
+
+import numpy as np
+
+# Ancho (días) de los períodos en que se agrupa el consumo para medir su variabilidad
+BUCKET_DAYS = 7
+
+
+def service_factor(service_level):
+    """Factor z de la normal para un nivel de servicio (ej: 0.95 -> 1.645)"""
+    return NormalDist().inv_cdf(min(max(service_level, 0.5), 0.9999))
+
+
+def consumption(product_index, day_offset, quantity, n_products, window_days):
+    """
+    Consumo diario medio y su desvío por producto.
+
+    Las cantidades pedidas se acumulan en una matriz productos × períodos de
+    BUCKET_DAYS días (np.add.at, sin recorrer productos en Python); la media y
+    el desvío por fila dan el consumo y su variabilidad.
+
+    Args:
+        product_index (ndarray): Fila (producto) de cada línea de pedido
+        day_offset (ndarray): Días entre el inicio de la ventana y la fecha del pedido
+        quantity (ndarray): Cantidad de cada línea
+        n_products (int): Cantidad de productos
+        window_days (int): Largo de la ventana analizada
+
+    Returns:
+        tuple: (consumo diario, desvío diario), arrays de n_products
+    """
+    buckets = max(1, -(-window_days // BUCKET_DAYS))
+    matrix = np.zeros((n_products, buckets))
+    bucket = np.clip(day_offset // BUCKET_DAYS, 0, buckets - 1)
+    np.add.at(matrix, (product_index, bucket), quantity)
+    rate = matrix.sum(axis=1) / window_days
+    sigma = matrix.std(axis=1) / np.sqrt(BUCKET_DAYS)
+    return rate, sigma
+
+
+def lead_times(product_index, lead_days, n_products, default_days):
+    """
+    Plazo de entrega medio por producto (received_date - order_date).
+
+    Los productos sin órdenes recibidas usan la media de todo el tenant, o
+    default_days si el tenant tampoco tiene.
+    """
+    counts = np.bincount(product_index, minlength=n_products)
+    totals = np.bincount(product_index, weights=lead_days, minlength=n_products)
+    fallback = float(lead_days.mean()) if lead_days.size else float(default_days)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, totals / np.maximum(counts, 1), fallback)
+
+
+def reorder_plan(stock, on_order, rate, sigma, lead, service_level, review_days):
+    """
+    Punto de pedido y cantidad sugerida para todos los productos a la vez.
+
+    punto de pedido = consumo × plazo + z × desvío × √plazo (stock de seguridad)
+    objetivo        = punto de pedido + consumo × días de cobertura
+    Se sugiere pedir (objetivo - stock - en camino) cuando stock + en camino
+    no supera el punto de pedido.
+
+    Returns:
+        dict: Arrays "reorder_point", "suggested_quantity" y "days_of_cover"
+    """
+    safety = service_factor(service_level) * sigma * np.sqrt(lead)
+    reorder_point = rate * lead + safety
+    target = reorder_point + rate * review_days
+    position = stock + on_order
+    needed = (rate > 0) & (position <= reorder_point)
+    suggested = np.where(needed, np.ceil(np.maximum(target - position, 0)), 0)
+    with np.errstate(divide='ignore'):
+        days_of_cover = np.where(rate > 0, stock / np.where(rate > 0, rate, 1), np.inf)
+    return {
+        "reorder_point": np.ceil(reorder_point),
+        "suggested_quantity": suggested.astype(np.int64),
+        "days_of_cover": days_of_cover,
+    }
@@ -0,0 +1,86 @@
+# Módulo de búsqueda aproximada por trigramas
+import unicodedata
+from array import array
+from collections import defaultdict
+
+
+def normalize(text):
+    """Pasa el texto a minúsculas y elimina acentos"""
+    text = unicodedata.normalize('NFKD', (text or '').lower())
+    return ''.join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def trigrams(text):
+    """
+    Obtiene el conjunto de trigramas de un texto.
+    Cada palabra se rellena con espacios (igual que pg_trgm) para que
+    los prefijos y sufijos pesen en la similitud.
+    """
+    result = set()
+    for word in normalize(text).split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            result.add(padded[i:i + 3])
+    return result
+
+
+class TrigramIndex:
+    """
+    Índice invertido de trigramas para búsqueda tolerante a errores de tipeo.
+
+    Guarda documentos (tipo, id, nombre) y los ordena por similitud de Dice
+    entre los trigramas de la consulta y los del nombre.
+    """
+
+    def __init__(self):
+        self._docs = []
+        self._sizes = array('H')
+        self._postings = defaultdict(lambda: array('I'))
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, entity, item_id, text):
+        """Agrega un documento al índice"""
+        grams = trigrams(text)
+        doc = len(self._docs)
+        self._docs.append((entity, item_id, text))
+        self._sizes.append(min(len(grams), 65535))
+        for gram in grams:
+            self._postings[gram].append(doc)
+
+    def search(self, query, entities=None, min_score=0.3, limit=None):
+        """
+        Busca los documentos más parecidos a la consulta.
+
+        Args:
+            query (str): Texto a buscar
+            entities (set): Tipos de documento a incluir (None = todos)
+            min_score (float): Similitud mínima (0 a 1)
+            limit (int): Cantidad máxima de resultados
+
+        Returns:
+            list: Tuplas (score, tipo, id, nombre) ordenadas por score
+        """
+        grams = trigrams(query)
+        if not grams:
+            return []
+
+        counts = defaultdict(int)
+        for gram in grams:
+            for doc in self._postings.get(gram, ()):
+                counts[doc] += 1
+
+        total = len(grams)
+        results = []
+        for doc, shared in counts.items():
+            score = 2.0 * shared / (total + self._sizes[doc])
+            if score < min_score:
+                continue
+            entity, item_id, text = self._docs[doc]
+            if entities and entity not in entities:
+                continue
+            results.append((round(score, 4), entity, item_id, text))
+
+        results.sort(key=lambda r: (-r[0], r[3]))
+        return results[:limit] if limit else results
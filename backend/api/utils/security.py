@@ -1,7 +1,6 @@
-from flask import request, jsonify
+from flask import request, jsonify, current_app
 import jwt
 from functools import wraps
-from api import app
 from api.db.db_config import get_db_connection, DBError
 
 def token_required(func):
@@ -40,7 +39,7 @@ def token_required(func):
 
         try:
             # Decodificar el token y validar
-            data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
+            data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
             token_id = data['id']
 
             # Verificar que el user_id coincide con el del token
@@ -70,7 +69,7 @@ def optional_token(func):
         
         if token:
             try:
-                data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
+                data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
                 kwargs['current_user_id'] = data['id']
             except:
                 pass
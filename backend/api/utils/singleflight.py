@@ -0,0 +1,68 @@
+# Módulo de coalescencia de llamadas idénticas concurrentes (single-flight)
+import os
+import threading
+
+from api.utils import metrics
+
+# Segundos que una llamada duplicada espera el resultado de la que está en
+# curso; si se vence, calcula el suyo
+WAIT_TIMEOUT = float(os.getenv('SINGLEFLIGHT_TIMEOUT', '30'))
+
+metrics.describe("singleflight_calls_total", "counter", "Llamadas a funciones con coalescencia")
+metrics.describe("singleflight_collapsed_total", "counter",
+                 "Llamadas que compartieron el resultado de una idéntica en curso en lugar de calcularlo")
+
+
+class _Call:
+    """Llamada en curso: el resultado (o error) que esperan las duplicadas"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Agrupa las llamadas concurrentes con la misma clave: la primera calcula
+    y las que llegan mientras tanto esperan y reciben el mismo resultado (o
+    la misma excepción). No es una caché: al terminar, la próxima llamada
+    vuelve a calcular. Es local a cada proceso worker.
+
+    El resultado se comparte entre peticiones, así que no debe modificarse.
+    """
+
+    def __init__(self, name, timeout=WAIT_TIMEOUT):
+        self.name = name
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, function, *args):
+        """Retorna function(*args), calculado una sola vez por grupo de llamadas con 'key'"""
+        labels = (("name", self.name),)
+        metrics.registry.inc("singleflight_calls_total", labels)
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if not call.done.wait(self.timeout):
+                return function(*args)
+            metrics.registry.inc("singleflight_collapsed_total", labels)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function(*args)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
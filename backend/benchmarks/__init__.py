@@ -0,0 +1 @@
+# Paquete de benchmarks del sistema
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+Benchmark del formato columnar de los listados.
+
+Genera un tenant con el seed de benchmarks y compara, para cada listado, el
+formato de objetos (uno por fila) con ?formato=columnas: tamaño del cuerpo
+(también comprimido con gzip) y tiempo de la petición completa (consulta,
+armado y serialización). Verifica además que ambos formatos traigan los
+mismos datos.
+
+Uso (desde backend/, con una base descartable):
+    DB_BACKEND=sqlite DB_SQLITE_PATH=/tmp/bench.sqlite3 \\
+        python -m benchmarks.bench_columnar --productos 20000 --pedidos 5000
+"""
+import argparse
+import gzip
+import json
+import statistics
+import time
+
+from api import create_app
+from benchmarks import seed as seeding
+
+RUTAS = ("articulos", "inventario", "pedidos", "distribuidores", "clasificaciones")
+
+
+def medir(client, url, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        respuesta = client.get(url)
+        tiempos.append(time.perf_counter() - t0)
+        assert respuesta.status_code == 200, respuesta.data[:200]
+    return respuesta.data, round(statistics.median(tiempos) * 1000, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del formato columnar")
+    parser.add_argument("--productos", type=int, default=20000)
+    parser.add_argument("--pedidos", type=int, default=5000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app({'WARMUP': False, 'COMPRESS_ENABLED': False})
+    tenant = seeding.seed(seeding.SeedConfig(productos=args.productos, pedidos=args.pedidos, seed=0))[0]
+    client = app.test_client()
+
+    resultado = {}
+    for ruta in RUTAS:
+        url = f"/usuario/{tenant.user_id}/{ruta}"
+        objetos, ms_objetos = medir(client, url, args.repeticiones)
+        columnas, ms_columnas = medir(client, f"{url}?formato=columnas", args.repeticiones)
+
+        tabla = json.loads(columnas)
+        filas = [dict(zip(tabla["columns"], fila)) for fila in tabla["rows"]]
+        assert filas == json.loads(objetos)["data"], f"{ruta}: los formatos difieren"
+
+        resultado[ruta] = {
+            "filas": len(filas),
+            "objetos": {"bytes": len(objetos), "gzip_bytes": len(gzip.compress(objetos)), "ms": ms_objetos},
+            "columnas": {"bytes": len(columnas), "gzip_bytes": len(gzip.compress(columnas)), "ms": ms_columnas},
+        }
+
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""
+Benchmark de compresión de respuestas.
+
+Genera un tenant con el seed de benchmarks, obtiene sin comprimir las
+respuestas JSON de /articulos, /inventario y /pedidos y mide, para cada
+codificación y nivel, el tiempo de CPU por respuesta, la relación de
+compresión y los bytes ahorrados.
+
+Uso (desde backend/, con una base descartable):
+    DB_BACKEND=sqlite DB_SQLITE_PATH=/tmp/bench.sqlite3 \\
+        python -m benchmarks.bench_compression --productos 5000 --pedidos 2000
+"""
+import argparse
+import json
+import statistics
+import time
+
+from api import create_app
+from api.utils import compression
+from benchmarks import seed as seeding
+
+RUTAS = ("articulos", "inventario", "pedidos")
+
+# Niveles a probar por codificación
+NIVELES = {
+    'gzip': (1, 6, 9),
+    'br': (1, 4, 6, 9),
+}
+
+
+def payloads(productos, pedidos):
+    """Cuerpos JSON sin comprimir de cada listado"""
+    app = create_app({'WARMUP': False, 'COMPRESS_ENABLED': False})
+    tenant = seeding.seed(seeding.SeedConfig(productos=productos, pedidos=pedidos, seed=0))[0]
+    client = app.test_client()
+    cuerpos = {}
+    for ruta in RUTAS:
+        respuesta = client.get(f"/usuario/{tenant.user_id}/{ruta}")
+        assert respuesta.status_code == 200, respuesta.data[:200]
+        cuerpos[ruta] = respuesta.data
+    return cuerpos
+
+
+def medir(data, encoding, nivel, repeticiones):
+    config = {'COMPRESS_GZIP_LEVEL': nivel, 'COMPRESS_BROTLI_QUALITY': nivel}
+    tiempos = []
+    for _ in range(repeticiones):
+        encoder = compression.get_encoder(encoding, config)
+        t0 = time.process_time()
+        comprimido = encoder.compress(data)
+        tiempos.append(time.process_time() - t0)
+    ms = statistics.median(tiempos) * 1000
+    return {
+        "nivel": nivel,
+        "bytes": len(comprimido),
+        "relacion": round(len(data) / len(comprimido), 2),
+        "ahorro_pct": round(100 * (1 - len(comprimido) / len(data)), 1),
+        "cpu_ms": round(ms, 2),
+        "mb_por_s": round(len(data) / 1e6 / (ms / 1000), 1) if ms else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de compresión de respuestas")
+    parser.add_argument("--productos", type=int, default=5000)
+    parser.add_argument("--pedidos", type=int, default=2000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    resultado = {"codificaciones": list(compression.available_encodings()), "rutas": {}}
+    for ruta, data in payloads(args.productos, args.pedidos).items():
+        resultado["rutas"][ruta] = {
+            "bytes": len(data),
+            **{
+                encoding: [medir(data, encoding, nivel, args.repeticiones) for nivel in NIVELES[encoding]]
+                for encoding in compression.available_encodings()
+            }
+        }
+
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+Benchmark de búsqueda.
+
+Mide la construcción y las consultas del índice de trigramas con un catálogo
+sintético (por defecto 1.000.000 de productos para un mismo usuario) y,
+opcionalmente, la búsqueda FULLTEXT contra la base configurada en .env.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_search --productos 1000000
+    python -m benchmarks.bench_search --fulltext --user-id 1
+"""
+import argparse
+import json
+import random
+import time
+
+from api.utils.search import TrigramIndex
+
+PALABRAS = [
+    "auriculares", "teclado", "mouse", "monitor", "cable", "cargador", "parlante",
+    "notebook", "tablet", "impresora", "router", "microfono", "camara", "bateria",
+    "soporte", "adaptador", "funda", "disco", "memoria", "lampara"
+]
+MARCAS = ["Sony", "Logitech", "Samsung", "Philips", "Genius", "Noblex", "Lenovo", "HP"]
+CONSULTAS = ["auriculares sony", "teclado", "monitr samsung", "cargdor", "parlante philips"]
+
+
+def nombres(cantidad, seed=42):
+    """Genera nombres de producto sintéticos"""
+    rnd = random.Random(seed)
+    for i in range(cantidad):
+        yield f"{rnd.choice(PALABRAS)} {rnd.choice(MARCAS)} {rnd.choice(PALABRAS)} {i}"
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(int(len(valores) * p), len(valores) - 1)]
+
+
+def bench_trigramas(cantidad, repeticiones):
+    index = TrigramIndex()
+    inicio = time.perf_counter()
+    for i, nombre in enumerate(nombres(cantidad)):
+        index.add("articulos", i, nombre)
+    construccion = time.perf_counter() - inicio
+
+    tiempos = []
+    for _ in range(repeticiones):
+        for consulta in CONSULTAS:
+            t0 = time.perf_counter()
+            index.search(consulta, limit=20)
+            tiempos.append((time.perf_counter() - t0) * 1000)
+
+    return {
+        "productos": cantidad,
+        "construccion_s": round(construccion, 3),
+        "consulta_p50_ms": round(percentil(tiempos, 0.50), 2),
+        "consulta_p95_ms": round(percentil(tiempos, 0.95), 2),
+    }
+
+
+def bench_fulltext(user_id, repeticiones):
+    from api.models.search import Search
+
+    tiempos = []
+    for _ in range(repeticiones):
+        for consulta in CONSULTAS:
+            t0 = time.perf_counter()
+            Search.fulltext(user_id, consulta, list(Search.ENTITIES))
+            tiempos.append((time.perf_counter() - t0) * 1000)
+
+    return {
+        "user_id": user_id,
+        "consulta_p50_ms": round(percentil(tiempos, 0.50), 2),
+        "consulta_p95_ms": round(percentil(tiempos, 0.95), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de búsqueda")
+    parser.add_argument("--productos", type=int, default=1_000_000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--fulltext", action="store_true", help="Medir también FULLTEXT en la BD")
+    parser.add_argument("--user-id", type=int, default=1)
+    args = parser.parse_args()
+
+    resultado = {"trigramas": bench_trigramas(args.productos, args.repeticiones)}
+    if args.fulltext:
+        resultado["fulltext"] = bench_fulltext(args.user_id, args.repeticiones)
+
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
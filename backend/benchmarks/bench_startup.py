@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Benchmark de arranque: tiempo desde 'import api' hasta las primeras respuestas.
+
+Cada medición corre en un proceso nuevo (sin módulos en caché) y atiende,
+con el cliente de pruebas de Flask, GET /health y luego la primera petición
+de endpoints con acceso a la base (artículos, inventario, informe y
+búsqueda) sobre un tenant sembrado de antemano. Con --warmup la app se crea
+precalentada (pool y caché de búsqueda del tenant), para comparar dónde cae
+el costo. Con --max-ms funciona como chequeo de regresión: termina con
+código 1 si la mediana hasta la última respuesta supera el límite.
+
+Uso (desde backend/, con una base descartable):
+    DB_BACKEND=sqlite DB_SQLITE_PATH=/tmp/bench.sqlite3 \\
+        python -m benchmarks.bench_startup --corridas 5 --max-ms 1500
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+from benchmarks import seed as seeding
+
+RUTAS = ("articulos", "inventario", "informes/resumen-inventario", "buscar?q=monitor")
+
+SCRIPT = """
+import sys, time
+inicio = time.perf_counter()
+from api import create_app
+tiempos = {"import_ms": time.perf_counter() - inicio}
+user_id, warmup = int(sys.argv[1]), sys.argv[2] == '1'
+app = create_app({'WARMUP': warmup, 'WARMUP_SEARCH_USERS': [user_id]})
+tiempos["create_app_ms"] = time.perf_counter() - inicio
+client = app.test_client()
+for nombre, url in [("health", "/health")] + [(r, f"/usuario/{user_id}/{r}") for r in sys.argv[3:]]:
+    respuesta = client.get(url)
+    assert respuesta.status_code == 200, (url, respuesta.status_code)
+    tiempos[nombre] = time.perf_counter() - inicio
+print(" ".join(f"{k}={v * 1000:.2f}" for k, v in tiempos.items()))
+"""
+
+
+def medir(user_id, warmup):
+    salida = subprocess.run(
+        [sys.executable, "-c", SCRIPT, str(user_id), '1' if warmup else '0', *RUTAS],
+        capture_output=True, text=True, check=True
+    ).stdout.strip().splitlines()[-1]
+    return {clave: float(valor) for clave, valor in (par.rsplit("=", 1) for par in salida.split())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de arranque")
+    parser.add_argument("--corridas", type=int, default=5)
+    parser.add_argument("--productos", type=int, default=2000)
+    parser.add_argument("--pedidos", type=int, default=500)
+    parser.add_argument("--warmup", action="store_true", help="Crear la app precalentada")
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="Límite para la mediana de import -> última petición")
+    args = parser.parse_args()
+
+    from api import create_app
+    create_app({'WARMUP': False})
+    tenant = seeding.seed(seeding.SeedConfig(productos=args.productos, pedidos=args.pedidos, seed=0))[0]
+
+    corridas = [medir(tenant.user_id, args.warmup) for _ in range(args.corridas)]
+    # Milisegundos acumulados desde 'import api' hasta cada respuesta
+    resultado = {
+        clave: round(statistics.median(c[clave] for c in corridas), 2)
+        for clave in corridas[0]
+    }
+    resultado["corridas"] = args.corridas
+    resultado["warmup"] = args.warmup
+    print(json.dumps(resultado, indent=2))
+
+    ultima = resultado[RUTAS[-1]]
+    if args.max_ms is not None and ultima > args.max_ms:
+        print(f"❌ Regresión de arranque: {ultima} ms > {args.max_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
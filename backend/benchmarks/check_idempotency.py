@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+Verificación de Idempotency-Key en la creación y confirmación de órdenes.
+
+Comprueba que:
+  1. un reintento con la misma clave devuelve la respuesta original sin crear
+     otra orden,
+  2. varios reintentos simultáneos con la misma clave crean una sola orden
+     (los demás reciben la respuesta original o 409 mientras se procesa),
+  3. la misma clave con otro cuerpo se rechaza con 422,
+  4. reconfirmar con la misma clave no suma el stock dos veces,
+  5. la purga borra las claves vencidas.
+
+Uso (desde backend/):
+    DB_BACKEND=sqlite DB_SQLITE_PATH=/tmp/idempotencia.sqlite3 python -m benchmarks.check_idempotency
+"""
+import sys
+import threading
+import uuid
+
+from api import create_app
+from api.db import db_config
+from api.utils import idempotency
+from benchmarks import seed as seeding
+
+
+def _expect(label, ok, detail=""):
+    print(f"{'✅' if ok else '❌'} {label}{': ' + str(detail) if detail else ''}")
+    return ok
+
+
+def _scalar(user_id, sql, params):
+    connection = db_config.get_db_connection(user_id)
+    try:
+        cursor = connection.cursor()
+        cursor.execute(sql, params)
+        value = cursor.fetchone()[0]
+        cursor.close()
+    finally:
+        connection.close()
+    return value
+
+
+def _count_orders(user_id):
+    return _scalar(user_id, 'SELECT COUNT(*) FROM purchase_orders WHERE user_id = %s', (user_id,))
+
+
+def main():
+    app = create_app({'WARMUP': False})
+    tenant = seeding.seed(seeding.SeedConfig(productos=20, pedidos=0, seed=0))[0]
+    user_id, product_id = tenant.user_id, tenant.product_ids[0]
+    base = f"/usuario/{user_id}/pedidos"
+    body = {"items": [{"product_id": product_id, "quantity": 5}]}
+    client = app.test_client()
+    results = []
+
+    key = str(uuid.uuid4())
+    before = _count_orders(user_id)
+    first = client.post(base, json=body, headers={"Idempotency-Key": key})
+    again = client.post(base, json=body, headers={"Idempotency-Key": key})
+    results.append(_expect(
+        "reintento devuelve la respuesta original",
+        first.status_code == 201 and again.status_code == 201
+        and again.get_json() == first.get_json() and again.headers.get('Idempotent-Replayed') == 'true'
+    ))
+    results.append(_expect("una sola orden creada", _count_orders(user_id) == before + 1))
+
+    key = str(uuid.uuid4())
+    before = _count_orders(user_id)
+    statuses = []
+
+    def retry():
+        response = app.test_client().post(base, json=body, headers={"Idempotency-Key": key})
+        statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=retry) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.append(_expect("reintentos simultáneos crean una sola orden",
+                           _count_orders(user_id) == before + 1 and set(statuses) <= {201, 409},
+                           sorted(statuses)))
+
+    other = client.post(base, json={"items": [{"product_id": product_id, "quantity": 6}]},
+                        headers={"Idempotency-Key": key})
+    results.append(_expect("misma clave con otro cuerpo: 422", other.status_code == 422))
+
+    order_id = first.get_json()["order_id"]
+    stock_sql = 'SELECT quantity FROM stock WHERE product_id = %s'
+    stock = _scalar(user_id, stock_sql, (product_id,))
+    key = str(uuid.uuid4())
+    confirm = [client.put(f"{base}/{order_id}/confirmar", headers={"Idempotency-Key": key}) for _ in range(3)]
+    results.append(_expect(
+        "reconfirmar con la misma clave suma el stock una vez",
+        [r.status_code for r in confirm] == [200, 200, 200]
+        and _scalar(user_id, stock_sql, (product_id,)) == stock + 5
+    ))
+
+    connection = db_config.get_db_connection(user_id)
+    cursor = connection.cursor()
+    cursor.execute("UPDATE idempotency_keys SET expires_at = '2000-01-01 00:00:00' WHERE user_id = %s", (user_id,))
+    connection.commit()
+    cursor.close()
+    connection.close()
+    purged = sum(idempotency.purge_expired(b) for b in db_config.tenant_backends().values())
+    left = _scalar(user_id, 'SELECT COUNT(*) FROM idempotency_keys WHERE user_id = %s', (user_id,))
+    results.append(_expect(f"purga de claves vencidas ({purged})", purged >= 3 and left == 0))
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+"""
+Prueba de integración del sharding con dos bases locales.
+
+Siembra un tenant en cada shard, verifica que cada uno lee y escribe solo en
+el suyo y mueve uno de ellos al otro shard mientras un thread sigue creando
+categorías y actualizando stock por la API. Con el tenant congelado intenta
+una escritura directa en el origen (como una que pasó el chequeo antes del
+congelamiento), que los triggers deben rechazar. Al final comprueba que no se
+perdió ninguna escritura aceptada, que el origen quedó vacío y que en el
+destino se pueden seguir creando filas (sin chocar con los ids copiados).
+
+Uso (desde backend/):
+    DB_BACKEND=sqlite DB_SQLITE_PATH=/tmp/shard_a.sqlite3 \\
+    DB_SHARDS=principal,b DB_SHARD_B_BACKEND=sqlite DB_SHARD_B_SQLITE_PATH=/tmp/shard_b.sqlite3 \\
+    python -m benchmarks.check_sharding
+"""
+import sys
+import threading
+import time
+
+from api import create_app
+from api.db import db_config
+from api.db.shard_move import align_ids, count_rows, move_tenant
+from api.db.sharding import FROZEN_ERROR
+from benchmarks import seed as seeding
+
+
+def _expect(label, ok, detail=""):
+    print(f"{'✅' if ok else '❌'} {label}{': ' + str(detail) if detail else ''}")
+    return ok
+
+
+def _writer(client, tenant, stop, log):
+    """Escribe sin parar por la API y registra qué escrituras fueron aceptadas"""
+    base = f"/usuario/{tenant.user_id}"
+    i = 0
+    while not stop.is_set():
+        name = f"Durante la mudanza {i}"
+        response = client.post(f"{base}/clasificaciones", json={"name": name, "descripcion": ""})
+        log.append((name, response.status_code))
+        client.put(f"{base}/inventario/{tenant.product_ids[i % len(tenant.product_ids)]}",
+                   json={"quantity": i % 100})
+        i += 1
+        time.sleep(0.02)
+
+
+def _late_write(backend, tenant):
+    """
+    Escribe una categoría directo en la base, sin pasar por el chequeo de la
+    API. Retorna el error con que se rechazó, o None si se aceptó.
+    """
+    connection = backend.connect()
+    try:
+        cursor = connection.cursor()
+        cursor.execute('INSERT INTO categories (name, user_id) VALUES (%s, %s)',
+                       ("Escritura tardía", tenant.user_id))
+        connection.commit()
+        cursor.close()
+        return None
+    except Exception as e:
+        connection.rollback()
+        return str(e)
+    finally:
+        connection.close()
+
+
+def main():
+    app = create_app({'WARMUP': False})
+    shard_map = db_config.get_shard_map()
+    if shard_map is None or len(shard_map.names) < 2:
+        print("❌ Configurar DB_SHARDS con al menos dos shards")
+        sys.exit(2)
+    for name in shard_map.names:
+        align_ids(shard_map, name)
+
+    tenants = []
+    while len({shard_map.shard_for(t.user_id) for t in tenants}) < 2:
+        tenants += seeding.seed(seeding.SeedConfig(productos=200, pedidos=100, seed=len(tenants)))
+    first = tenants[0]
+    second = next(t for t in tenants if shard_map.shard_for(t.user_id) != shard_map.shard_for(first.user_id))
+    client = app.test_client()
+    results = []
+
+    for tenant in (first, second):
+        home = shard_map.shard_for(tenant.user_id)
+        other = next(n for n in shard_map.names if n != home)
+        rows = count_rows(shard_map.backends[home], tenant.user_id)
+        stray = count_rows(shard_map.backends[other], tenant.user_id)
+        stray.pop('users')
+        listed = client.get(f"/usuario/{tenant.user_id}/articulos").get_json()["data"]
+        results.append(_expect(f"usuario {tenant.user_id} solo en '{home}'",
+                               rows["products"] == len(tenant.product_ids) and not any(stray.values()), rows))
+        results.append(_expect(f"API lista sus {len(listed)} artículos", len(listed) == len(tenant.product_ids)))
+
+    source = shard_map.shard_for(first.user_id)
+    target = shard_map.shard_for(second.user_id)
+    before = count_rows(shard_map.backends[source], first.user_id)
+
+    stop, log, late = threading.Event(), [], []
+
+    def move_log(message):
+        print(message)
+        if 'sincronización final' in message:
+            late.append(_late_write(shard_map.backends[source], first))
+    thread = threading.Thread(target=_writer, args=(app.test_client(), first, stop, log))
+    thread.start()
+    try:
+        time.sleep(0.5)
+        report = move_tenant(shard_map, first.user_id, target, log=move_log)
+        time.sleep(0.5)
+    finally:
+        stop.set()
+        thread.join()
+
+    accepted = [name for name, status in log if status == 201]
+    rejected = [name for name, status in log if status == 503]
+    after = count_rows(shard_map.backends[target], first.user_id)
+    left = count_rows(shard_map.backends[source], first.user_id)
+    left.pop('users' if shard_map.backends[source] is shard_map.directory else '', None)
+
+    results.append(_expect("el mapa apunta al destino", shard_map.shard_for(first.user_id) == target))
+    results.append(_expect(f"escrituras aceptadas {len(accepted)}, rechazadas con 503 {len(rejected)}",
+                           len(log) == len(accepted) + len(rejected)))
+    results.append(_expect("el origen congelado rechaza una escritura tardía",
+                           late and late[0] is not None and FROZEN_ERROR in late[0], late))
+    results.append(_expect("no se perdieron categorías",
+                           after["categories"] == before["categories"] + len(accepted), after))
+    results.append(_expect("origen vacío", not any(left.values()), left))
+
+    names = {c["name"] for c in client.get(f"/usuario/{first.user_id}/clasificaciones").get_json()["data"]}
+    results.append(_expect("las categorías creadas durante la mudanza se leen del destino",
+                           set(accepted) <= names))
+
+    response = client.post(f"/usuario/{first.user_id}/articulos",
+                           json={"name": "Después de mover", "price": 10, "quantity": 1})
+    connection = db_config.get_db_connection(first.user_id)
+    cursor = connection.cursor()
+    cursor.execute('SELECT id FROM products WHERE user_id = %s AND name = %s', (first.user_id, "Después de mover"))
+    new_id = cursor.fetchone()[0]
+    cursor.close()
+    connection.close()
+    results.append(_expect(f"id nuevo {new_id} sin chocar con los copiados",
+                           response.status_code == 201 and new_id not in first.product_ids))
+    print(f"Bloqueo de escrituras: {report['segundos_bloqueado']}s")
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Generador de carga concurrente.
+
+Ejecuta las peticiones de un escenario con N threads, ya sea dentro del
+proceso (cliente de pruebas de Flask, sin red) o contra un servidor HTTP,
+y calcula throughput y percentiles de latencia.
+"""
+import http.client
+import json
+import math
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class InProcessClient:
+    """Cliente que llama a la app directamente (sin sockets)"""
+
+    def __init__(self, app):
+        self._app = app
+        self._local = threading.local()
+
+    def request(self, method, path, body=None):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self._app.test_client()
+        if isinstance(body, bytes):
+            response = client.open(path, method=method, data=body, content_type='text/csv')
+        else:
+            response = client.open(path, method=method, json=body)
+        response.get_data()
+        return response.status_code
+
+
+class HttpClient:
+    """Cliente HTTP con una conexión keep-alive por thread"""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self._host = parts.hostname
+        self._port = parts.port or 80
+        self._local = threading.local()
+
+    def request(self, method, path, body=None):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self._host, self._port, timeout=60)
+        if isinstance(body, bytes):
+            payload, headers = body, {"Content-Type": "text/csv"}
+        elif body is not None:
+            payload, headers = json.dumps(body), {"Content-Type": "application/json"}
+        else:
+            payload, headers = None, {}
+        try:
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            response.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            self._local.conn = None
+            raise
+        return response.status
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(p * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(client, scenario, tenants, requests, concurrency, seed=0):
+    """
+    Ejecuta 'requests' peticiones del escenario repartidas entre los tenants.
+
+    Returns:
+        dict: Resultados (throughput, errores y percentiles en ms)
+    """
+    rnd = random.Random(seed)
+    per_tenant = math.ceil(requests / len(tenants))
+    prepared = {}
+    if scenario.prepare:
+        for tenant in tenants:
+            prepared[tenant.user_id] = scenario.prepare(tenant, rnd, per_tenant)
+
+    # Las peticiones se arman antes de medir para no cronometrar su construcción
+    jobs = []
+    for i in range(requests):
+        tenant = tenants[i % len(tenants)]
+        j = i // len(tenants)
+        data = prepared.get(tenant.user_id)
+        path = scenario.path(tenant, rnd, j, data)
+        body = scenario.body(tenant, rnd, j, data) if scenario.body else None
+        jobs.append((path, body))
+
+    latencies = []
+    statuses = {}
+    errors = [0]
+    lock = threading.Lock()
+    next_job = iter(range(len(jobs)))
+
+    def worker():
+        local_latencies = []
+        local_statuses = {}
+        local_errors = 0
+        while True:
+            with lock:
+                index = next(next_job, None)
+            if index is None:
+                break
+            path, body = jobs[index]
+            start = time.perf_counter()
+            try:
+                status = client.request(scenario.method, path, body)
+            except Exception:
+                status = 'excepcion'
+            local_latencies.append((time.perf_counter() - start) * 1000)
+            local_statuses[status] = local_statuses.get(status, 0) + 1
+            if status == 'excepcion' or status >= 400:
+                local_errors += 1
+        with lock:
+            latencies.extend(local_latencies)
+            for status, count in local_statuses.items():
+                statuses[str(status)] = statuses.get(str(status), 0) + count
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "metodo": scenario.method,
+        "peticiones": requests,
+        "errores": errors[0],
+        "status": statuses,
+        "segundos": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed > 0 else 0,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "max_ms": round(latencies[-1], 3) if latencies else 0,
+    }
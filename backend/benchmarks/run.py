@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Suite de benchmarks HTTP de punta a punta.
+
+Siembra tenants sintéticos, ejecuta un escenario por cada endpoint de
+api/routes/ con carga concurrente y emite un JSON con throughput y
+p50/p95/p99 por endpoint, para comparar corridas en el tiempo.
+
+Uso (desde backend/):
+    python -m benchmarks.run --productos 5000 --peticiones 200 --concurrencia 8
+    python -m benchmarks.run --url http://localhost:5000 --salida resultados.json
+    python -m benchmarks.run --solo obtener_articulos,confirmar_pedido
+"""
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+import time
+
+from api.db import db_config
+from benchmarks import seed as seeding
+from benchmarks.load import HttpClient, InProcessClient, run_scenario
+from benchmarks.scenarios import SCENARIOS
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _route_endpoints(app):
+    """Nombres de las vistas registradas por los Blueprints de api/routes/"""
+    return {
+        rule.endpoint.rsplit('.', 1)[-1]
+        for rule in app.url_map.iter_rules()
+        if '.' in rule.endpoint and not rule.endpoint.startswith('static')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de la API")
+    seeding.add_arguments(parser)
+    parser.add_argument("--peticiones", type=int, default=200, help="Peticiones por endpoint")
+    parser.add_argument("--concurrencia", type=int, default=8)
+    parser.add_argument("--url", default=None, help="Servidor a medir (por defecto, en proceso)")
+    parser.add_argument("--solo", default=None, help="Endpoints a medir, separados por coma")
+    parser.add_argument("--salida", default=None, help="Archivo JSON de resultados")
+    args = parser.parse_args()
+
+    from api import create_app
+    app = create_app({'WARMUP': False})
+
+    config = seeding.config_from_args(args)
+    start = time.perf_counter()
+    tenants = seeding.seed(config)
+    seed_seconds = time.perf_counter() - start
+
+    client = HttpClient(args.url) if args.url else InProcessClient(app)
+
+    scenarios = SCENARIOS
+    if args.solo:
+        wanted = {name.strip() for name in args.solo.split(',')}
+        scenarios = [s for s in SCENARIOS if s.endpoint in wanted or s.key in wanted]
+
+    missing = sorted(_route_endpoints(app) - {s.endpoint for s in SCENARIOS})
+    if missing:
+        print(f"⚠️ Endpoints sin escenario: {', '.join(missing)}", file=sys.stderr)
+
+    results = {}
+    for index, scenario in enumerate(scenarios):
+        print(f"→ {scenario.key}", file=sys.stderr)
+        requests = max(1, round(args.peticiones * scenario.weight))
+        results[scenario.key] = run_scenario(
+            client, scenario, tenants, requests, args.concurrencia, seed=config.seed + index
+        )
+
+    report = {
+        "fecha": datetime.datetime.now().isoformat(timespec='seconds'),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "modo": args.url or "en-proceso",
+        "db": db_config.get_backend().describe(),
+        "escala": vars(config),
+        "siembra_segundos": round(seed_seconds, 2),
+        "peticiones_por_endpoint": args.peticiones,
+        "concurrencia": args.concurrencia,
+        "endpoints": results,
+    }
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, 'w') as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Escenarios de carga: uno por cada endpoint de api/routes/.
+
+Cada escenario define cómo armar la petición número i para un tenant. Los que
+modifican o borran datos usan un 'prepare' que crea de antemano (por SQL) los
+registros que van a consumir, así cada petición ejerce el camino exitoso.
+
+El peso escala la cantidad de peticiones del escenario respecto de --peticiones:
+las operaciones masivas (importaciones, exportaciones, vínculos en lote) pesan
+menos, como en el tráfico real. Un endpoint puede tener más de un escenario
+(ej. renombrar y mover una categoría); se distinguen por 'name'.
+"""
+import datetime
+import itertools
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from api.db.db_config import get_db_connection
+from api.models.category_tree import CategoryTree
+from benchmarks.seed import PASSWORD
+
+_unique = itertools.count()
+
+
+@dataclass
+class Scenario:
+    endpoint: str
+    method: str
+    path: Callable
+    body: Optional[Callable] = None
+    prepare: Optional[Callable] = None
+    weight: float = 1.0
+    name: Optional[str] = None
+
+    @property
+    def key(self):
+        """Nombre del escenario en los resultados"""
+        return self.name or self.endpoint
+
+
+def _unique_name(prefix):
+    return f"{prefix} {next(_unique)}-{datetime.datetime.now().strftime('%H%M%S%f')}"
+
+
+def _insert_many(tenant, sql, rows):
+    """Inserta filas en la base del tenant y retorna los ids generados (una fila por INSERT)"""
+    ids = []
+    connection = get_db_connection(tenant.user_id)
+    cursor = connection.cursor()
+    try:
+        for row in rows:
+            cursor.execute(sql, row)
+            ids.append(cursor.lastrowid)
+        connection.commit()
+    finally:
+        cursor.close()
+        connection.close()
+    return ids
+
+
+def _prepare_categories(tenant, rnd, n):
+    return _insert_many(
+        tenant,
+        'INSERT INTO categories (name, descripcion, user_id) VALUES (%s, %s, %s)',
+        [(_unique_name("Temporal"), "", tenant.user_id) for _ in range(n)]
+    )
+
+
+def _prepare_products(tenant, rnd, n):
+    return _insert_many(
+        tenant,
+        'INSERT INTO products (name, price, user_id) VALUES (%s, %s, %s)',
+        [(_unique_name("Temporal"), 100, tenant.user_id) for _ in range(n)]
+    )
+
+
+def _prepare_suppliers(tenant, rnd, n):
+    return _insert_many(
+        tenant,
+        'INSERT INTO suppliers (name_supplier, phone, mail, user_id) VALUES (%s, %s, %s, %s)',
+        [(_unique_name("Temporal"), "", "", tenant.user_id) for _ in range(n)]
+    )
+
+
+def _prepare_links(tenant, rnd, n):
+    """Un proveedor nuevo por tenant; vincular y desvincular usan los mismos pares"""
+    if not hasattr(tenant, 'bench_link_supplier'):
+        tenant.bench_link_supplier = _prepare_suppliers(tenant, rnd, 1)[0]
+    return [(tenant.bench_link_supplier, tenant.product_ids[i % len(tenant.product_ids)]) for i in range(n)]
+
+
+def _prepare_pending_orders(tenant, rnd, n):
+    ids = _insert_many(
+        tenant,
+        'INSERT INTO purchase_orders (order_date, status, user_id) VALUES (%s, %s, %s)',
+        [(datetime.date.today(), 'pending', tenant.user_id) for _ in range(n)]
+    )
+    lines = [
+        (order_id, product_id, rnd.randint(1, 20))
+        for order_id in ids
+        for product_id in set(tenant.popular_products(rnd, 3))
+    ]
+    _insert_many(tenant, 'INSERT INTO order_products (order_id, product_id, quantity) VALUES (%s, %s, %s)', lines)
+    return ids
+
+
+def _prepare_subtrees(tenant, rnd, n):
+    """Una categoría raíz nueva con una hija por petición (el subárbol que se mueve)"""
+    connection = get_db_connection(tenant.user_id)
+    cursor = connection.cursor()
+    roots = []
+    try:
+        for _ in range(n):
+            name = _unique_name("Rama")
+            cursor.execute(
+                'INSERT INTO categories (name, descripcion, user_id) VALUES (%s, %s, %s)',
+                (name, "", tenant.user_id)
+            )
+            root_id = cursor.lastrowid
+            CategoryTree.add(cursor, tenant.user_id, root_id)
+            cursor.execute(
+                'INSERT INTO categories (name, descripcion, parent_id, user_id) VALUES (%s, %s, %s, %s)',
+                (_unique_name("Hoja"), "", root_id, tenant.user_id)
+            )
+            CategoryTree.add(cursor, tenant.user_id, cursor.lastrowid, root_id)
+            roots.append((root_id, name))
+        connection.commit()
+    finally:
+        cursor.close()
+        connection.close()
+    return roots
+
+
+def _price_list(t, r, size=200):
+    """CSV de lista de precios con 'size' productos del tenant"""
+    rows = [f"{pid},{r.randint(50, 40000)},{r.randint(1, 30)}"
+            for pid in r.sample(t.product_ids, min(size, len(t.product_ids)))]
+    return ("producto,costo,plazo\n" + "\n".join(rows) + "\n").encode()
+
+
+def _report_name(i):
+    reports = ("resumen-inventario", "articulos-populares", "pedidos-por-estado", "abc", "pronostico-demanda")
+    return reports[i % len(reports)]
+
+
+def _base(t):
+    return f"/usuario/{t.user_id}"
+
+
+SCENARIOS = [
+    # Usuarios
+    Scenario("login", "POST", lambda t, r, i, p: "/login",
+             body=lambda t, r, i, p: {"username": t.username, "password": PASSWORD}),
+    Scenario("register", "POST", lambda t, r, i, p: "/register",
+             body=lambda t, r, i, p: {"username": _unique_name("bench").replace(' ', '_')[:50],
+                                      "password": PASSWORD}),
+
+    # Lecturas
+    Scenario("obtener_articulos", "GET", lambda t, r, i, p: f"{_base(t)}/articulos"),
+    Scenario("obtener_clasificaciones", "GET", lambda t, r, i, p: f"{_base(t)}/clasificaciones"),
+    Scenario("obtener_clasificacion", "GET",
+             lambda t, r, i, p: f"{_base(t)}/clasificaciones/{r.choice(t.category_ids)}"),
+    Scenario("obtener_arbol_clasificaciones", "GET", lambda t, r, i, p: f"{_base(t)}/clasificaciones/arbol"),
+    Scenario("obtener_inventario", "GET", lambda t, r, i, p: f"{_base(t)}/inventario"),
+    Scenario("obtener_stock_bajo", "GET", lambda t, r, i, p: f"{_base(t)}/inventario/alerta-bajo"),
+    Scenario("obtener_estadisticas_inventario", "GET", lambda t, r, i, p: f"{_base(t)}/inventario/estadisticas"),
+    Scenario("obtener_reposicion", "GET", lambda t, r, i, p: f"{_base(t)}/inventario/reposicion"),
+    Scenario("obtener_distribuidores", "GET", lambda t, r, i, p: f"{_base(t)}/distribuidores"),
+    Scenario("obtener_productos_proveedor", "GET",
+             lambda t, r, i, p: f"{_base(t)}/distribuidores/{r.choice(t.supplier_ids)}/productos"),
+    Scenario("obtener_proveedores_producto", "GET",
+             lambda t, r, i, p: f"{_base(t)}/articulos/{t.popular_products(r, 1)[0]}/proveedores"),
+    Scenario("obtener_proveedores_mas_baratos", "GET", lambda t, r, i, p: f"{_base(t)}/distribuidores/mas-baratos"),
+    Scenario("obtener_pedidos", "GET", lambda t, r, i, p: f"{_base(t)}/pedidos"),
+    Scenario("obtener_pedido_detalle", "GET",
+             lambda t, r, i, p: f"{_base(t)}/pedidos/{r.choice(t.order_ids)}"),
+    Scenario("informe_resumen_inventario", "GET", lambda t, r, i, p: f"{_base(t)}/informes/resumen-inventario"),
+    Scenario("informe_articulos_populares", "GET", lambda t, r, i, p: f"{_base(t)}/informes/articulos-populares"),
+    Scenario("informe_pedidos_por_estado", "GET", lambda t, r, i, p: f"{_base(t)}/informes/pedidos-por-estado"),
+    Scenario("informe_abc", "GET", lambda t, r, i, p: f"{_base(t)}/informes/abc?limit=50"),
+    Scenario("informe_pronostico_demanda", "GET", lambda t, r, i, p: f"{_base(t)}/informes/pronostico-demanda"),
+    Scenario("obtener_subarbol_clasificacion", "GET",
+             lambda t, r, i, p: f"{_base(t)}/clasificaciones/{r.choice(t.category_ids)}/subarbol"),
+    Scenario("exportar_inventario", "GET", lambda t, r, i, p: f"{_base(t)}/exportar/inventario", weight=0.5),
+    Scenario("exportar_pedidos", "GET", lambda t, r, i, p: f"{_base(t)}/exportar/pedidos", weight=0.5),
+    Scenario("exportar_informe", "GET",
+             lambda t, r, i, p: f"{_base(t)}/exportar/informes/{_report_name(i)}", weight=0.5),
+    Scenario("buscar", "GET",
+             lambda t, r, i, p: f"{_base(t)}/buscar?q={t.product_names[t.popular_products(r, 1)[0]].split()[0]}"),
+
+    # Escrituras
+    Scenario("crear_clasificacion", "POST", lambda t, r, i, p: f"{_base(t)}/clasificaciones",
+             body=lambda t, r, i, p: {"name": _unique_name("Categoría"), "descripcion": "benchmark"}),
+    Scenario("actualizar_clasificacion", "PUT",
+             lambda t, r, i, p: f"{_base(t)}/clasificaciones/{t.category_ids[i % len(t.category_ids)]}",
+             body=lambda t, r, i, p: {"name": t.category_names[t.category_ids[i % len(t.category_ids)]],
+                                      "descripcion": f"actualizada {i}"}),
+    Scenario("actualizar_clasificacion", "PUT", lambda t, r, i, p: f"{_base(t)}/clasificaciones/{p[i][0]}",
+             body=lambda t, r, i, p: {"name": p[i][1], "descripcion": "", "parent_id": r.choice(t.category_ids)},
+             prepare=_prepare_subtrees, name="mover_clasificacion"),
+    Scenario("eliminar_clasificacion", "DELETE", lambda t, r, i, p: f"{_base(t)}/clasificaciones/{p[i]}",
+             prepare=_prepare_categories),
+    Scenario("crear_articulo", "POST", lambda t, r, i, p: f"{_base(t)}/articulos",
+             body=lambda t, r, i, p: {"name": _unique_name("Artículo"), "price": 1500,
+                                      "category_id": r.choice(t.category_ids), "quantity": 10}),
+    Scenario("actualizar_articulo", "PUT",
+             lambda t, r, i, p: f"{_base(t)}/articulos/{t.product_ids[i % len(t.product_ids)]}",
+             body=lambda t, r, i, p: {"name": t.product_names[t.product_ids[i % len(t.product_ids)]],
+                                      "price": r.randint(100, 50000), "category_id": r.choice(t.category_ids)}),
+    Scenario("eliminar_articulo", "DELETE", lambda t, r, i, p: f"{_base(t)}/articulos/{p[i]}",
+             prepare=_prepare_products),
+    Scenario("actualizar_stock", "PUT",
+             lambda t, r, i, p: f"{_base(t)}/inventario/{t.popular_products(r, 1)[0]}",
+             body=lambda t, r, i, p: {"quantity": r.randint(0, 200)}),
+    Scenario("crear_distribuidor", "POST", lambda t, r, i, p: f"{_base(t)}/distribuidores",
+             body=lambda t, r, i, p: {"name": _unique_name("Proveedor"), "phone": "", "email": ""}),
+    Scenario("eliminar_distribuidor", "DELETE", lambda t, r, i, p: f"{_base(t)}/distribuidores/{p[i]}",
+             prepare=_prepare_suppliers),
+    Scenario("vincular_proveedor_producto", "POST",
+             lambda t, r, i, p: f"{_base(t)}/proveedores/{p[i][0]}/productos/{p[i][1]}",
+             prepare=_prepare_links),
+    Scenario("desvincular_proveedor_producto", "DELETE",
+             lambda t, r, i, p: f"{_base(t)}/proveedores/{p[i][0]}/productos/{p[i][1]}",
+             prepare=_prepare_links),
+    Scenario("vincular_productos_masivo", "POST",
+             lambda t, r, i, p: f"{_base(t)}/proveedores/{p[i]}/productos",
+             body=lambda t, r, i, p: {"product_ids": r.sample(t.product_ids, min(50, len(t.product_ids)))},
+             prepare=_prepare_suppliers, weight=0.25),
+    Scenario("importar_lista_precios", "POST",
+             lambda t, r, i, p: f"{_base(t)}/distribuidores/{p[i]}/lista-precios",
+             body=lambda t, r, i, p: _price_list(t, r), prepare=_prepare_suppliers, weight=0.25),
+    Scenario("crear_pedido_reposicion", "POST", lambda t, r, i, p: f"{_base(t)}/inventario/reposicion/pedidos",
+             body=lambda t, r, i, p: {}, weight=0.5),
+    Scenario("crear_pedido", "POST", lambda t, r, i, p: f"{_base(t)}/pedidos",
+             body=lambda t, r, i, p: {"items": [{"product_id": pid, "quantity": r.randint(1, 20)}
+                                                for pid in set(t.popular_products(r, 3))]}),
+    Scenario("confirmar_pedido", "PUT", lambda t, r, i, p: f"{_base(t)}/pedidos/{p[i]}/confirmar",
+             prepare=_prepare_pending_orders),
+    Scenario("eliminar_pedido", "DELETE", lambda t, r, i, p: f"{_base(t)}/pedidos/{p[i]}",
+             prepare=_prepare_pending_orders),
+]
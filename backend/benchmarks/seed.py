@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+"""
+Generador de tenants sintéticos para benchmarks.
+
+Crea usuarios con categorías, productos (con stock), proveedores, vínculos
+proveedor-producto y órdenes con sus líneas, usando INSERT multi-fila por lotes.
+La popularidad de los productos en las órdenes sigue una distribución de Zipf
+(pocos productos concentran la mayoría de las líneas).
+
+Uso (desde backend/):
+    python -m benchmarks.seed --tenants 2 --productos 10000 --pedidos 5000
+"""
+import argparse
+import datetime
+import itertools
+import json
+import random
+import time
+from dataclasses import dataclass, field
+
+from werkzeug.security import generate_password_hash
+
+from api.db import counters
+from api.db.db_config import get_db_connection, provision_tenant
+from api.models.category_tree import CategoryTree
+from api.models.stock import Stock
+
+# Contraseña de todos los usuarios sintéticos (para el escenario de login)
+PASSWORD = "benchmark123"
+
+BATCH_SIZE = 1000
+
+PALABRAS = [
+    "auriculares", "teclado", "mouse", "monitor", "cable", "cargador", "parlante",
+    "notebook", "tablet", "impresora", "router", "microfono", "camara", "bateria",
+    "soporte", "adaptador", "funda", "disco", "memoria", "lampara"
+]
+MARCAS = ["Sony", "Logitech", "Samsung", "Philips", "Genius", "Noblex", "Lenovo", "HP"]
+
+
+@dataclass
+class SeedConfig:
+    """Escala de cada tenant sintético"""
+    tenants: int = 1
+    categorias: int = 20
+    productos: int = 1000
+    proveedores: int = 20
+    productos_por_proveedor: int = 50
+    pedidos: int = 500
+    lineas_por_pedido: int = 4
+    dias_historia: int = 365
+    zipf: float = 1.1
+    seed: int = 42
+
+
+@dataclass
+class Tenant:
+    """Datos de un tenant sembrado que usan los escenarios de carga"""
+    user_id: int
+    username: str
+    category_ids: list = field(default_factory=list)
+    category_names: dict = field(default_factory=dict)
+    product_ids: list = field(default_factory=list)
+    product_names: dict = field(default_factory=dict)
+    product_weights: list = field(default_factory=list)
+    supplier_ids: list = field(default_factory=list)
+    order_ids: list = field(default_factory=list)
+
+    def popular_products(self, rnd, k):
+        """Elige k productos respetando la popularidad sesgada"""
+        return rnd.choices(self.product_ids, cum_weights=self.product_weights, k=k)
+
+
+def _batches(rows, size=BATCH_SIZE):
+    iterator = iter(rows)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _bulk_insert(cursor, sql, rows):
+    """Inserta filas por lotes con executemany (INSERT multi-fila en MySQL)"""
+    for batch in _batches(rows):
+        cursor.executemany(sql, batch)
+
+
+def _zipf_cum_weights(count, s):
+    total = 0.0
+    weights = []
+    for rank in range(1, count + 1):
+        total += 1.0 / rank ** s
+        weights.append(total)
+    return weights
+
+
+def create_user(index, rnd, password_hash):
+    """Crea el usuario en la base principal (y en su shard, si hay sharding)"""
+    username = f"bench_{int(time.time())}_{index}_{rnd.randrange(10 ** 6)}"
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    try:
+        cursor.execute('INSERT INTO users (username, password) VALUES (%s, %s)', (username, password_hash))
+        user_id = cursor.lastrowid
+        connection.commit()
+    finally:
+        cursor.close()
+        connection.close()
+    provision_tenant(user_id)
+    return Tenant(user_id=user_id, username=username)
+
+
+def seed_tenant(cursor, config, tenant, rnd):
+    """Siembra los datos de un tenant y los agrega a 'tenant'"""
+    user_id = tenant.user_id
+
+    # Categorías
+    _bulk_insert(
+        cursor,
+        'INSERT INTO categories (name, descripcion, user_id) VALUES (%s, %s, %s)',
+        ((f"Categoría {i}", f"Categoría sintética {i}", user_id) for i in range(config.categorias))
+    )
+    cursor.execute('SELECT id, name FROM categories WHERE user_id = %s ORDER BY id', (user_id,))
+    for category_id, name in cursor.fetchall():
+        tenant.category_ids.append(category_id)
+        tenant.category_names[category_id] = name
+
+    # Jerarquía de dos niveles: la primera cuarta parte son raíces y el resto
+    # se reparte entre ellas
+    roots = tenant.category_ids[:max(1, len(tenant.category_ids) // 4)]
+    for i, category_id in enumerate(tenant.category_ids):
+        parent_id = None if category_id in roots else roots[i % len(roots)]
+        if parent_id is not None:
+            cursor.execute('UPDATE categories SET parent_id = %s WHERE id = %s', (parent_id, category_id))
+        CategoryTree.add(cursor, user_id, category_id, parent_id)
+
+    # Productos (el trigger after_product_insert crea el stock en 0)
+    def product_rows():
+        for i in range(config.productos):
+            name = f"{rnd.choice(PALABRAS).capitalize()} {rnd.choice(MARCAS)} {i}"
+            category_id = rnd.choice(tenant.category_ids) if tenant.category_ids and rnd.random() > 0.05 else None
+            yield (name, f"Producto sintético {i}", round(rnd.uniform(100, 50000), 2), category_id, user_id)
+
+    _bulk_insert(
+        cursor,
+        'INSERT INTO products (name, description, price, category_id, user_id) VALUES (%s, %s, %s, %s, %s)',
+        product_rows()
+    )
+    cursor.execute('SELECT id, name FROM products WHERE user_id = %s ORDER BY id', (user_id,))
+    for product_id, name in cursor.fetchall():
+        tenant.product_ids.append(product_id)
+        tenant.product_names[product_id] = name
+
+    # Stock pseudoaleatorio (incluye productos en cero y con stock bajo)
+    cursor.execute(
+        'UPDATE stock SET quantity = (product_id * 7919) % 120 WHERE user_id = %s',
+        (user_id,)
+    )
+    Stock.refresh_low_stock(cursor, user_id)
+
+    # Popularidad sesgada: el orden de los productos define su ranking
+    rnd.shuffle(tenant.product_ids)
+    tenant.product_weights = _zipf_cum_weights(len(tenant.product_ids), config.zipf)
+
+    # Proveedores y vínculos
+    _bulk_insert(
+        cursor,
+        'INSERT INTO suppliers (name_supplier, phone, mail, user_id) VALUES (%s, %s, %s, %s)',
+        ((f"Proveedor {i}", f"11-{4000 + i}", f"proveedor{i}@ejemplo.com", user_id)
+         for i in range(config.proveedores))
+    )
+    cursor.execute('SELECT id FROM suppliers WHERE user_id = %s ORDER BY id', (user_id,))
+    tenant.supplier_ids = [row[0] for row in cursor.fetchall()]
+
+    def link_rows():
+        per_supplier = min(config.productos_por_proveedor, len(tenant.product_ids))
+        for supplier_id in tenant.supplier_ids:
+            for product_id in rnd.sample(tenant.product_ids, per_supplier):
+                yield (supplier_id, product_id, user_id, round(rnd.uniform(1, 500), 2), rnd.randint(1, 30))
+
+    _bulk_insert(
+        cursor,
+        'INSERT INTO suppliers_products (supplier_id, product_id, user_id, cost, lead_time_days) '
+        'VALUES (%s, %s, %s, %s, %s)',
+        link_rows()
+    )
+    # Contadores product_count de proveedores y categorías del tenant
+    counters.repair(cursor, counters.find_drift(cursor, user_id))
+
+    # Órdenes con fechas repartidas en el período de historia
+    today = datetime.date.today()
+
+    def order_rows():
+        for _ in range(config.pedidos):
+            order_date = today - datetime.timedelta(days=rnd.randrange(config.dias_historia))
+            status = rnd.choices(['completed', 'pending', 'deleted'], weights=[80, 15, 5])[0]
+            received = order_date + datetime.timedelta(days=rnd.randint(1, 15)) if status == 'completed' else None
+            yield (order_date, received, status, user_id)
+
+    _bulk_insert(
+        cursor,
+        'INSERT INTO purchase_orders (order_date, received_date, status, user_id) VALUES (%s, %s, %s, %s)',
+        order_rows()
+    )
+    cursor.execute('SELECT id FROM purchase_orders WHERE user_id = %s ORDER BY id', (user_id,))
+    tenant.order_ids = [row[0] for row in cursor.fetchall()]
+
+    def line_rows():
+        for order_id in tenant.order_ids:
+            lines = max(1, int(rnd.expovariate(1.0 / config.lineas_por_pedido)))
+            for product_id in set(tenant.popular_products(rnd, lines)):
+                yield (order_id, product_id, rnd.randint(1, 50))
+
+    _bulk_insert(
+        cursor,
+        'INSERT INTO order_products (order_id, product_id, quantity) VALUES (%s, %s, %s)',
+        line_rows()
+    )
+
+    return tenant
+
+
+def seed(config):
+    """Siembra config.tenants tenants y retorna la lista de Tenant"""
+    rnd = random.Random(config.seed)
+    password_hash = generate_password_hash(PASSWORD, method='pbkdf2:sha256')
+    tenants = []
+
+    for index in range(config.tenants):
+        tenant = create_user(index, rnd, password_hash)
+        connection = get_db_connection(tenant.user_id)
+        cursor = connection.cursor()
+        try:
+            tenants.append(seed_tenant(cursor, config, tenant, rnd))
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+
+    return tenants
+
+
+def add_arguments(parser):
+    """Argumentos de escala compartidos con benchmarks.run"""
+    defaults = SeedConfig()
+    parser.add_argument("--tenants", type=int, default=defaults.tenants)
+    parser.add_argument("--categorias", type=int, default=defaults.categorias)
+    parser.add_argument("--productos", type=int, default=defaults.productos)
+    parser.add_argument("--proveedores", type=int, default=defaults.proveedores)
+    parser.add_argument("--productos-por-proveedor", type=int, default=defaults.productos_por_proveedor)
+    parser.add_argument("--pedidos", type=int, default=defaults.pedidos)
+    parser.add_argument("--lineas-por-pedido", type=int, default=defaults.lineas_por_pedido)
+    parser.add_argument("--dias-historia", type=int, default=defaults.dias_historia)
+    parser.add_argument("--zipf", type=float, default=defaults.zipf)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def config_from_args(args):
+    return SeedConfig(
+        tenants=args.tenants,
+        categorias=args.categorias,
+        productos=args.productos,
+        proveedores=args.proveedores,
+        productos_por_proveedor=args.productos_por_proveedor,
+        pedidos=args.pedidos,
+        lineas_por_pedido=args.lineas_por_pedido,
+        dias_historia=args.dias_historia,
+        zipf=args.zipf,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera tenants sintéticos")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    tenants = seed(config_from_args(args))
+    print(json.dumps({
+        "tenants": [{"user_id": t.user_id, "username": t.username} for t in tenants],
+        "segundos": round(time.perf_counter() - start, 2)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
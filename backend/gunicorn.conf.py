@@ -0,0 +1,68 @@
+# Configuración del servidor de producción (gunicorn)
+# Todos los valores se pueden ajustar con variables de entorno.
+import glob
+import multiprocessing
+import os
+import tempfile
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '5000')}"
+
+# Procesos worker y threads por worker
+workers = int(os.getenv('WEB_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('WEB_THREADS', '4'))
+worker_class = 'gthread'
+
+# Cargar la app en el proceso maestro antes de forkear (arranque en caliente).
+# El maestro no abre conexiones: el pool y las cachés se precalientan en cada
+# worker (post_fork). Con la app precargada, HUP no recarga el código.
+preload_app = os.getenv('WEB_PRELOAD', '1') == '1'
+
+# Segundos máximos de una petición antes de reiniciar el worker
+timeout = int(os.getenv('WEB_TIMEOUT', '30'))
+# Segundos que se esperan peticiones en curso al recargar/detener (drenado)
+graceful_timeout = int(os.getenv('WEB_GRACEFUL_TIMEOUT', '30'))
+# Segundos que se mantiene abierta una conexión keep-alive
+keepalive = int(os.getenv('WEB_KEEPALIVE', '5'))
+
+# Reciclar workers cada N peticiones (con variación para no reiniciarlos a la vez)
+max_requests = int(os.getenv('WEB_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.getenv('WEB_MAX_REQUESTS_JITTER', '200'))
+
+# Carpeta donde cada worker vuelca sus métricas para /metrics
+os.environ.setdefault('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'inventario_metrics'))
+
+accesslog = '-'
+errorlog = '-'
+
+
+def on_starting(server):
+    """Descarta métricas de ejecuciones anteriores del servidor"""
+    for path in glob.glob(os.path.join(os.environ['METRICS_DIR'], 'metrics_*.json')):
+        os.remove(path)
+
+
+def worker_exit(server, worker):
+    """Último volcado de métricas del worker antes de terminar"""
+    from api.utils import metrics
+    metrics.registry.maybe_flush(force=True)
+
+
+def child_exit(server, worker):
+    """Suma las métricas del worker terminado a los acumulados y borra su archivo"""
+    from api.utils import metrics
+    metrics.fold_dead_worker(worker.pid)
+
+
+def post_fork(server, worker):
+    """
+    Cada worker abre su propio pool de conexiones (no se comparten sockets)
+    y, con APP_WARMUP=1, lo precalienta antes de atender peticiones
+    """
+    from api import warmup
+    from api.config import Config
+    from api.db import db_config
+    from api.utils import metrics
+    db_config.reset_pool()
+    metrics.registry.start_flusher()
+    if Config.WARMUP:
+        warmup(worker.app.wsgi())
@@ -2,18 +2,15 @@
 """
 Sistema de Gestión de Inventario - API REST
 Versión 2.0 - Modernizado
+
+Uso:
+    python main.py                # Servidor de desarrollo (Werkzeug)
+    python main.py --produccion   # Servidor multi-proceso (gunicorn.conf.py)
 """
-import sys
 import os
+import sys
 
-# Limpiar caché de módulos importados
-if 'api' in sys.modules:
-    del sys.modules['api']
-for module in list(sys.modules.keys()):
-    if module.startswith('api.'):
-        del sys.modules[module]
-
-from api import app
+from api import create_app
 
 def print_banner():
     """Imprime el banner de inicio del servidor"""
@@ -29,7 +26,41 @@ def print_banner():
     """
     print(banner)
 
+def run_production():
+    """
+    Levanta la API con gunicorn usando gunicorn.conf.py.
+    La app se crea una vez en el proceso maestro y los workers la heredan;
+    el pool se abre y precalienta en cada worker (ver post_fork).
+    Recarga de configuración sin cortes: kill -HUP <pid maestro> (el código
+    nuevo requiere reiniciar el maestro, o WEB_PRELOAD=0). Detener drenando: kill -TERM.
+    """
+    try:
+        from gunicorn.app.base import Application
+    except ImportError:
+        print("❌ gunicorn no está instalado (pip install -r settings/requirements.txt).")
+        print("   En Windows usar el servidor de desarrollo: python main.py")
+        sys.exit(1)
+
+    class InventoryServer(Application):
+        def load_config(self):
+            config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn.conf.py')
+            self.load_config_from_file(config_file)
+
+        def init(self, parser, opts, args):
+            pass
+
+        def load(self):
+            # Sin precalentar: el maestro no debe abrir conexiones que
+            # heredarían los workers
+            return create_app({'WARMUP': False})
+
+    InventoryServer().run()
+
 if __name__ == '__main__':
     print_banner()
-    # Deshabilitar reloader para forzar uso del código nuevo
-    app.run(host='0.0.0.0', port=5000, debug=True, use_reloader=False)
\ No newline at end of file
+    if '--produccion' in sys.argv:
+        run_production()
+    else:
+        app = create_app()
+        # Deshabilitar reloader para forzar uso del código nuevo
+        app.run(host='0.0.0.0', port=5000, debug=True, use_reloader=False)
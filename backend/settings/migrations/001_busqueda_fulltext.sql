@@ -0,0 +1,9 @@
+-- Migración: índices FULLTEXT para la búsqueda (/usuario/<id>/buscar)
+-- Aplicar sobre bases creadas con una versión anterior de schema.sql
+USE gestion_inventario;
+
+ALTER TABLE products ADD COLUMN description TEXT AFTER name;
+
+ALTER TABLE products ADD FULLTEXT INDEX ft_product_text (name, description);
+ALTER TABLE categories ADD FULLTEXT INDEX ft_category_name (name);
+ALTER TABLE suppliers ADD FULLTEXT INDEX ft_supplier_name (name_supplier);
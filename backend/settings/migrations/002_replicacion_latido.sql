@@ -0,0 +1,8 @@
+-- Migración: tabla de latido para medir el retraso de la réplica de lectura
+-- Aplicar sobre bases creadas con una versión anterior de schema.sql
+USE gestion_inventario;
+
+CREATE TABLE IF NOT EXISTS replication_heartbeat (
+    id INT NOT NULL PRIMARY KEY,
+    ts DOUBLE NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,10 @@
+-- Migración: tabla de asignación de tenants a shards (solo en la base principal)
+-- Aplicar sobre bases creadas con una versión anterior de schema.sql
+USE gestion_inventario;
+
+CREATE TABLE IF NOT EXISTS tenant_shards (
+    user_id INT NOT NULL PRIMARY KEY,
+    shard VARCHAR(64) NOT NULL,
+    status ENUM('active', 'moving') NOT NULL DEFAULT 'active',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
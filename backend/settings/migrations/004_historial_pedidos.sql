@@ -0,0 +1,41 @@
+-- Migración: tablas de historial y vistas para el archivado de órdenes
+-- Aplicar sobre bases creadas con una versión anterior de schema.sql
+USE gestion_inventario;
+
+CREATE TABLE IF NOT EXISTS purchase_orders_history (
+    id INT NOT NULL PRIMARY KEY,
+    order_date DATE NOT NULL,
+    received_date DATE DEFAULT NULL,
+    status ENUM('pending', 'completed', 'deleted') DEFAULT 'pending',
+    user_id INT NOT NULL,
+    created_at TIMESTAMP NULL DEFAULT NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_user_status (user_id, status),
+    INDEX idx_order_date (order_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS order_products_history (
+    id INT NOT NULL PRIMARY KEY,
+    order_id INT NOT NULL,
+    product_id INT NOT NULL,
+    quantity INT NOT NULL,
+    user_id INT NOT NULL,
+    FOREIGN KEY (order_id) REFERENCES purchase_orders_history(id) ON DELETE CASCADE,
+    FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_order (order_id),
+    INDEX idx_user_product (user_id, product_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE OR REPLACE VIEW purchase_orders_all AS
+    SELECT id, order_date, received_date, status, user_id, created_at FROM purchase_orders
+    UNION ALL
+    SELECT id, order_date, received_date, status, user_id, created_at FROM purchase_orders_history;
+
+CREATE OR REPLACE VIEW order_products_all AS
+    SELECT op.id, op.order_id, op.product_id, op.quantity, po.user_id
+    FROM order_products op
+    JOIN purchase_orders po ON op.order_id = po.id
+    UNION ALL
+    SELECT id, order_id, product_id, quantity, user_id FROM order_products_history;
@@ -0,0 +1,16 @@
+-- Migración: tabla de claves de idempotencia (header Idempotency-Key)
+-- Aplicar sobre bases creadas con una versión anterior de schema.sql
+USE gestion_inventario;
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    user_id INT NOT NULL,
+    idem_key VARCHAR(255) NOT NULL,
+    request_hash CHAR(64) NOT NULL,
+    status_code INT DEFAULT NULL,
+    response_body MEDIUMTEXT,
+    locked_until DATETIME NOT NULL,
+    expires_at DATETIME NOT NULL,
+    PRIMARY KEY (user_id, idem_key),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_expires (expires_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
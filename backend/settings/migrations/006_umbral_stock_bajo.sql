@@ -0,0 +1,14 @@
+-- Migración: umbrales de stock bajo por producto/categoría y marca indexada en stock
+-- Aplicar sobre bases creadas con una versión anterior de schema.sql
+USE gestion_inventario;
+
+ALTER TABLE categories ADD COLUMN low_stock_threshold INT DEFAULT NULL AFTER descripcion;
+ALTER TABLE products ADD COLUMN low_stock_threshold INT DEFAULT NULL AFTER price;
+ALTER TABLE stock
+    ADD COLUMN low_stock TINYINT(1) NOT NULL DEFAULT 1 AFTER quantity,
+    ADD INDEX idx_user_low_stock (user_id, low_stock, quantity);
+
+-- La marca inicial se calcula después, con el umbral configurado en la API
+-- (LOW_STOCK_THRESHOLD, 5 por defecto), ejecutando desde backend/:
+--     python -m api.db.low_stock
+-- El mismo comando recalcula la marca si se cambia LOW_STOCK_THRESHOLD.
@@ -0,0 +1,7 @@
+-- Migración: clase ABC guardada por producto (POST /informes/abc)
+-- Aplicar sobre bases creadas con una versión anterior de schema.sql
+USE gestion_inventario;
+
+ALTER TABLE products
+    ADD COLUMN abc_class CHAR(1) DEFAULT NULL AFTER low_stock_threshold,
+    ADD INDEX idx_user_abc (user_id, abc_class);
@@ -0,0 +1,12 @@
+-- Migración: vista de líneas de órdenes con su fecha/estado (activas + historial)
+-- Aplicar sobre bases creadas con una versión anterior de schema.sql
+USE gestion_inventario;
+
+CREATE OR REPLACE VIEW order_lines_all AS
+    SELECT op.product_id, op.quantity, po.id AS order_id, po.order_date, po.received_date, po.status, po.user_id
+    FROM order_products op
+    JOIN purchase_orders po ON op.order_id = po.id
+    UNION ALL
+    SELECT oph.product_id, oph.quantity, poh.id, poh.order_date, poh.received_date, poh.status, poh.user_id
+    FROM order_products_history oph
+    JOIN purchase_orders_history poh ON oph.order_id = poh.id;
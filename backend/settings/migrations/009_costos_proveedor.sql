@@ -0,0 +1,8 @@
+-- Migración: costo y plazo de entrega por proveedor y producto (listas de precios)
+-- Aplicar sobre bases creadas con una versión anterior de schema.sql
+USE gestion_inventario;
+
+ALTER TABLE suppliers_products
+    ADD COLUMN cost DECIMAL(10,2) DEFAULT NULL AFTER user_id,
+    ADD COLUMN lead_time_days INT DEFAULT NULL AFTER cost,
+    ADD INDEX idx_user_product_cost (user_id, product_id, cost);
@@ -0,0 +1,18 @@
+-- Migración: contadores product_count en proveedores y categorías
+-- Aplicar sobre bases creadas con una versión anterior de schema.sql; después,
+-- python -m api.db.counters no debería mostrar diferencias
+USE gestion_inventario;
+
+ALTER TABLE categories
+    ADD COLUMN product_count INT NOT NULL DEFAULT 0 AFTER low_stock_threshold;
+
+ALTER TABLE suppliers
+    ADD COLUMN product_count INT NOT NULL DEFAULT 0 AFTER mail,
+    DROP INDEX idx_user_supplier,
+    ADD INDEX idx_user_supplier (user_id, name_supplier);
+
+UPDATE categories c
+SET product_count = (SELECT COUNT(*) FROM products p WHERE p.category_id = c.id);
+
+UPDATE suppliers s
+SET product_count = (SELECT COUNT(*) FROM suppliers_products sp WHERE sp.supplier_id = s.id);
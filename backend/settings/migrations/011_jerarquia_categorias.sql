@@ -0,0 +1,23 @@
+-- Migración: categorías jerárquicas (parent_id + tabla de clausura category_tree)
+-- Aplicar sobre bases creadas con una versión anterior de schema.sql; las
+-- categorías existentes quedan como raíces
+USE gestion_inventario;
+
+ALTER TABLE categories
+    ADD COLUMN parent_id INT DEFAULT NULL AFTER product_count,
+    ADD INDEX idx_parent (parent_id);
+
+CREATE TABLE category_tree (
+    ancestor_id INT NOT NULL,
+    descendant_id INT NOT NULL,
+    depth INT NOT NULL,
+    user_id INT NOT NULL,
+    PRIMARY KEY (ancestor_id, descendant_id),
+    FOREIGN KEY (ancestor_id) REFERENCES categories(id) ON DELETE CASCADE,
+    FOREIGN KEY (descendant_id) REFERENCES categories(id) ON DELETE CASCADE,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_descendant (descendant_id, depth)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT INTO category_tree (ancestor_id, descendant_id, depth, user_id)
+SELECT id, id, 0, user_id FROM categories;
@@ -0,0 +1,6 @@
+-- Migración: versión del índice de búsqueda por usuario
+-- Aplicar sobre bases creadas con una versión anterior de schema.sql
+USE gestion_inventario;
+
+ALTER TABLE users
+    ADD COLUMN search_version INT NOT NULL DEFAULT 0 AFTER password;
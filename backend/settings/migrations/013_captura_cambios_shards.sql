@@ -0,0 +1,18 @@
+-- Migración: tablas de captura de cambios para mover tenants entre shards
+-- Aplicar en cada shard sobre bases creadas con una versión anterior de schema.sql
+-- y luego crear los triggers con: python -m api.db.shard_move preparar
+USE gestion_inventario;
+
+CREATE TABLE IF NOT EXISTS tenant_capture (
+    user_id INT NOT NULL PRIMARY KEY,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS tenant_changes (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    table_name VARCHAR(64) NOT NULL,
+    key1 VARCHAR(191) NOT NULL,
+    key2 VARCHAR(191),
+    INDEX idx_user (user_id, id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,12 @@
+-- Migración: congelamiento de escrituras en el origen al mover un tenant y
+-- claves de tenant_changes del largo de idempotency_keys.idem_key
+-- Aplicar en cada shard sobre bases con 013_captura_cambios_shards.sql y luego
+-- recrear los triggers con: python -m api.db.shard_move preparar
+USE gestion_inventario;
+
+ALTER TABLE tenant_capture
+    ADD COLUMN frozen TINYINT(1) NOT NULL DEFAULT 0 AFTER user_id;
+
+ALTER TABLE tenant_changes
+    MODIFY key1 VARCHAR(255) NOT NULL,
+    MODIFY key2 VARCHAR(255);
@@ -0,0 +1,9 @@
+-- Migración: escrituras recientes por usuario, para que read-your-writes valga
+-- aunque la lectura la atienda otro worker
+-- Aplicar sobre bases creadas con una versión anterior de schema.sql
+USE gestion_inventario;
+
+CREATE TABLE IF NOT EXISTS replication_recent_writes (
+    user_id INT NOT NULL PRIMARY KEY,
+    primary_until DOUBLE NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
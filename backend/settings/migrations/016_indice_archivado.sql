@@ -0,0 +1,6 @@
+-- Migración: índice (status, order_date) para el archivado de órdenes
+-- Aplicar sobre bases creadas con una versión anterior de schema.sql
+USE gestion_inventario;
+
+ALTER TABLE purchase_orders
+    ADD INDEX idx_status_date (status, order_date);
@@ -3,6 +3,9 @@ CREATE TABLE users (
     id INT AUTO_INCREMENT PRIMARY KEY,
     username VARCHAR(255) NOT NULL UNIQUE,
     password VARCHAR(255) NOT NULL,
+    -- Sube con cada cambio de artículos, categorías o proveedores: los workers
+    -- descartan su índice de búsqueda en memoria si no coincide
+    search_version INT NOT NULL DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
@@ -11,17 +14,41 @@ CREATE TABLE categories (
     id INT AUTO_INCREMENT PRIMARY KEY,
     name VARCHAR(255) NOT NULL,
     descripcion TEXT,
+    low_stock_threshold INT DEFAULT NULL,
+    product_count INT NOT NULL DEFAULT 0,
+    -- Sin FK: la jerarquía la mantiene category_tree y shard_move copia las
+    -- categorías sin ordenar por nivel
+    parent_id INT DEFAULT NULL,
     user_id INT NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-    INDEX idx_user_category (user_id, name)
+    INDEX idx_user_category (user_id, name),
+    INDEX idx_parent (parent_id),
+    FULLTEXT INDEX ft_category_name (name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Tabla de clausura de la jerarquía de categorías: un camino por fila
+-- (incluye el de cada categoría consigo misma, depth = 0)
+CREATE TABLE category_tree (
+    ancestor_id INT NOT NULL,
+    descendant_id INT NOT NULL,
+    depth INT NOT NULL,
+    user_id INT NOT NULL,
+    PRIMARY KEY (ancestor_id, descendant_id),
+    FOREIGN KEY (ancestor_id) REFERENCES categories(id) ON DELETE CASCADE,
+    FOREIGN KEY (descendant_id) REFERENCES categories(id) ON DELETE CASCADE,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_descendant (descendant_id, depth)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Crear tabla de productos
 CREATE TABLE products (
     id INT AUTO_INCREMENT PRIMARY KEY,
     name VARCHAR(255) NOT NULL,
+    description TEXT,
     price DECIMAL(10,2) NOT NULL,
+    low_stock_threshold INT DEFAULT NULL,
+    abc_class CHAR(1) DEFAULT NULL,
     category_id INT DEFAULT NULL,
     user_id INT NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -29,18 +56,23 @@ CREATE TABLE products (
     FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE SET NULL,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
     INDEX idx_user_product (user_id, name),
-    INDEX idx_category (category_id)
+    INDEX idx_category (category_id),
+    INDEX idx_user_abc (user_id, abc_class),
+    FULLTEXT INDEX ft_product_text (name, description)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
--- Crear tabla de stock
+-- Crear tabla de stock (low_stock: quantity <= umbral del producto, o de su
+-- categoría, o el general; lo mantiene Stock.refresh_low_stock)
 CREATE TABLE stock (
     product_id INT NOT NULL PRIMARY KEY,
     quantity INT NOT NULL DEFAULT 0,
+    low_stock TINYINT(1) NOT NULL DEFAULT 1,
     user_id INT NOT NULL,
     last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-    INDEX idx_user_stock (user_id)
+    INDEX idx_user_stock (user_id),
+    INDEX idx_user_low_stock (user_id, low_stock, quantity)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Crear tabla de proveedores
@@ -49,10 +81,12 @@ CREATE TABLE suppliers (
     name_supplier VARCHAR(255) NOT NULL,
     phone VARCHAR(20),
     mail VARCHAR(255),
+    product_count INT NOT NULL DEFAULT 0,
     user_id INT NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-    INDEX idx_user_supplier (user_id)
+    INDEX idx_user_supplier (user_id, name_supplier),
+    FULLTEXT INDEX ft_supplier_name (name_supplier)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Crear tabla intermedia suppliers_products
@@ -60,11 +94,14 @@ CREATE TABLE suppliers_products (
     supplier_id INT NOT NULL,
     product_id INT NOT NULL,
     user_id INT NOT NULL,
+    cost DECIMAL(10,2) DEFAULT NULL,
+    lead_time_days INT DEFAULT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     PRIMARY KEY (supplier_id, product_id),
     FOREIGN KEY (supplier_id) REFERENCES suppliers(id) ON DELETE CASCADE,
     FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE,
-    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_user_product_cost (user_id, product_id, cost)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Crear tabla de órdenes de compra
@@ -77,7 +114,9 @@ CREATE TABLE purchase_orders (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
     INDEX idx_user_status (user_id, status),
-    INDEX idx_order_date (order_date)
+    INDEX idx_order_date (order_date),
+    -- Archivado: recorre solo las órdenes completadas/eliminadas más viejas
+    INDEX idx_status_date (status, order_date)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Crear tabla de productos en órdenes
@@ -91,6 +130,118 @@ CREATE TABLE order_products (
     INDEX idx_order (order_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- Crear tablas de historial: órdenes completadas/eliminadas archivadas por
+-- api/db/archive.py (mismas columnas; order_products_history agrega user_id)
+CREATE TABLE purchase_orders_history (
+    id INT NOT NULL PRIMARY KEY,
+    order_date DATE NOT NULL,
+    received_date DATE DEFAULT NULL,
+    status ENUM('pending', 'completed', 'deleted') DEFAULT 'pending',
+    user_id INT NOT NULL,
+    created_at TIMESTAMP NULL DEFAULT NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_user_status (user_id, status),
+    INDEX idx_order_date (order_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE order_products_history (
+    id INT NOT NULL PRIMARY KEY,
+    order_id INT NOT NULL,
+    product_id INT NOT NULL,
+    quantity INT NOT NULL,
+    user_id INT NOT NULL,
+    FOREIGN KEY (order_id) REFERENCES purchase_orders_history(id) ON DELETE CASCADE,
+    FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_order (order_id),
+    INDEX idx_user_product (user_id, product_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Vistas con las órdenes activas y las archivadas (para consultas manuales; la
+-- API no las usa porque MySQL < 8.0.29 no empuja el filtro por user_id dentro
+-- del UNION y las materializa con todos los tenants, ver api/db/archive.py)
+CREATE VIEW purchase_orders_all AS
+    SELECT id, order_date, received_date, status, user_id, created_at FROM purchase_orders
+    UNION ALL
+    SELECT id, order_date, received_date, status, user_id, created_at FROM purchase_orders_history;
+
+CREATE VIEW order_products_all AS
+    SELECT op.id, op.order_id, op.product_id, op.quantity, po.user_id
+    FROM order_products op
+    JOIN purchase_orders po ON op.order_id = po.id
+    UNION ALL
+    SELECT id, order_id, product_id, quantity, user_id FROM order_products_history;
+
+-- Líneas con los datos de su orden (activas + historial), para los cálculos
+-- por producto y fecha sin unir las dos vistas anteriores
+CREATE VIEW order_lines_all AS
+    SELECT op.product_id, op.quantity, po.id AS order_id, po.order_date, po.received_date, po.status, po.user_id
+    FROM order_products op
+    JOIN purchase_orders po ON op.order_id = po.id
+    UNION ALL
+    SELECT oph.product_id, oph.quantity, poh.id, poh.order_date, poh.received_date, poh.status, poh.user_id
+    FROM order_products_history oph
+    JOIN purchase_orders_history poh ON oph.order_id = poh.id;
+
+-- Crear tabla de latido de replicación (mide el retraso de las réplicas de lectura)
+CREATE TABLE replication_heartbeat (
+    id INT NOT NULL PRIMARY KEY,
+    ts DOUBLE NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Crear tabla de escrituras recientes (read-your-writes entre workers): hasta
+-- cuándo (epoch) las lecturas de cada usuario van al primario
+CREATE TABLE replication_recent_writes (
+    user_id INT NOT NULL PRIMARY KEY,
+    primary_until DOUBLE NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Crear tabla de asignación de tenants a shards (solo en la base principal):
+-- tenants movidos fuera del shard que les da la regla de DB_SHARDS
+CREATE TABLE tenant_shards (
+    user_id INT NOT NULL PRIMARY KEY,
+    shard VARCHAR(64) NOT NULL,
+    status ENUM('active', 'moving') NOT NULL DEFAULT 'active',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Crear tablas de captura de cambios para mover tenants entre shards (en
+-- cada shard): mientras un tenant figura en tenant_capture, los triggers que
+-- crea 'python -m api.db.shard_move preparar' anotan en tenant_changes la
+-- clave de cada fila que escribe, y con frozen = 1 rechazan sus escrituras
+CREATE TABLE tenant_capture (
+    user_id INT NOT NULL PRIMARY KEY,
+    frozen TINYINT(1) NOT NULL DEFAULT 0,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- key1/key2 admiten las claves más largas de las tablas capturadas
+-- (idempotency_keys.idem_key, 255)
+CREATE TABLE tenant_changes (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    table_name VARCHAR(64) NOT NULL,
+    key1 VARCHAR(255) NOT NULL,
+    key2 VARCHAR(255),
+    INDEX idx_user (user_id, id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Crear tabla de claves de idempotencia (header Idempotency-Key): guarda la
+-- respuesta de una escritura para devolverla si el cliente reintenta
+CREATE TABLE idempotency_keys (
+    user_id INT NOT NULL,
+    idem_key VARCHAR(255) NOT NULL,
+    request_hash CHAR(64) NOT NULL,
+    status_code INT DEFAULT NULL,
+    response_body MEDIUMTEXT,
+    locked_until DATETIME NOT NULL,
+    expires_at DATETIME NOT NULL,
+    PRIMARY KEY (user_id, idem_key),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_expires (expires_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 -- Crear trigger para autocompletar stock cuando se crea un producto
 DELIMITER $$
 
@@ -179,6 +179,26 @@ window.removeOrderItem = (index) => {
     updateOrderItemsDisplay();
 };
 
+// Envía una escritura con Idempotency-Key y la reintenta ante fallas de red:
+// el backend devuelve la respuesta original en vez de repetir la operación
+async function fetchIdempotente(url, options, intentos = 3) {
+    const key = crypto.randomUUID ? crypto.randomUUID() : `${Date.now()}-${Math.random()}`;
+    options.headers = { ...options.headers, 'Idempotency-Key': key };
+    for (let intento = 1; ; intento++) {
+        try {
+            const response = await fetch(url, options);
+            if (response.status !== 409 || intento >= intentos) {
+                return response;
+            }
+        } catch (error) {
+            if (intento >= intentos) {
+                throw error;
+            }
+        }
+        await new Promise(resolve => setTimeout(resolve, 1000 * intento));
+    }
+}
+
 async function createOrder() {
     if (orderItems.length === 0) {
         alert('Debes agregar al menos un producto');
@@ -186,7 +206,7 @@ async function createOrder() {
     }
 
     try {
-        const response = await fetch(`${API_CONFIG.BASE_URL}/usuario/${userId}/pedidos`, {
+        const response = await fetchIdempotente(`${API_CONFIG.BASE_URL}/usuario/${userId}/pedidos`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -264,7 +284,7 @@ window.confirmOrder = async (id) => {
     if (!confirm('¿Confirmar esta orden? Esto actualizará el stock de los productos.')) return;
 
     try {
-        const response = await fetch(`${API_CONFIG.BASE_URL}/usuario/${userId}/pedidos/${id}/confirmar`, {
+        const response = await fetchIdempotente(`${API_CONFIG.BASE_URL}/usuario/${userId}/pedidos/${id}/confirmar`, {
             method: 'PUT',
             headers: {
                 'x-access-token': Auth.getToken()